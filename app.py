@@ -1,12 +1,21 @@
 from flask import Flask, jsonify
+import click
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 import os
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash
 from datetime import datetime
-from models import Cours, Talibe, Enseignant, Daara, Batiment, db, RoleEnum,Admin
+from models import Cours, Talibe, Enseignant, Daara, Batiment, db, RoleEnum, Admin, Utilisateur
 from config import Config
+import identity_cache
+import stockage
+import taches_photos
+import recherche
+import compteur_requetes
+import journalisation
+import mots_de_passe
+import limitation
+import revocation
 
 # ✅ Initialiser JWTManager en dehors de la fonction create_app
 jwt = JWTManager()
@@ -32,7 +41,7 @@ def create_app(testing=False):
                 "X-CSRF-Token",
                 "Access-Control-Allow-Origin"
             ],
-            "expose_headers": ["Content-Type", "Authorization", "Content-Length"],
+            "expose_headers": ["Content-Type", "Authorization", "Content-Length", "X-Query-Count", "Server-Timing", "Retry-After"],
             "supports_credentials": True,
             "max_age": 3600
         }
@@ -47,12 +56,22 @@ def create_app(testing=False):
     else:
         app.config.from_object(Config)
     
+    journalisation.init_app(app)
+    
     # Initialisation de SQLAlchemy AVANT tout import de modèle
     db.init_app(app)
     
     # ✅ Initialiser JWT avec l'application
     jwt.init_app(app)
-    Migrate(app, db)
+    revocation.init_app(app)
+    identity_cache.init_app(app)
+    stockage.init_app(app)
+    taches_photos.init_app(app)
+    mots_de_passe.init_app(app)
+    limitation.init_app(app)
+    compteur_requetes.init_app(app)
+    # Mode batch: ALTER TABLE par recopie sous SQLite
+    Migrate(app, db, render_as_batch=True)
     
     # Configurer les handlers d'erreur JWT
     @jwt.unauthorized_loader
@@ -76,6 +95,22 @@ def create_app(testing=False):
             "message": "Le token a expiré, veuillez vous reconnecter"
         }), 401
     
+    @jwt.additional_claims_loader
+    def claims_callback(identity):
+        # Rôle, id, type et daara dans chaque token émis (voir decorators.role_required)
+        return identity_cache.claims(identity)
+    
+    @jwt.token_in_blocklist_loader
+    def token_revoque_callback(jwt_header, jwt_payload):
+        return revocation.est_revoque(jwt_payload)
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({
+            "error": "Token révoqué",
+            "message": "Le token a été révoqué, veuillez vous reconnecter"
+        }), 401
+    
     # Maintenant importer les blueprints (qui utilisent les modèles)
     from routes.auth import auth_bp
     from routes.daara import daara_bp
@@ -88,6 +123,7 @@ def create_app(testing=False):
     from routes.inscription import inscription_bp
     from routes.admin import admin_bp
     from routes.uploads import upload_bp
+    from routes.recherche import recherche_bp
     
     # Enregistrement des blueprints
     app.register_blueprint(auth_bp, url_prefix='/api')
@@ -101,6 +137,7 @@ def create_app(testing=False):
     app.register_blueprint(inscription_bp, url_prefix='/api')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(upload_bp, url_prefix='/api')
+    app.register_blueprint(recherche_bp, url_prefix='/api')
     
     # Gestion des erreurs
     @app.errorhandler(404)
@@ -149,131 +186,154 @@ def create_app(testing=False):
         
     # Dans votre fichier routes (app.py ou talibe_routes.py)
     
+    @app.cli.command('bootstrap')
+    @click.option('--sans-utilisateurs', is_flag=True, help='Ne pas créer les utilisateurs par défaut')
+    def bootstrap_command(sans_utilisateurs):
+        """Initialise la base: tables, index, utilisateurs par défaut (au déploiement, après flask db upgrade)"""
+        crees = bootstrap(utilisateurs=not sans_utilisateurs)
+        print("Tables créées/vérifiées")
+        for description in crees:
+            print(f"{description} créé")
+        if not sans_utilisateurs:
+            print(f"{len(crees)} utilisateur(s) par défaut créé(s)")
+    
+    @app.cli.command('attribuer-lits')
+    def attribuer_lits():
+        """Attribue un lit aux talibés déjà hébergés (reprise des données)"""
+        import occupation
+        print(f"{occupation.attribuer_lits_existants()} lit(s) attribué(s)")
+    
+    @app.cli.command('reindexer-recherche')
+    def reindexer_recherche():
+        """Recalcule le texte de recherche de tous les utilisateurs"""
+        print(f"{recherche.reindexer()} utilisateur(s) réindexé(s)")
+    
+    @app.cli.command('audit-index')
+    def audit_index():
+        """EXPLAIN des requêtes fréquentes; échoue si une table est parcourue sans index"""
+        import audit_index
+        resultats = audit_index.auditer()
+        for resultat in resultats:
+            statut = f"SCAN {', '.join(resultat['scans'])}" if resultat['scans'] else 'OK'
+            print(f"{resultat['requete']:<30} {statut}")
+        if any(resultat['scans'] for resultat in resultats):
+            raise SystemExit(1)
+    
+    @app.cli.command('importer-talibes')
+    @click.argument('fichier', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--dry-run', is_flag=True, help='Valider sans rien écrire')
+    @click.option('--erreurs', type=click.Path(dir_okay=False), help="Fichier CSV d'erreurs à produire")
+    def importer_talibes(fichier, dry_run, erreurs):
+        """Importe des talibés depuis un fichier CSV ou XLSX"""
+        import import_talibes
+        with open(fichier, 'rb') as flux:
+            rapport = import_talibes.importer(import_talibes.lire_fichier(flux, fichier), dry_run=dry_run)
+        if erreurs:
+            with open(erreurs, 'w', encoding='utf-8', newline='') as sortie:
+                sortie.write(rapport.erreurs_csv())
+        resume = rapport.to_dict()
+        print(f"{resume['lignes']} ligne(s), {resume['valides']} valide(s), "
+              f"{resume['importes']} importée(s), {resume['lignes_en_erreur']} en erreur")
+    
     return app
     
     
 
+# Utilisateurs créés par « flask bootstrap » s'ils n'existent pas
+DEFAULT_USERS = [
+    {
+        "class": Admin,
+        "matricule": "ADMIN001",
+        "nom": "Admin",
+        "prenom": "System", 
+        "email": "admin@daara.com",
+        "password": "admin123",
+        "role": RoleEnum.ADMIN,
+        "lieu_naissance": "Dakar",
+        "description": "👑 Administrateur système"
+    },
+    {
+        "class": Admin,
+        "matricule": "ADMIN002", 
+        "nom": "Kane",
+        "prenom": "Mamadou",
+        "email": "mkane@daara.com", 
+        "password": "admin456",
+        "role": RoleEnum.ADMIN,
+        "lieu_naissance": "Thiès",
+        "description": "👑 Administrateur principal"
+    },
+    {
+        "class": Enseignant,
+        "matricule": "ENS001",
+        "nom": "Diallo", 
+        "prenom": "Moussa",
+        "email": "enseignant@daara.com",
+        "password": "enseignant123", 
+        "role": RoleEnum.ENSEIGNANT,
+        "lieu_naissance": "Touba",
+        "description": "👨‍🏫 Enseignant coranique"
+    },
+    {
+        "class": Talibe,
+        "matricule": "TAL001",
+        "nom": "Ndiaye",
+        "prenom": "Ibrahima",
+        "email": "talibe@daara.com",
+        "password": "talibe123", 
+        "role": RoleEnum.TALIBE,
+        "lieu_naissance": "Saint-Louis", 
+        "description": "👦 Talibé"
+    }
+]
+
+
 def create_default_users():
-    """Crée les utilisateurs par défaut s'ils n'existent pas"""
-    try:
-        print("🔍 Vérification des utilisateurs par défaut...")
-        
-        # Liste des utilisateurs par défaut à créer
-        default_users = [
-            {
-                "class": Admin,
-                "matricule": "ADMIN001",
-                "nom": "Admin",
-                "prenom": "System", 
-                "email": "admin@daara.com",
-                "password": "admin123",
-                "role": RoleEnum.ADMIN,
-                "lieu_naissance": "Dakar",
-                "description": "👑 Administrateur système"
-            },
-            {
-                "class": Admin,
-                "matricule": "ADMIN002", 
-                "nom": "Kane",
-                "prenom": "Mamadou",
-                "email": "mkane@daara.com", 
-                "password": "admin456",
-                "role": RoleEnum.ADMIN,
-                "lieu_naissance": "Thiès",
-                "description": "👑 Administrateur principal"
-            },
-            {
-                "class": Enseignant,
-                "matricule": "ENS001",
-                "nom": "Diallo", 
-                "prenom": "Moussa",
-                "email": "enseignant@daara.com",
-                "password": "enseignant123", 
-                "role": RoleEnum.ENSEIGNANT,
-                "lieu_naissance": "Touba",
-                "description": "👨‍🏫 Enseignant coranique"
-            },
-            {
-                "class": Talibe,
-                "matricule": "TAL001",
-                "nom": "Ndiaye",
-                "prenom": "Ibrahima",
-                "email": "talibe@daara.com",
-                "password": "talibe123", 
-                "role": RoleEnum.TALIBE,
-                "lieu_naissance": "Saint-Louis", 
-                "description": "👦 Talibé"
-            }
-        ]
-        
-        users_created = []
-        
-        for user_data in default_users:
-            # Vérifier si l'utilisateur existe déjà
-            existing_user = user_data["class"].query.filter_by(email=user_data["email"]).first()
-            
-            if not existing_user:
-                # Créer l'utilisateur avec la bonne classe
-                user = user_data["class"](
-                    matricule=user_data["matricule"],
-                    nom=user_data["nom"],
-                    prenom=user_data["prenom"],
-                    email=user_data["email"],
-                    role=user_data["role"],
-                    date_naissance=datetime.now().date(),
-                    lieu_naissance=user_data["lieu_naissance"],
-                    date_entree=datetime.now().date()
-                )
-                # Utiliser set_password pour hasher correctement le mot de passe
-                user.set_password(user_data["password"])
-                
-                db.session.add(user)
-                users_created.append(user_data["description"])
-                print(f"✅ {user_data['description']} créé")
-        
-        if users_created:
-            db.session.commit()
-            print(f"🎉 {len(users_created)} utilisateur(s) par défaut créé(s)")
-        else:
-            print("ℹ️  Tous les utilisateurs par défaut existent déjà")
-            
-    except Exception as e:
-        db.session.rollback()
-        print(f"⚠️  Attention: Impossible de créer les utilisateurs par défaut: {e}")
-        import traceback
-        traceback.print_exc()
-        
-# ... tout ton code au-dessus ...
+    """Crée les utilisateurs par défaut s'ils n'existent pas; renvoie leurs descriptions"""
+    # Une seule requête pour savoir lesquels existent déjà; seuls les manquants sont hachés
+    existants = set(db.session.execute(
+        db.select(Utilisateur.email).where(Utilisateur.email.in_([u["email"] for u in DEFAULT_USERS]))
+    ).scalars())
+    
+    users_created = []
+    for user_data in DEFAULT_USERS:
+        if user_data["email"] in existants:
+            continue
+        user = user_data["class"](
+            matricule=user_data["matricule"],
+            nom=user_data["nom"],
+            prenom=user_data["prenom"],
+            email=user_data["email"],
+            role=user_data["role"],
+            date_naissance=datetime.now().date(),
+            lieu_naissance=user_data["lieu_naissance"],
+            date_entree=datetime.now().date()
+        )
+        user.set_password(user_data["password"])
+        db.session.add(user)
+        users_created.append(user_data["description"])
+    
+    if users_created:
+        db.session.commit()
+    return users_created
 
-app = create_app()  # ← Ajouter ceci ici
 
-        
-with app.app_context():
-    try:
-        print("🔧 Checking database tables...")
-        
-        # Créer toutes les tables si elles n'existent pas
-        db.create_all()
-        print("✅ Database tables created/verified")
-        
-        # Créer les utilisateurs par défaut
-        create_default_users()
-        print("✅ Default users created")
-        
-    except Exception as e:
-        print(f"⚠️ Warning during database initialization: {e}")
+def bootstrap(utilisateurs=True):
+    """Crée les tables manquantes (et leurs index / déclencheurs), puis les utilisateurs par défaut"""
+    db.create_all()
+    return create_default_users() if utilisateurs else []
 
 
 if __name__ == '__main__':
+    # Serveur de développement: une seule application, base initialisée explicitement
     app = create_app()
     with app.app_context():
-        db.create_all()
-        create_default_users()
-        # Render fournit un port automatiquement → on doit l'utiliser
+        bootstrap()
+    # Render fournit un port automatiquement → on doit l'utiliser
     port = int(os.environ.get('PORT', 5000))
 
     app.run(
         host="0.0.0.0",   # Obligatoire pour être accessible sur Render
         port=port,        # On utilise le port fourni
         debug=False       # Render n'aime pas debug=True
-    )
\ No newline at end of file
+    )
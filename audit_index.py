@@ -0,0 +1,87 @@
+import json
+from sqlalchemy import select, func, text
+from models import (db, Utilisateur, Talibe, Enseignant, Batiment, Chambre, Lit,
+                    Inscription, Cours, enseignant_cours)
+
+# Audit des index: EXPLAIN sur les requêtes fréquentes des routes, en signalant
+# les parcours séquentiels de table (SCAN sous SQLite, Seq Scan sous PostgreSQL).
+
+# Requêtes fréquentes: nom -> (fonction renvoyant le select, tables dont le parcours complet est voulu)
+REQUETES = {
+    'utilisateur_par_email': (lambda: select(Utilisateur).where(Utilisateur.email == 'a@b.sn'), ()),
+    'utilisateurs_par_type': (lambda: select(func.count(Utilisateur.id)).where(Utilisateur.type == 'talibe'), ()),
+    'talibes_par_daara': (lambda: select(Talibe).where(Talibe.daara_id == 1), ()),
+    'talibes_par_chambre': (lambda: select(Talibe).where(Talibe.chambre_id == 1), ()),
+    'enseignants_par_daara': (lambda: select(Enseignant).where(Enseignant.daara_id == 1), ()),
+    'batiments_par_daara': (lambda: select(Batiment).where(Batiment.daara_id == 1), ()),
+    'chambres_par_batiment': (lambda: select(Chambre).where(Chambre.batiment_id == 1), ()),
+    'lits_par_chambre': (lambda: select(func.count(Lit.id)).where(Lit.chambre_id == 1), ()),
+    'lits_libres_par_chambre': (lambda: select(Lit).where(Lit.chambre_id == 1, Lit.talibe_id.is_(None)), ()),
+    'inscriptions_par_talibe': (lambda: select(Inscription).where(Inscription.talibe_id == 1), ()),
+    'inscriptions_par_cours': (lambda: select(Inscription).where(Inscription.cours_id == 1), ()),
+    'enseignants_par_cours': (lambda: select(enseignant_cours.c.enseignant_id)
+                              .where(enseignant_cours.c.cours_id == 1), ()),
+    'cours_par_categorie': (lambda: select(Cours).where(Cours.categorie == 'Coran'), ()),
+    'cours_par_niveau': (lambda: select(Cours).where(Cours.niveau == 'Débutant'), ()),
+    'cours_actifs': (lambda: select(Cours).where(Cours.is_active.is_(True)), ()),
+}
+
+
+def _sql(requete):
+    return str(requete.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+
+def _scans_sqlite(requete):
+    plan = db.session.execute(text('EXPLAIN QUERY PLAN ' + _sql(requete))).all()
+    details = [ligne[3] for ligne in plan]
+    # « SCAN t USING (COVERING) INDEX » parcourt un index, pas la table
+    scans = [detail.split()[1] for detail in details
+             if detail.startswith('SCAN ') and 'INDEX' not in detail]
+    return scans, details
+
+
+def _noeuds(noeud):
+    yield noeud
+    for enfant in noeud.get('Plans', []):
+        yield from _noeuds(enfant)
+
+
+def _scans_postgresql(requete):
+    # Sans seqscan, le planificateur ne choisit un Seq Scan que faute d'index utilisable,
+    # ce qui rend l'audit indépendant du volume de données
+    db.session.execute(text('SET LOCAL enable_seqscan = off'))
+    plan = db.session.execute(text('EXPLAIN (FORMAT JSON) ' + _sql(requete))).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    noeuds = list(_noeuds(plan[0]['Plan']))
+    scans = [noeud['Relation Name'] for noeud in noeuds if noeud['Node Type'] == 'Seq Scan']
+    return scans, [noeud['Node Type'] + (f" on {noeud['Relation Name']}" if 'Relation Name' in noeud else '')
+                   for noeud in noeuds]
+
+
+def auditer(requetes=None):
+    """
+    Plan de chaque requête fréquente. Renvoie une liste de
+    {'requete', 'scans', 'plan'}; scans: tables parcourues sans index
+    (hors parcours autorisés).
+    """
+    dialecte = db.engine.dialect.name
+    if dialecte == 'sqlite':
+        expliquer = _scans_sqlite
+    elif dialecte == 'postgresql':
+        expliquer = _scans_postgresql
+    else:
+        raise ValueError(f"Audit des index non disponible pour {dialecte}")
+
+    resultats = []
+    try:
+        for nom, (construire, autorises) in (requetes or REQUETES).items():
+            scans, plan = expliquer(construire())
+            resultats.append({
+                'requete': nom,
+                'scans': [table for table in scans if table not in autorises],
+                'plan': plan
+            })
+    finally:
+        db.session.rollback()
+    return resultats
@@ -0,0 +1,58 @@
+"""
+Démarrage d'un worker: import de wsgi (création de l'application) dans un
+processus neuf, comme gunicorn. Échoue si le démarrage ouvre une connexion
+à la base ou hache un mot de passe.
+
+    python -m benchmarks.bench_demarrage
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RACINE = os.path.join(os.path.dirname(__file__), '..')
+REPETITIONS = 10
+SEUIL_MS = 1500
+
+# Exécuté dans chaque processus fils
+SONDE = """
+import json, sys, time
+debut = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import werkzeug.security
+connexions, hachages = [], []
+event.listen(Engine, 'connect', lambda *args: connexions.append(1))
+hacher = werkzeug.security.generate_password_hash
+werkzeug.security.generate_password_hash = lambda *a, **k: hachages.append(1) or hacher(*a, **k)
+import wsgi
+print(json.dumps({'ms': (time.perf_counter() - debut) * 1000,
+                  'connexions': len(connexions), 'hachages': len(hachages)}))
+"""
+
+
+def demarrer():
+    sortie = subprocess.run([sys.executable, '-c', SONDE], cwd=RACINE, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(sortie.strip().splitlines()[-1])
+
+
+def main():
+    mesures = [demarrer() for _ in range(REPETITIONS)]
+    durees = sorted(m['ms'] for m in mesures)
+    mediane = statistics.median(durees)
+    p95 = durees[int(len(durees) * 0.95) - 1]
+    connexions = max(m['connexions'] for m in mesures)
+    hachages = max(m['hachages'] for m in mesures)
+
+    ok = p95 < SEUIL_MS and connexions == 0 and hachages == 0
+    print(f"{'import wsgi (processus neuf)':<45} median {mediane:8.2f} ms   p95 {p95:8.2f} ms"
+          f"{' OK' if p95 < SEUIL_MS else f' DEPASSE ({SEUIL_MS} ms)'}")
+    print(f"{'connexions à la base au démarrage':<45} {connexions}")
+    print(f"{'mots de passe hachés au démarrage':<45} {hachages}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Export CSV / NDJSON de 100 000 talibés: mémoire maximale pendant le flux.
+
+    python -m benchmarks.bench_export
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import creer_app_benchmark, inserer_utilisateurs
+
+NB_TALIBES = 100000
+SEUIL_MO = 20
+
+
+def main():
+    creer_app_benchmark()
+    from models import Talibe
+    inserer_utilisateurs(Talibe.__table__, 'talibe', NB_TALIBES, 'BE', niveau='Débutant')
+
+    import export
+    ok = True
+    for format_ in ('csv', 'ndjson'):
+        requete, noms = export.EXPORTS['talibes'].requete()
+        tracemalloc.start()
+        debut = time.perf_counter()
+        taille = sum(len(morceau) for morceau in export.generateur(format_, requete, noms))
+        duree = time.perf_counter() - debut
+        pic = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        statut = 'OK' if pic < SEUIL_MO else f'DEPASSE ({SEUIL_MO} Mo)'
+        ok &= pic < SEUIL_MO
+        print(f'{"export " + format_ + " (100k talibés)":<45} {duree:8.2f} s   '
+              f'{taille / 1024 / 1024:6.1f} Mo produits   pic {pic:6.1f} Mo {statut}')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Import en masse de 20 000 talibés depuis un CSV (validation, unicité, insertion).
+
+    python -m benchmarks.bench_import
+
+Le pipeline est mesuré avec un hachage à coût minimal; le coût du hachage
+par défaut (PBKDF2) est mesuré à part et réparti sur IMPORT_PROCESSUS
+processus.
+"""
+import io
+import sys
+import time
+
+from werkzeug.security import generate_password_hash
+
+from benchmarks.common import creer_app_benchmark
+
+NB_LIGNES = 20000
+SEUIL_S = 10
+
+
+def fichier_csv():
+    lignes = ["matricule,nom,prenom,email,password,date_naissance,lieu_naissance\n"]
+    lignes += [f"BI{i},Bench,T{i},bi{i}@bench.local,secret{i},2010-01-01,Dakar\n" for i in range(NB_LIGNES)]
+    return io.BytesIO("".join(lignes).encode('utf-8'))
+
+
+def main():
+    app = creer_app_benchmark()
+    app.config['IMPORT_PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1'
+
+    import import_talibes
+    debut = time.perf_counter()
+    rapport = import_talibes.importer(import_talibes.lire_csv(fichier_csv()))
+    duree = time.perf_counter() - debut
+
+    ok = rapport.importes == NB_LIGNES and duree < SEUIL_S
+    statut = 'OK' if ok else f'DEPASSE ({SEUIL_S} s)'
+    print(f'{"import CSV (20k talibés, hors hachage)":<45} {duree:8.2f} s   {rapport.importes} importés {statut}')
+
+    debut = time.perf_counter()
+    for i in range(20):
+        generate_password_hash(f'secret{i}')
+    par_hash = (time.perf_counter() - debut) / 20
+    processus = app.config.get('IMPORT_PROCESSUS', import_talibes.PROCESSUS_PAR_DEFAUT)
+    print(f'{"hachage par défaut (estimation)":<45} {par_hash * NB_LIGNES / processus:8.2f} s   '
+          f'{par_hash * 1000:.1f} ms/mot de passe sur {processus} processus')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Audit des index sur un jeu de données peuplé: chaque requête fréquente doit
+passer par un index (échec si une table est parcourue séquentiellement).
+
+    python -m benchmarks.bench_index
+"""
+import random
+import sys
+
+from sqlalchemy import insert, text
+
+from benchmarks.common import creer_app_benchmark, inserer_utilisateurs, mesurer, afficher
+
+NB_DAARAS = 20
+NB_CHAMBRES = 2000
+NB_TALIBES = 30000
+NB_ENSEIGNANTS = 2000
+NB_COURS = 500
+
+CATEGORIES = ['Coran', 'Fiqh', 'Tawhid', 'Arabe', 'Hadith']
+NIVEAUX = ['Débutant', 'Intermédiaire', 'Avancé']
+
+
+def peupler():
+    from models import db, Daara, Batiment, Chambre, Lit, Talibe, Enseignant, Cours, Inscription, enseignant_cours
+    hasard = random.Random(17)
+    db.session.execute(insert(Daara.__table__), [
+        {'id': d, 'nom': f'Daara {d}', 'lieu': 'Touba'} for d in range(1, NB_DAARAS + 1)
+    ])
+    db.session.execute(insert(Batiment.__table__), [
+        {'id': b, 'nom': f'Bat {b}', 'daara_id': b % NB_DAARAS + 1} for b in range(1, 201)
+    ])
+    db.session.execute(insert(Chambre.__table__), [
+        {'id': c, 'numero': str(c), 'nb_lits': 10, 'batiment_id': c % 200 + 1}
+        for c in range(1, NB_CHAMBRES + 1)
+    ])
+    db.session.execute(insert(Lit.__table__), [
+        {'numero': str(l), 'chambre_id': l % NB_CHAMBRES + 1} for l in range(NB_CHAMBRES * 10)
+    ])
+    db.session.execute(insert(Cours.__table__), [
+        {'id': c, 'code': f'C{c}', 'libelle': f'Cours {c}', 'categorie': CATEGORIES[c % 5],
+         'niveau': NIVEAUX[c % 3], 'is_active': c % 10 != 0, 'capacite_max': 100}
+        for c in range(1, NB_COURS + 1)
+    ])
+    db.session.commit()
+    inserer_utilisateurs(
+        Talibe.__table__, 'talibe', NB_TALIBES, 'IT',
+        daara_id=lambda i: i % NB_DAARAS + 1,
+        chambre_id=lambda i: hasard.randint(1, NB_CHAMBRES) if i % 5 else None
+    )
+    inserer_utilisateurs(Enseignant.__table__, 'enseignant', NB_ENSEIGNANTS, 'IE',
+                         daara_id=lambda i: i % NB_DAARAS + 1)
+
+    talibe_ids = db.session.execute(text('SELECT id FROM talibes')).scalars().all()
+    enseignant_ids = db.session.execute(text('SELECT id FROM enseignants')).scalars().all()
+    db.session.execute(insert(Inscription.__table__), [
+        {'talibe_id': talibe_id, 'cours_id': cours_id}
+        for talibe_id in talibe_ids
+        for cours_id in hasard.sample(range(1, NB_COURS + 1), 3)
+    ])
+    db.session.execute(insert(enseignant_cours), [
+        {'enseignant_id': enseignant_id, 'cours_id': hasard.randint(1, NB_COURS)}
+        for enseignant_id in enseignant_ids
+    ])
+    # Statistiques du planificateur, comme sur une base en production
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def main():
+    creer_app_benchmark()
+    peupler()
+
+    from models import db
+    import audit_index
+    ok = True
+    for resultat in audit_index.auditer():
+        construire, _ = audit_index.REQUETES[resultat['requete']]
+        requete = construire()
+        # Durées à titre indicatif: seul le plan fait échouer le benchmark
+        afficher(resultat['requete'], *mesurer(lambda: db.session.execute(requete).all()))
+        if resultat['scans']:
+            ok = False
+            print(f"    parcours séquentiel: {', '.join(resultat['scans'])} -> {resultat['plan']}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
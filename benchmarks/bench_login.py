@@ -0,0 +1,61 @@
+"""
+Débit de vérification des mots de passe (cœur de /api/login) selon la
+méthode de hachage, en séquentiel puis avec des connexions simultanées
+passant par le pool borné.
+
+    python -m benchmarks.bench_login
+"""
+import os
+import sys
+import threading
+import time
+
+from benchmarks.common import creer_app_benchmark
+
+METHODES = ['pbkdf2', 'pbkdf2:sha256:100000', 'scrypt:16384:8:1', 'argon2:2:19456:1']
+CONNEXIONS = 64
+CONCURRENCE = max(4, (os.cpu_count() or 1) * 2)
+
+
+def debit(app, hash_, concurrence):
+    import mots_de_passe
+    restantes = [CONNEXIONS]
+    verrou = threading.Lock()
+
+    def client():
+        with app.app_context():
+            while True:
+                with verrou:
+                    if restantes[0] <= 0:
+                        return
+                    restantes[0] -= 1
+                assert mots_de_passe.verifier(hash_, 'motdepasse')
+
+    debut = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrence)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    return CONNEXIONS / (time.perf_counter() - debut)
+
+
+def main():
+    app = creer_app_benchmark()
+    import mots_de_passe
+    print(f"{CONNEXIONS} vérifications, pool de {app.config['PASSWORD_HASH_WORKERS']} thread(s)")
+    for methode in METHODES:
+        try:
+            hash_ = mots_de_passe.hacher_avec(methode, 'motdepasse')
+        except ValueError as e:
+            print(f'{methode:<25} ignorée: {e}')
+            continue
+        sequentiel = debit(app, hash_, 1)
+        simultane = debit(app, hash_, CONCURRENCE)
+        print(f'{mots_de_passe.normaliser(methode):<25} {1000 / sequentiel:8.1f} ms/connexion   '
+              f'{sequentiel:7.1f} connexions/s (1 client)   {simultane:7.1f} connexions/s ({CONCURRENCE} clients)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
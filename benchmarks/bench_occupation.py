@@ -0,0 +1,52 @@
+"""
+Occupation des chambres et des lits: 5 000 chambres, 50 000 talibés.
+
+    python -m benchmarks.bench_occupation
+"""
+import random
+import sys
+
+from sqlalchemy import insert
+
+from benchmarks.common import creer_app_benchmark, inserer_utilisateurs, mesurer, afficher
+
+NB_CHAMBRES = 5000
+NB_TALIBES = 50000
+SEUIL_MS = 50
+
+
+def peupler():
+    from models import db, Daara, Batiment, Chambre, Lit, Talibe
+    db.session.execute(insert(Daara.__table__), [{'id': 1, 'nom': 'Daara Bench', 'lieu': 'Touba'}])
+    db.session.execute(insert(Batiment.__table__), [
+        {'id': b, 'nom': f'Bat {b}', 'daara_id': 1} for b in range(1, 51)
+    ])
+    db.session.execute(insert(Chambre.__table__), [
+        {'id': c, 'numero': str(c), 'nb_lits': 10, 'batiment_id': c % 50 + 1}
+        for c in range(1, NB_CHAMBRES + 1)
+    ])
+    db.session.execute(insert(Lit.__table__), [
+        {'numero': str(l), 'chambre_id': l % NB_CHAMBRES + 1} for l in range(NB_CHAMBRES * 10)
+    ])
+    db.session.commit()
+    hasard = random.Random(42)
+    inserer_utilisateurs(
+        Talibe.__table__, 'talibe', NB_TALIBES, 'BT',
+        daara_id=1, chambre_id=lambda i: hasard.randint(1, NB_CHAMBRES + 500) if i % 7 else None
+    )
+
+
+def main():
+    creer_app_benchmark()
+    peupler()
+
+    import occupation
+    ok = afficher('statistiques_chambres (5k chambres, 50k talibés)',
+                  *mesurer(occupation.statistiques_chambres), seuil=SEUIL_MS)
+    ok &= afficher('statistiques_lits (50k lits, 50k talibés)',
+                   *mesurer(occupation.statistiques_lits), seuil=SEUIL_MS)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
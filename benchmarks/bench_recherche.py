@@ -0,0 +1,38 @@
+"""
+Recherche « typeahead » sur 100 000 utilisateurs (SQLite FTS5).
+
+    python -m benchmarks.bench_recherche
+"""
+import random
+import sys
+
+from benchmarks.common import creer_app_benchmark, inserer_utilisateurs, mesurer, afficher
+
+NB_TALIBES = 90000
+NB_ENSEIGNANTS = 10000
+SEUIL_MS = 30
+
+NOMS = ['Ndiaye', 'Diop', 'Fall', 'Sow', 'Gueye', 'Ba', 'Sy', 'Mbaye', 'Faye', 'Cissé',
+        'Diallo', 'Sarr', 'Niang', 'Thiam', 'Kane', 'Seck', 'Dieng', 'Ndour', 'Wade', 'Camara']
+PRENOMS = ['Moussa', 'Ñdèye', 'Fatou', 'Mamadou', 'Aïssatou', 'Ibrahima', 'Cheikh', 'Awa',
+           'Ousmane', 'Mariama', 'Abdoulaye', 'Khady', 'Serigne', 'Bineta', 'Modou', 'Coumba']
+
+
+def main():
+    creer_app_benchmark()
+    from models import Talibe, Enseignant
+    hasard = random.Random(7)
+    nom_hasard = lambda i: (hasard.choice(NOMS), f'{hasard.choice(PRENOMS)} {i}')
+    inserer_utilisateurs(Talibe.__table__, 'talibe', NB_TALIBES, 'BR', noms=nom_hasard)
+    inserer_utilisateurs(Enseignant.__table__, 'enseignant', NB_ENSEIGNANTS, 'BE', noms=nom_hasard)
+
+    import recherche
+    ok = True
+    for saisie in ('nd', 'ndey', 'ndeye ndi', 'aissatou sow', 'br4521'):
+        ok &= afficher(f'recherche "{saisie}" (100k utilisateurs)',
+                       *mesurer(lambda: recherche.rechercher(saisie, limite=11)), seuil=SEUIL_MS)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
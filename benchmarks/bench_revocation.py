@@ -0,0 +1,47 @@
+"""
+Coût de la vérification de révocation ajoutée à chaque requête authentifiée
+(token_in_blocklist_loader), avec une liste de 100 000 tokens révoqués.
+
+    python -m benchmarks.bench_revocation
+"""
+import sys
+import time
+import uuid
+
+from benchmarks.common import afficher, mesurer
+
+REVOQUES = 100000
+VERIFICATIONS = 10000
+SEUIL_MS = 50  # pour 1000 vérifications
+
+
+def main():
+    import revocation
+    liste = revocation.ListeRevocation(revocation.StockageMemoire(), capacite=REVOQUES)
+    expire_a = time.time() + 3600
+    revoques = [str(uuid.uuid4()) for _ in range(REVOQUES)]
+    for jti in revoques:
+        liste.revoquer(jti, expire_a)
+    valides = [str(uuid.uuid4()) for _ in range(VERIFICATIONS)]
+
+    def verifier(jtis):
+        def fonction():
+            for jti in jtis:
+                liste.est_revoque(jti)
+        return fonction
+
+    ok = True
+    echelle = 1000 / VERIFICATIONS
+    for nom, jtis in (('1000 tokens valides (absents du filtre)', valides),
+                      ('1000 tokens révoqués', revoques[:VERIFICATIONS])):
+        mediane, p95 = mesurer(verifier(jtis), repetitions=10)
+        ok &= afficher(nom, mediane * echelle, p95 * echelle, SEUIL_MS)
+
+    faux_positifs = sum(jti in liste._filtre for jti in valides)
+    print(f"{'faux positifs du filtre':<45} {faux_positifs / VERIFICATIONS:.2%}   "
+          f"({liste._filtre.nb_bits // 8 // 1024} Kio, {liste._filtre.nb_hachages} hachages)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert
+
+
+def creer_app_benchmark():
+    """Application de test (SQLite en mémoire) avec les tables créées"""
+    from app import create_app
+    from models import db
+    app = create_app(testing=True)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    return app
+
+
+def inserer_utilisateurs(table_fille, type_, nombre, prefixe, noms=None, **colonnes):
+    """
+    Insertion en masse (Core) d'utilisateurs d'une sous-classe, ex. talibes.
+    noms: fonction i -> (nom, prénom), sinon noms génériques
+    """
+    from models import db, Utilisateur
+    from recherche import texte_de
+    utilisateurs = Utilisateur.__table__
+    debut = db.session.execute(
+        utilisateurs.select().with_only_columns(utilisateurs.c.id).order_by(utilisateurs.c.id.desc()).limit(1)
+    ).scalar() or 0
+    lignes_parent = []
+    lignes_fille = []
+    for i in range(nombre):
+        identifiant = debut + i + 1
+        lignes_parent.append({
+            'id': identifiant,
+            'matricule': f'{prefixe}{i}',
+            'nom': noms(i)[0] if noms else 'Bench',
+            'prenom': noms(i)[1] if noms else f'{prefixe}{i}',
+            'email': f'{prefixe.lower()}{i}@bench.local',
+            'password_hash': 'x',
+            'role': 'TALIBE' if type_ == 'talibe' else 'ENSEIGNANT',
+            'type': type_,
+            'date_naissance': date(2010, 1, 1),
+            'lieu_naissance': 'Dakar',
+        })
+        lignes_parent[-1]['texte_recherche'] = texte_de(lignes_parent[-1])
+        ligne = {'id': identifiant}
+        for nom, valeur in colonnes.items():
+            ligne[nom] = valeur(i) if callable(valeur) else valeur
+        lignes_fille.append(ligne)
+    db.session.execute(insert(utilisateurs), lignes_parent)
+    db.session.execute(insert(table_fille), lignes_fille)
+    db.session.commit()
+
+
+def mesurer(fonction, repetitions=20):
+    """Exécute la fonction plusieurs fois, renvoie (médiane, p95) en millisecondes"""
+    fonction()  # échauffement
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return statistics.median(durees), durees[int(len(durees) * 0.95) - 1]
+
+
+def afficher(nom, mediane, p95, seuil=None):
+    statut = ''
+    if seuil is not None:
+        statut = ' OK' if p95 < seuil else f' DEPASSE ({seuil} ms)'
+    print(f'{nom:<45} median {mediane:8.2f} ms   p95 {p95:8.2f} ms{statut}')
+    return seuil is None or p95 < seuil
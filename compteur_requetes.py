@@ -0,0 +1,79 @@
+import logging
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentation SQL par requête HTTP: nombre de requêtes et temps passé en
+# base, renvoyés dans les en-têtes X-Query-Count et Server-Timing; les
+# requêtes plus lentes que SQL_SLOW_QUERY_MS sont journalisées avec leur route.
+
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _avant(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('compteur_debuts', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _apres(conn, cursor, statement, parameters, context, executemany):
+    debuts = conn.info.get('compteur_debuts')
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    if not has_request_context() or 'sql_requetes' not in g:
+        return
+
+    g.sql_requetes += 1
+    g.sql_duree += duree
+    if duree * 1000 >= g.sql_seuil_ms:
+        logger.warning("Requête SQL lente (%.1f ms) %s %s: %s",
+                       duree * 1000, request.method, request.url_rule or request.path,
+                       ' '.join(statement.split()))
+
+
+@event.listens_for(Engine, 'handle_error')
+def _erreur(contexte):
+    # after_cursor_execute n'est pas appelé si l'exécution échoue
+    if contexte.cursor is not None and contexte.connection is not None:
+        debuts = contexte.connection.info.get('compteur_debuts')
+        if debuts:
+            debuts.pop()
+
+
+def init_app(app):
+    app.config.setdefault('SQL_INSTRUMENTATION', True)
+    app.config.setdefault('SQL_SLOW_QUERY_MS', 200)
+    if not app.config['SQL_INSTRUMENTATION']:
+        return
+
+    @app.before_request
+    def _debut_requete():
+        g.sql_requetes = 0
+        g.sql_duree = 0.0
+        g.sql_seuil_ms = app.config['SQL_SLOW_QUERY_MS']
+
+    @app.after_request
+    def _entetes(response):
+        # Réponses en flux: seules les requêtes exécutées avant le premier octet sont comptées
+        if 'sql_requetes' in g:
+            response.headers['X-Query-Count'] = str(g.sql_requetes)
+            response.headers.add('Server-Timing', f'db;dur={g.sql_duree * 1000:.1f};desc="SQL"')
+        return response
+
+
+@contextmanager
+def compter_requetes(engine):
+    """Liste des requêtes SQL exécutées sur l'engine dans le bloc"""
+    requetes = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', _before)
+    try:
+        yield requetes
+    finally:
+        event.remove(engine, 'before_cursor_execute', _before)
@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from urllib.parse import quote_plus
 import cloudinary
+from pool_connexions import options_moteur
 
 class Config:
     # Secret key
@@ -23,9 +24,42 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Pool de connexions: chaque nouvelle connexion paie une poignée de main TLS
+    # (variables DB_POOL_SIZE, DB_MAX_OVERFLOW, ... voir pool_connexions.options_moteur)
+    SQLALCHEMY_ENGINE_OPTIONS = options_moteur(SQLALCHEMY_DATABASE_URI)
+
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY','mstdou331008gestiondaaras123456666')
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    # Tokens d'accès courts (les claims, dont le rôle, sont figés jusqu'à leur expiration),
+    # renouvelés via /api/refresh avec un refresh token à usage unique
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+
+    # Mots de passe: pbkdf2[:hash[:iterations]], scrypt[:n:r:p] ou argon2[:t:m:p]
+    # (les hashes existants sont mis à jour à la connexion suivante). Le pool n'est
+    # utile qu'avec des workers threadés: gunicorn -k gthread (voir railway.json)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    # Processus de hachage des imports CSV/XLSX, un pool par worker gunicorn
+    IMPORT_PROCESSUS = int(os.environ.get('IMPORT_PROCESSUS', 2))
+
+    # Limitation des tentatives de connexion: "nombre/secondes" par IP et par email
+    # (stockage 'memoire' par worker, ou redis://... partagé entre workers)
+    LOGIN_RATE_LIMIT_IP = os.environ.get('LOGIN_RATE_LIMIT_IP', '30/60')
+    LOGIN_RATE_LIMIT_EMAIL = os.environ.get('LOGIN_RATE_LIMIT_EMAIL', '10/300')
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE', 'memoire')
+    # Proxys de confiance devant l'app: l'IP du client est lue dans X-Forwarded-For.
+    # Railway/Render ajoutent un proxy; à 0 tous les clients partageraient l'IP du
+    # proxy (et son compteur). Mettre 0 si l'app est exposée directement.
+    RATELIMIT_PROXIES = int(os.environ.get('RATELIMIT_PROXIES', 1))
+
+    # Révocation des tokens à la déconnexion ('memoire' par worker, ou redis://... partagé)
+    REVOCATION_STORAGE = os.environ.get('REVOCATION_STORAGE', 'memoire')
+
+    # Journalisation (voir journalisation.init_app)
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.environ.get('LOG_LEVELS', '')  # ex. "routes.auth=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
 
 
 class TestConfig:
@@ -1,7 +1,6 @@
 from functools import wraps
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt
 from flask import jsonify
-from models import Utilisateur
 
 def role_required(required_role):
     def decorator(f):
@@ -9,13 +8,11 @@ def role_required(required_role):
         @jwt_required()
         def decorated_function(*args, **kwargs):
             try:
-                user_email = get_jwt_identity()
-                user = Utilisateur.query.filter_by(email=user_email).first()
-                
-                if not user or user.role.value != required_role:
+                # Rôle lu dans le token (claims posés à l'émission): aucune requête SQL
+                if get_jwt().get('role') != required_role:
                     return jsonify({'error': 'Accès non autorisé'}), 403
                 return f(*args, **kwargs)
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,260 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from sqlalchemy import select, Integer, Float, Boolean, Date, DateTime, Enum
+from models import (db, Utilisateur, Talibe, Enseignant, Inscription, Cours,
+                    Daara, Batiment, Chambre, Lit)
+
+# Import conditionnel pour le format Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIBLE = True
+except ImportError:
+    PARQUET_DISPONIBLE = False
+
+# Export du registre en flux: sélection de colonnes SQL (pas d'objets ORM),
+# lue par lots sur un curseur côté serveur, écrite en CSV / NDJSON / Parquet.
+# La mémoire utilisée dépend de TAILLE_LOT, pas du nombre de lignes.
+
+TAILLE_LOT = 1000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportInvalide(ValueError):
+    pass
+
+
+class Export:
+    """Colonnes exportables (nom -> expression SQL), jointures et filtres autorisés"""
+
+    def __init__(self, colonnes, depuis, filtres, ordre):
+        self.colonnes = colonnes
+        self.depuis = depuis
+        self.filtres = filtres
+        self.ordre = ordre
+
+    def requete(self, noms_colonnes=None, valeurs_filtres=None):
+        noms = noms_colonnes or list(self.colonnes)
+        inconnues = [nom for nom in noms if nom not in self.colonnes]
+        if inconnues:
+            raise ExportInvalide(f"Colonne(s) inconnue(s): {', '.join(inconnues)}")
+
+        requete = select(*[self.colonnes[nom].label(nom) for nom in noms]).select_from(self.depuis())
+        for nom, valeur in (valeurs_filtres or {}).items():
+            colonne = self.filtres[nom]
+            if isinstance(colonne.type, Integer):
+                try:
+                    valeur = int(valeur)
+                except ValueError:
+                    raise ExportInvalide(f'Le filtre {nom} doit être un entier')
+            requete = requete.where(colonne == valeur)
+        return requete.order_by(*self.ordre), noms
+
+
+EXPORTS = {
+    'talibes': Export(
+        colonnes={
+            'id': Talibe.id,
+            'matricule': Utilisateur.matricule,
+            'nom': Utilisateur.nom,
+            'prenom': Utilisateur.prenom,
+            'email': Utilisateur.email,
+            'sexe': Utilisateur.sexe,
+            'nationalite': Utilisateur.nationalite,
+            'date_naissance': Utilisateur.date_naissance,
+            'lieu_naissance': Utilisateur.lieu_naissance,
+            'date_entree': Utilisateur.date_entree,
+            'pere': Talibe.pere,
+            'mere': Talibe.mere,
+            'niveau': Talibe.niveau,
+            'extrait_naissance': Talibe.extrait_naissance,
+            'daara_id': Talibe.daara_id,
+            'chambre_id': Talibe.chambre_id,
+        },
+        depuis=lambda: Talibe.__table__.join(Utilisateur.__table__),
+        filtres={'daara_id': Talibe.daara_id, 'chambre_id': Talibe.chambre_id, 'niveau': Talibe.niveau},
+        ordre=[Talibe.id],
+    ),
+    'enseignants': Export(
+        colonnes={
+            'id': Enseignant.id,
+            'matricule': Utilisateur.matricule,
+            'nom': Utilisateur.nom,
+            'prenom': Utilisateur.prenom,
+            'email': Utilisateur.email,
+            'sexe': Utilisateur.sexe,
+            'nationalite': Utilisateur.nationalite,
+            'date_naissance': Utilisateur.date_naissance,
+            'lieu_naissance': Utilisateur.lieu_naissance,
+            'date_entree': Utilisateur.date_entree,
+            'specialite': Enseignant.specialite,
+            'telephone': Enseignant.telephone,
+            'etat_civil': Enseignant.etat_civil,
+            'grade': Enseignant.grade,
+            'diplome': Enseignant.diplome,
+            'diplome_origine': Enseignant.diplome_origine,
+            'statut': Enseignant.statut,
+            'daara_id': Enseignant.daara_id,
+        },
+        depuis=lambda: Enseignant.__table__.join(Utilisateur.__table__),
+        filtres={'daara_id': Enseignant.daara_id, 'specialite': Enseignant.specialite},
+        ordre=[Enseignant.id],
+    ),
+    'inscriptions': Export(
+        colonnes={
+            'id': Inscription.id,
+            'talibe_id': Inscription.talibe_id,
+            'talibe_matricule': Utilisateur.matricule,
+            'cours_id': Inscription.cours_id,
+            'cours_code': Cours.code,
+            'cours_libelle': Cours.libelle,
+            'date_inscription': Inscription.date_inscription,
+            'note': Inscription.note,
+        },
+        depuis=lambda: Inscription.__table__
+            .join(Utilisateur.__table__, Utilisateur.id == Inscription.talibe_id)
+            .join(Cours.__table__, Cours.id == Inscription.cours_id),
+        filtres={'talibe_id': Inscription.talibe_id, 'cours_id': Inscription.cours_id},
+        ordre=[Inscription.id],
+    ),
+    # Arbre d'hébergement aplati: une ligne par lit (ou par niveau vide)
+    'hebergement': Export(
+        colonnes={
+            'daara_id': Daara.id,
+            'daara_nom': Daara.nom,
+            'batiment_id': Batiment.id,
+            'batiment_nom': Batiment.nom,
+            'chambre_id': Chambre.id,
+            'chambre_numero': Chambre.numero,
+            'chambre_nb_lits': Chambre.nb_lits,
+            'lit_id': Lit.id,
+            'lit_numero': Lit.numero,
+            'talibe_id': Lit.talibe_id,
+        },
+        depuis=lambda: Daara.__table__
+            .outerjoin(Batiment.__table__, Batiment.daara_id == Daara.id)
+            .outerjoin(Chambre.__table__, Chambre.batiment_id == Batiment.id)
+            .outerjoin(Lit.__table__, Lit.chambre_id == Chambre.id),
+        filtres={'daara_id': Daara.id, 'batiment_id': Batiment.id, 'chambre_id': Chambre.id},
+        ordre=[Daara.id, Batiment.id, Chambre.id, Lit.id],
+    ),
+}
+
+
+def _valeur(valeur):
+    if isinstance(valeur, enum.Enum):
+        return valeur.value
+    if isinstance(valeur, (date, datetime)):
+        return valeur.isoformat()
+    return valeur
+
+
+def lots(requete):
+    """Lignes par lots de TAILLE_LOT (curseur côté serveur quand le pilote le permet)"""
+    resultat = db.session.execute(requete.execution_options(yield_per=TAILLE_LOT))
+    for partition in resultat.partitions():
+        yield partition
+
+
+def generer_csv(requete, noms):
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow(noms)
+    for partition in lots(requete):
+        ecrivain.writerows([_valeur(valeur) for valeur in ligne] for ligne in partition)
+        yield tampon.getvalue()
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():
+        yield tampon.getvalue()
+
+
+def generer_ndjson(requete, noms):
+    for partition in lots(requete):
+        yield ''.join(
+            json.dumps(dict(zip(noms, map(_valeur, ligne))), ensure_ascii=False) + '\n'
+            for ligne in partition
+        )
+
+
+# ---------------------------------------------------------------------------
+# Parquet (pyarrow): un groupe de lignes par lot, vidé au fur et à mesure
+# ---------------------------------------------------------------------------
+
+class _Tampon(io.RawIOBase):
+    """Fichier en écriture seule dont le contenu est récupéré après chaque groupe de lignes"""
+
+    def __init__(self):
+        self._morceaux = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        self._position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self._position
+
+    def vider(self):
+        contenu = b''.join(self._morceaux)
+        self._morceaux = []
+        return contenu
+
+
+def _type_arrow(type_sql):
+    if isinstance(type_sql, Enum):
+        return pa.string()
+    if isinstance(type_sql, Boolean):
+        return pa.bool_()
+    if isinstance(type_sql, Integer):
+        return pa.int64()
+    if isinstance(type_sql, Float):
+        return pa.float64()
+    if isinstance(type_sql, DateTime):
+        return pa.timestamp('us')
+    if isinstance(type_sql, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def generer_parquet(requete, noms):
+    schema = pa.schema([
+        (colonne.name, _type_arrow(colonne.type)) for colonne in requete.selected_columns
+    ])
+    tampon = _Tampon()
+    ecrivain = pq.ParquetWriter(tampon, schema)
+    try:
+        for partition in lots(requete):
+            colonnes = list(zip(*partition))
+            ecrivain.write_batch(pa.record_batch([
+                pa.array([v.value if isinstance(v, enum.Enum) else v for v in valeurs], type=champ.type)
+                for valeurs, champ in zip(colonnes, schema)
+            ], schema=schema))
+            yield tampon.vider()
+    finally:
+        ecrivain.close()
+    yield tampon.vider()
+
+
+def generateur(format_, requete, noms):
+    if format_ not in FORMATS:
+        raise ExportInvalide('Format non supporté (csv, ndjson ou parquet)')
+    if format_ == 'parquet':
+        if not PARQUET_DISPONIBLE:
+            raise ExportInvalide("L'export Parquet nécessite le paquet pyarrow")
+        return generer_parquet(requete, noms)
+    if format_ == 'ndjson':
+        return generer_ndjson(requete, noms)
+    return generer_csv(requete, noms)
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, select
+from models import db, Utilisateur, Talibe, Enseignant
+
+
+class IdentityCache:
+    """
+    Cache LRU à durée de vie limitée: email -> identité (id, rôle, type).
+    Évite une requête SQL par appel protégé dans role_required / admin_required.
+    """
+
+    def __init__(self, ttl=300, taille_max=1024):
+        self.ttl = ttl
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def get(self, email):
+        with self._verrou:
+            entree = self._entrees.get(email)
+            if entree is None:
+                return None
+            expire_a, identite = entree
+            if expire_a < time.monotonic():
+                del self._entrees[email]
+                return None
+            self._entrees.move_to_end(email)
+            return identite
+
+    def set(self, email, identite):
+        with self._verrou:
+            self._entrees[email] = (time.monotonic() + self.ttl, identite)
+            self._entrees.move_to_end(email)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def invalider(self, email):
+        with self._verrou:
+            self._entrees.pop(email, None)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def __len__(self):
+        return len(self._entrees)
+
+
+def init_app(app):
+    app.config.setdefault('IDENTITY_CACHE_TTL', 300)
+    app.config.setdefault('IDENTITY_CACHE_SIZE', 1024)
+    app.extensions['identity_cache'] = IdentityCache(
+        ttl=app.config['IDENTITY_CACHE_TTL'],
+        taille_max=app.config['IDENTITY_CACHE_SIZE']
+    )
+
+
+def _cache():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('identity_cache')
+
+
+def identite_de(user):
+    return {
+        'id': user.id,
+        'email': user.email,
+        'role': user.role.value if hasattr(user.role, 'value') else user.role,
+        'type': user.type,
+        'daara_id': getattr(user, 'daara_id', None)
+    }
+
+
+def memoriser(user):
+    """Met en cache l'identité d'un utilisateur qui vient d'être chargé ou authentifié"""
+    cache = _cache()
+    if cache is not None and user is not None:
+        cache.set(user.email, identite_de(user))
+
+
+def get_identite(email):
+    """Identité de l'utilisateur: cache d'abord, base de données en cas d'absence"""
+    cache = _cache()
+    if cache is not None:
+        identite = cache.get(email)
+        if identite is not None:
+            return identite
+    # Colonnes seules: pas de chargement de la ligne polymorphe complète
+    talibes, enseignants = Talibe.__table__, Enseignant.__table__
+    user = db.session.execute(
+        select(Utilisateur.id, Utilisateur.email, Utilisateur.role, Utilisateur.type,
+               func.coalesce(talibes.c.daara_id, enseignants.c.daara_id).label('daara_id'))
+        .outerjoin(talibes, talibes.c.id == Utilisateur.id)
+        .outerjoin(enseignants, enseignants.c.id == Utilisateur.id)
+        .where(Utilisateur.email == email)
+    ).first()
+    if not user:
+        return None
+    identite = identite_de(user)
+    if cache is not None:
+        cache.set(email, identite)
+    return identite
+
+
+def claims(email):
+    """Claims ajoutés aux tokens: l'autorisation se fait ensuite sans accès à la base"""
+    identite = get_identite(email)
+    if identite is None:
+        return {}
+    return {
+        'role': identite['role'],
+        'user_id': identite['id'],
+        'user_type': identite['type'],
+        'daara_id': identite['daara_id']
+    }
+
+
+def invalider(email):
+    cache = _cache()
+    if cache is not None:
+        cache.invalider(email)
+
+
+# Invalidation: changement de rôle / d'email / de daara, ou suppression de l'utilisateur
+@event.listens_for(Utilisateur, 'after_update', propagate=True)
+def _apres_modification(mapper, connection, target):
+    etat = inspect(target)
+    historique_email = etat.attrs.email.history
+    daara_modifie = 'daara_id' in etat.attrs.keys() and etat.attrs.daara_id.history.has_changes()
+    if not (etat.attrs.role.history.has_changes() or historique_email.has_changes() or daara_modifie):
+        return
+    for email in list(historique_email.deleted or []) + [target.email]:
+        invalider(email)
+
+
+@event.listens_for(Utilisateur, 'after_delete', propagate=True)
+def _apres_suppression(mapper, connection, target):
+    invalider(target.email)
@@ -0,0 +1,50 @@
+import io
+
+# Import conditionnel pour le traitement d'images
+try:
+    from PIL import Image, ImageOps
+    IMAGES_DISPONIBLE = True
+except ImportError:
+    IMAGES_DISPONIBLE = False
+
+# Traitement des photos avant stockage: orientation corrigée, métadonnées
+# (EXIF, GPS...) retirées, variantes réduites ré-encodées en WebP.
+
+TAILLES = {
+    'miniature': 64,
+    'moyenne': 256,
+    'grande': 1024,
+}
+FORMAT = 'WEBP'
+EXTENSION = '.webp'
+QUALITE = 80
+
+
+class ImageInvalide(ValueError):
+    pass
+
+
+def traiter(contenu):
+    """
+    Produit les variantes d'une image: {nom: {'contenu', 'largeur', 'hauteur'}}.
+    Les images ne sont jamais agrandies; la variante 'grande' remplace l'original.
+    """
+    try:
+        image = Image.open(io.BytesIO(contenu))
+        image.load()
+    except (OSError, Image.DecompressionBombError):
+        raise ImageInvalide('Image invalide')
+
+    image = ImageOps.exif_transpose(image)
+    transparente = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if transparente else 'RGB')
+
+    variantes = {}
+    for nom, taille in TAILLES.items():
+        copie = image.copy()
+        copie.thumbnail((taille, taille), Image.LANCZOS)
+        sortie = io.BytesIO()
+        # Ré-encodage sans exif/icc: les métadonnées d'origine ne sont pas conservées
+        copie.save(sortie, FORMAT, quality=QUALITE, method=4)
+        variantes[nom] = {'contenu': sortie.getvalue(), 'largeur': copie.width, 'hauteur': copie.height}
+    return variantes
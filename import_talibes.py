@@ -0,0 +1,315 @@
+import csv
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from flask import current_app
+from sqlalchemy import select, insert
+from models import db, Utilisateur, Talibe, Daara, RoleEnum
+import statistiques
+import recherche
+import mots_de_passe
+
+# Import conditionnel pour les fichiers Excel
+try:
+    import openpyxl
+    XLSX_DISPONIBLE = True
+except ImportError:
+    XLSX_DISPONIBLE = False
+
+# Import en masse de talibés (CSV / XLSX): lecture en flux, validation par
+# lots, unicité vérifiée en une requête par lot, mots de passe hachés dans
+# un pool de processus, insertion par lots.
+
+TAILLE_LOT = 1000
+# En dessous, le hachage se fait dans le processus courant (démarrage du pool inutile)
+SEUIL_POOL = 64
+PROCESSUS_PAR_DEFAUT = 2
+
+CHAMPS_REQUIS = ['matricule', 'nom', 'prenom', 'email', 'password', 'date_naissance', 'lieu_naissance']
+CHAMPS_TEXTE = ['pere', 'mere', 'niveau', 'nationalite', 'sexe', 'adresse']
+COLONNES_ERREURS = ['ligne', 'matricule', 'email', 'erreur']
+
+
+class FormatNonSupporte(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Lecture en flux
+# ---------------------------------------------------------------------------
+
+def _normaliser_entete(entete):
+    return [str(colonne or '').strip().lower() for colonne in entete]
+
+
+def lire_csv(flux):
+    """Lignes (numéro, dict) d'un fichier CSV, sans le charger en mémoire"""
+    texte = io.TextIOWrapper(flux, encoding='utf-8-sig', newline='')
+    echantillon = texte.read(4096)
+    texte.seek(0)
+    try:
+        dialecte = csv.Sniffer().sniff(echantillon, delimiters=',;\t')
+    except csv.Error:
+        dialecte = csv.excel
+    lecteur = csv.reader(texte, dialecte)
+    entete = _normaliser_entete(next(lecteur, []))
+    for numero, valeurs in enumerate(lecteur, start=2):
+        if any(valeurs):
+            yield numero, dict(zip(entete, valeurs))
+
+
+def lire_xlsx(flux):
+    """Lignes (numéro, dict) de la première feuille d'un classeur XLSX (mode lecture seule)"""
+    if not XLSX_DISPONIBLE:
+        raise FormatNonSupporte("L'import XLSX nécessite le paquet openpyxl")
+    classeur = openpyxl.load_workbook(flux, read_only=True, data_only=True)
+    try:
+        lignes = classeur.worksheets[0].iter_rows(values_only=True)
+        entete = _normaliser_entete(next(lignes, []))
+        for numero, valeurs in enumerate(lignes, start=2):
+            if any(valeur not in (None, '') for valeur in valeurs):
+                yield numero, dict(zip(entete, valeurs))
+    finally:
+        classeur.close()
+
+
+def lire_fichier(flux, nom_fichier):
+    extension = os.path.splitext(nom_fichier or '')[1].lower()
+    if extension == '.csv':
+        return lire_csv(flux)
+    if extension == '.xlsx':
+        return lire_xlsx(flux)
+    raise FormatNonSupporte('Format non supporté (CSV ou XLSX attendu)')
+
+
+def par_lots(lignes, taille=TAILLE_LOT):
+    lot = []
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+def _texte(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, float) and valeur.is_integer():
+        valeur = int(valeur)
+    return str(valeur).strip()
+
+
+def _date(valeur):
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    if isinstance(valeur, date):
+        return valeur
+    return datetime.strptime(_texte(valeur), '%Y-%m-%d').date()
+
+
+def _booleen(valeur):
+    return _texte(valeur).lower() in ('1', 'true', 'vrai', 'oui', 'x')
+
+
+def valider_ligne(brute):
+    """Convertit une ligne brute en colonnes de Talibe; renvoie (valeurs, erreurs)"""
+    erreurs = []
+    valeurs = {}
+    for champ in CHAMPS_REQUIS:
+        if not _texte(brute.get(champ)):
+            erreurs.append(f'Le champ {champ} est requis')
+    if erreurs:
+        return None, erreurs
+
+    valeurs['matricule'] = _texte(brute['matricule'])
+    valeurs['nom'] = _texte(brute['nom'])
+    valeurs['prenom'] = _texte(brute['prenom'])
+    valeurs['email'] = _texte(brute['email'])
+    valeurs['password'] = _texte(brute['password'])
+    valeurs['lieu_naissance'] = _texte(brute['lieu_naissance'])
+    if len(valeurs['matricule']) > 20:
+        erreurs.append('Le matricule dépasse 20 caractères')
+    if '@' not in valeurs['email']:
+        erreurs.append('Email invalide')
+
+    for champ in ('date_naissance', 'date_entree'):
+        if _texte(brute.get(champ)):
+            try:
+                valeurs[champ] = _date(brute[champ])
+            except ValueError:
+                erreurs.append(f'Le champ {champ} doit être au format AAAA-MM-JJ')
+    valeurs.setdefault('date_entree', datetime.now().date())
+
+    for champ in CHAMPS_TEXTE:
+        if _texte(brute.get(champ)):
+            valeurs[champ] = _texte(brute[champ])
+    valeurs.setdefault('niveau', 'Débutant')
+    valeurs['extrait_naissance'] = _booleen(brute.get('extrait_naissance'))
+
+    if _texte(brute.get('daara_id')):
+        try:
+            valeurs['daara_id'] = int(_texte(brute['daara_id']))
+        except ValueError:
+            erreurs.append('daara_id doit être un entier')
+
+    return (None if erreurs else valeurs), erreurs
+
+
+def _existants(colonne, valeurs):
+    if not valeurs:
+        return set()
+    return set(db.session.execute(select(colonne).where(colonne.in_(valeurs))).scalars())
+
+
+# Un seul pool pour tout le processus, partagé par les imports concurrents.
+# Processus démarrés par 'spawn': pas de fork d'un worker threadé qui détient
+# les connexions SQL, le thread de journalisation et le pool de hachage.
+_pool = None
+_verrou_pool = threading.Lock()
+
+
+def pool_hachage():
+    """Pool de processus des imports (IMPORT_PROCESSUS), créé au premier usage; None si <= 1"""
+    global _pool
+    processus = int(current_app.config.get('IMPORT_PROCESSUS', PROCESSUS_PAR_DEFAUT))
+    if processus <= 1:
+        return None
+    with _verrou_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processus,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _hacher(clairs, pool):
+    methode = current_app.config.get('IMPORT_PASSWORD_HASH_METHOD') or mots_de_passe.methode_courante()
+    hacher = partial(mots_de_passe.hacher_avec, methode)
+    if pool is None or len(clairs) < SEUIL_POOL:
+        return [hacher(mot_de_passe) for mot_de_passe in clairs]
+    return list(pool.map(hacher, clairs, chunksize=32))
+
+
+class RapportImport:
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.lignes = 0
+        self.valides = 0
+        self.importes = 0
+        self.erreurs = []
+
+    def erreur(self, numero, brute, messages):
+        for message in messages:
+            self.erreurs.append({
+                'ligne': numero,
+                'matricule': _texte(brute.get('matricule')),
+                'email': _texte(brute.get('email')),
+                'erreur': message
+            })
+
+    def to_dict(self):
+        return {
+            'dry_run': self.dry_run,
+            'lignes': self.lignes,
+            'valides': self.valides,
+            'importes': self.importes,
+            'lignes_en_erreur': len({erreur['ligne'] for erreur in self.erreurs}),
+            'erreurs': self.erreurs
+        }
+
+    def erreurs_csv(self):
+        """Fichier d'erreurs (une ligne par erreur) au format CSV"""
+        sortie = io.StringIO()
+        ecrivain = csv.DictWriter(sortie, fieldnames=COLONNES_ERREURS)
+        ecrivain.writeheader()
+        ecrivain.writerows(self.erreurs)
+        return sortie.getvalue()
+
+
+def _traiter_lot(lot, rapport, vus_matricules, vus_emails, pool):
+    candidats = []
+    for numero, brute in lot:
+        rapport.lignes += 1
+        valeurs, erreurs = valider_ligne(brute)
+        if erreurs:
+            rapport.erreur(numero, brute, erreurs)
+            continue
+        if valeurs['matricule'] in vus_matricules:
+            erreurs.append('Matricule en double dans le fichier')
+        if valeurs['email'] in vus_emails:
+            erreurs.append('Email en double dans le fichier')
+        vus_matricules.add(valeurs['matricule'])
+        vus_emails.add(valeurs['email'])
+        if erreurs:
+            rapport.erreur(numero, brute, erreurs)
+            continue
+        candidats.append((numero, brute, valeurs))
+
+    # Unicité et clés étrangères: une requête par colonne pour tout le lot
+    matricules_pris = _existants(Utilisateur.matricule, [v['matricule'] for _, _, v in candidats])
+    emails_pris = _existants(Utilisateur.email, [v['email'] for _, _, v in candidats])
+    daaras = _existants(Daara.id, {v['daara_id'] for _, _, v in candidats if 'daara_id' in v})
+
+    valides = []
+    for numero, brute, valeurs in candidats:
+        erreurs = []
+        if valeurs['matricule'] in matricules_pris:
+            erreurs.append('Un utilisateur avec ce matricule existe déjà')
+        if valeurs['email'] in emails_pris:
+            erreurs.append('Un utilisateur avec cet email existe déjà')
+        if 'daara_id' in valeurs and valeurs['daara_id'] not in daaras:
+            erreurs.append('Daara non trouvé')
+        if erreurs:
+            rapport.erreur(numero, brute, erreurs)
+        else:
+            valides.append(valeurs)
+    rapport.valides += len(valides)
+
+    if rapport.dry_run or not valides:
+        return
+
+    hashes = _hacher([valeurs.pop('password') for valeurs in valides], pool)
+    for valeurs, password_hash in zip(valides, hashes):
+        valeurs['password_hash'] = password_hash
+        valeurs['role'] = RoleEnum.TALIBE
+        valeurs['type'] = 'talibe'
+        # L'insertion en masse ne passe pas par les événements before_insert
+        valeurs['texte_recherche'] = recherche.texte_de(valeurs)
+    # INSERT ORM en masse: utilisateurs puis talibes, par lots multi-lignes
+    db.session.execute(insert(Talibe), valides)
+    rapport.importes += len(valides)
+
+
+def importer(lignes, dry_run=False):
+    """
+    Importe des talibés à partir de lignes (numéro, dict). En dry_run, valide
+    seulement. Les lignes en erreur sont ignorées et listées dans le rapport.
+    """
+    rapport = RapportImport(dry_run)
+    vus_matricules = set()
+    vus_emails = set()
+    pool = None if dry_run else pool_hachage()
+    try:
+        for lot in par_lots(lignes):
+            _traiter_lot(lot, rapport, vus_matricules, vus_emails, pool)
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # L'insertion en masse ne déclenche pas les événements ORM
+    if rapport.importes:
+        statistiques.reconstruire()
+    return rapport
@@ -0,0 +1,141 @@
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import select, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Inscription, Talibe, Cours
+
+# Inscription en masse (matrice talibés × cours): les paires existantes sont
+# détectées en une requête, les nouvelles insérées par INSERT multi-lignes.
+
+INSCRIT = 'inscrit'
+DEJA_INSCRIT = 'deja_inscrit'
+COURS_COMPLET = 'cours_complet'
+TALIBE_INTROUVABLE = 'talibe_introuvable'
+COURS_INTROUVABLE = 'cours_introuvable'
+DOUBLON = 'doublon'
+
+TAILLE_LOT = 1000
+
+inscriptions = Inscription.__table__
+
+
+def paires_depuis(data):
+    """
+    Paires (talibe_id, cours_id) à partir du corps de la requête:
+    {"talibe_ids": [...], "cours_ids": [...]} (produit cartésien) ou
+    {"paires": [{"talibe_id": .., "cours_id": ..}, ...]}
+    """
+    if 'paires' in data:
+        paires = data['paires']
+        if not isinstance(paires, list):
+            raise ValueError('paires doit être une liste')
+        try:
+            return [(int(p['talibe_id']), int(p['cours_id'])) for p in paires]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Chaque paire doit contenir talibe_id et cours_id')
+
+    talibe_ids = data.get('talibe_ids')
+    cours_ids = data.get('cours_ids')
+    if not isinstance(talibe_ids, list) or not isinstance(cours_ids, list):
+        raise ValueError('Les listes talibe_ids et cours_ids sont requises')
+    try:
+        return [(int(t), int(c)) for t in talibe_ids for c in cours_ids]
+    except (TypeError, ValueError):
+        raise ValueError('Les identifiants doivent être des entiers')
+
+
+def _insert_sans_conflit():
+    """INSERT ... ON CONFLICT DO NOTHING sur unique_inscription si le dialecte le permet"""
+    dialecte = db.engine.dialect.name
+    if dialecte == 'postgresql':
+        return postgresql.insert(inscriptions).on_conflict_do_nothing(constraint='unique_inscription')
+    if dialecte == 'sqlite':
+        return sqlite.insert(inscriptions).on_conflict_do_nothing(index_elements=['talibe_id', 'cours_id'])
+    return insert(inscriptions)
+
+
+def inscrire_en_masse(paires, note=None):
+    """
+    Inscrit chaque paire (talibe_id, cours_id) en respectant Cours.capacite_max,
+    dans l'ordre de la requête. Renvoie un rapport par paire (voir les statuts
+    ci-dessus); ne valide pas la transaction.
+    """
+    talibe_ids = {t for t, _ in paires}
+    cours_ids = {c for _, c in paires}
+
+    talibes_existants = set(db.session.execute(
+        select(Talibe.id).where(Talibe.id.in_(talibe_ids))
+    ).scalars()) if talibe_ids else set()
+
+    # Verrou sur les cours pour que deux imports concurrents ne dépassent pas la capacité
+    capacites = dict(db.session.execute(
+        select(Cours.id, Cours.capacite_max)
+        .where(Cours.id.in_(cours_ids))
+        .with_for_update()
+    ).all()) if cours_ids else {}
+
+    inscrits_par_cours = dict(db.session.execute(
+        select(inscriptions.c.cours_id, func.count())
+        .where(inscriptions.c.cours_id.in_(capacites))
+        .group_by(inscriptions.c.cours_id)
+    ).all()) if capacites else {}
+
+    # Une seule requête pour toutes les paires déjà présentes
+    existantes = set(db.session.execute(
+        select(inscriptions.c.talibe_id, inscriptions.c.cours_id)
+        .where(inscriptions.c.talibe_id.in_(talibes_existants))
+        .where(inscriptions.c.cours_id.in_(capacites))
+    ).tuples()) if talibes_existants and capacites else set()
+
+    places = {
+        cours_id: (capacite or 0) - inscrits_par_cours.get(cours_id, 0)
+        for cours_id, capacite in capacites.items()
+    }
+
+    resultats = []
+    vues = set()
+    a_inserer = []
+    for talibe_id, cours_id in paires:
+        if (talibe_id, cours_id) in vues:
+            statut = DOUBLON
+        elif talibe_id not in talibes_existants:
+            statut = TALIBE_INTROUVABLE
+        elif cours_id not in capacites:
+            statut = COURS_INTROUVABLE
+        elif (talibe_id, cours_id) in existantes:
+            statut = DEJA_INSCRIT
+        elif places[cours_id] <= 0:
+            statut = COURS_COMPLET
+        else:
+            statut = INSCRIT
+            places[cours_id] -= 1
+            a_inserer.append((talibe_id, cours_id))
+        vues.add((talibe_id, cours_id))
+        resultats.append({'talibe_id': talibe_id, 'cours_id': cours_id, 'statut': statut})
+
+    maintenant = datetime.now(timezone.utc)
+    requete = _insert_sans_conflit()
+    avec_returning = db.engine.dialect.insert_returning
+    if avec_returning:
+        requete = requete.returning(inscriptions.c.talibe_id, inscriptions.c.cours_id)
+    inseres = set()
+    for debut in range(0, len(a_inserer), TAILLE_LOT):
+        lot = a_inserer[debut:debut + TAILLE_LOT]
+        insertion = db.session.execute(requete.values([
+            {'talibe_id': talibe_id, 'cours_id': cours_id,
+             'date_inscription': maintenant, 'note': note}
+            for talibe_id, cours_id in lot
+        ]))
+        if avec_returning:
+            inseres.update(insertion.tuples())
+
+    # Paire insérée entre-temps par une autre transaction (ignorée par ON CONFLICT)
+    if avec_returning:
+        for resultat in resultats:
+            if resultat['statut'] == INSCRIT and (resultat['talibe_id'], resultat['cours_id']) not in inseres:
+                resultat['statut'] = DEJA_INSCRIT
+
+    return {
+        'resultats': resultats,
+        'resume': dict(Counter(resultat['statut'] for resultat in resultats))
+    }
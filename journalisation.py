@@ -0,0 +1,165 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import has_request_context, request
+
+# Journalisation de l'application: une ligne JSON par événement, écrite par un
+# thread dédié (les requêtes ne font qu'ajouter à une file), niveaux réglables
+# par module et secrets masqués avant la mise en file.
+#
+#     logger = logging.getLogger(__name__)
+#     logger.debug("Connexion", extra={'donnees': data})  # data n'est sérialisé que si DEBUG est actif
+
+CLES_SECRETES = re.compile(
+    r'pass(word)?|mot_de_passe|secret|token|authorization|api_key|cookie', re.IGNORECASE
+)
+MASQUE = '***'
+# "password": "x", password=x, 'token': 'x' dans un message déjà formaté
+_SECRET_DANS_TEXTE = re.compile(
+    r"""(?P<cle>["']?[\w-]*(?:pass(?:word)?|mot_de_passe|secret|token|api_key)[\w-]*["']?\s*[:=]\s*)"""
+    r"""(?P<valeur>"[^"]*"|'[^']*'|[^\s,;&}]+)""",
+    re.IGNORECASE
+)
+
+# Attributs standard d'un LogRecord: tout le reste vient de extra={...}
+_ATTRIBUTS_STANDARD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+
+def masquer(valeur):
+    """Copie de valeur où les champs dont le nom évoque un secret sont masqués"""
+    if isinstance(valeur, dict):
+        return {
+            cle: MASQUE if isinstance(cle, str) and CLES_SECRETES.search(cle) else masquer(v)
+            for cle, v in valeur.items()
+        }
+    if isinstance(valeur, (list, tuple)):
+        return type(valeur)(masquer(v) for v in valeur)
+    if isinstance(valeur, str):
+        return _SECRET_DANS_TEXTE.sub(lambda m: m.group('cle') + MASQUE, valeur)
+    return valeur
+
+
+def _champs(record):
+    return {cle: valeur for cle, valeur in vars(record).items() if cle not in _ATTRIBUTS_STANDARD}
+
+
+class FiltreSecrets(logging.Filter):
+    """Masque les secrets des arguments, du message et des champs extra"""
+
+    def filter(self, record):
+        if record.args:
+            # Masquer le gabarit casserait le formatage %: on masque le message formaté
+            try:
+                message = record.getMessage()
+            except (TypeError, ValueError):
+                pass  # message invalide: signalé par le handler (handleError)
+            else:
+                record.msg, record.args = masquer(message), None
+        elif isinstance(record.msg, str):
+            record.msg = masquer(record.msg)
+        for cle, valeur in _champs(record).items():
+            setattr(record, cle, MASQUE if CLES_SECRETES.search(cle) else masquer(valeur))
+        return True
+
+
+class HandlerFile(QueueHandler):
+    """
+    QueueHandler qui ne fait que figer le message dans le thread appelant;
+    la sérialisation JSON et l'écriture se font dans le thread du listener
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context():
+            record.methode = request.method
+            record.chemin = request.path
+        return record
+
+
+class FormateurJSON(logging.Formatter):
+    def format(self, record):
+        entree = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entree.update(_champs(record))
+        if record.exc_text:
+            entree['exception'] = record.exc_text
+        elif record.exc_info:
+            entree['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entree, ensure_ascii=False, default=str)
+
+
+def _niveaux(valeur):
+    """'routes.auth=DEBUG,sqlalchemy.engine=WARNING' (ou dict) -> {module: niveau}"""
+    if isinstance(valeur, dict):
+        return valeur
+    niveaux = {}
+    for element in (valeur or '').split(','):
+        if '=' in element:
+            module, niveau = element.split('=', 1)
+            niveaux[module.strip()] = niveau.strip().upper()
+    return niveaux
+
+
+def _arreter():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_app(app):
+    """
+    Configure la journalisation du processus: LOG_LEVEL (niveau racine),
+    LOG_LEVELS (niveaux par module), LOG_FORMAT ('json' ou 'texte'),
+    LOG_ASYNC (écriture dans un thread dédié)
+    """
+    global _listener
+    app.config.setdefault('LOG_LEVEL', 'INFO')
+    app.config.setdefault('LOG_LEVELS', '')
+    app.config.setdefault('LOG_FORMAT', 'json')
+    app.config.setdefault('LOG_ASYNC', True)
+
+    racine = logging.getLogger()
+    racine.setLevel(app.config['LOG_LEVEL'])
+    for module, niveau in _niveaux(app.config['LOG_LEVELS']).items():
+        logging.getLogger(module).setLevel(niveau)
+
+    # Une seule configuration des handlers par processus (plusieurs create_app en test)
+    if any(getattr(handler, '_journalisation', False) for handler in racine.handlers):
+        return
+
+    sortie = logging.StreamHandler(sys.stdout)
+    if app.config['LOG_FORMAT'] == 'json':
+        sortie.setFormatter(FormateurJSON())
+    else:
+        sortie.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    if app.config['LOG_ASYNC']:
+        file = queue.SimpleQueue()
+        handler = HandlerFile(file)
+        _listener = QueueListener(file, sortie, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_arreter)
+    else:
+        handler = sortie
+    handler.addFilter(FiltreSecrets())
+    handler._journalisation = True
+    racine.addHandler(handler)
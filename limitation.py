@@ -0,0 +1,248 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from flask import current_app, has_app_context, request
+
+# Import conditionnel pour redis
+try:
+    import redis
+    REDIS_DISPONIBLE = True
+except ImportError:
+    REDIS_DISPONIBLE = False
+
+# Limitation des tentatives de connexion (bourrage d'identifiants): fenêtres
+# glissantes par IP et par email, vérifiées avant tout calcul de hash.
+#
+# Fenêtre glissante approchée par deux compteurs fixes: le compteur de la
+# fenêtre précédente est pondéré par la part de celle-ci encore couverte.
+# Deux clés par règle et par identifiant, une seule aller-retour vers Redis.
+#
+#     LOGIN_RATE_LIMIT_IP = '30/60'       # 30 tentatives par IP sur 60 s glissantes
+#     LOGIN_RATE_LIMIT_EMAIL = '10/300'   # remis à zéro par une connexion réussie
+#     RATELIMIT_STORAGE = 'memoire'       # ou redis://hote:6379/0 (partagé entre workers)
+
+logger = logging.getLogger(__name__)
+
+
+class TropDeTentatives(Exception):
+    """Limite atteinte: la tentative est refusée sans vérifier le mot de passe"""
+
+    def __init__(self, regle, attente):
+        super().__init__(f'Limite {regle} atteinte')
+        self.regle = regle
+        self.attente = attente
+
+
+@lru_cache(maxsize=32)
+def regle(valeur):
+    """'10/60' -> (10, 60): nombre de tentatives autorisées sur une fenêtre en secondes"""
+    try:
+        limite, fenetre = (int(partie) for partie in str(valeur).split('/'))
+    except ValueError:
+        raise ValueError(f'Limite invalide (attendu "nombre/secondes"): {valeur}')
+    if limite < 1 or fenetre < 1:
+        raise ValueError(f'Limite invalide (attendu "nombre/secondes"): {valeur}')
+    return limite, fenetre
+
+
+# ---------------------------------------------------------------------------
+# Compteurs
+# ---------------------------------------------------------------------------
+
+class Compteurs(ABC):
+    @abstractmethod
+    def incrementer(self, cle, cle_precedente, ttl):
+        """
+        Incrémente cle (qui expire après ttl secondes) et renvoie
+        (valeur de cle, valeur de cle_precedente)
+        """
+
+    @abstractmethod
+    def supprimer(self, *cles):
+        pass
+
+
+class CompteursMemoire(Compteurs):
+    """Compteurs du processus: limites par worker avec plusieurs workers gunicorn"""
+
+    def __init__(self, taille_max=10000, horloge=time.monotonic):
+        self.taille_max = taille_max
+        self._horloge = horloge
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def _lire(self, cle, maintenant):
+        entree = self._entrees.get(cle)
+        if entree is None or entree[1] <= maintenant:
+            return 0
+        return entree[0]
+
+    def incrementer(self, cle, cle_precedente, ttl):
+        with self._verrou:
+            maintenant = self._horloge()
+            valeur = self._lire(cle, maintenant) + 1
+            self._entrees[cle] = (valeur, maintenant + ttl)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+            return valeur, self._lire(cle_precedente, maintenant)
+
+    def supprimer(self, *cles):
+        with self._verrou:
+            for cle in cles:
+                self._entrees.pop(cle, None)
+
+    def __len__(self):
+        return len(self._entrees)
+
+
+class CompteursRedis(Compteurs):
+    """
+    Compteurs partagés via le protocole Redis (INCR, EXPIRE, GET, DEL):
+    client redis-py ou tout objet offrant la même interface
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def depuis_url(cls, url):
+        if not REDIS_DISPONIBLE:
+            raise ValueError("RATELIMIT_STORAGE redis:// nécessite le paquet redis")
+        # Délais courts: un Redis indisponible ne doit pas bloquer les connexions
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    def incrementer(self, cle, cle_precedente, ttl):
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.incr(cle)
+        pipeline.expire(cle, ttl)
+        pipeline.get(cle_precedente)
+        valeur, _, precedente = pipeline.execute()
+        return int(valeur), int(precedente or 0)
+
+    def supprimer(self, *cles):
+        self.client.delete(*cles)
+
+
+# ---------------------------------------------------------------------------
+# Limiteur
+# ---------------------------------------------------------------------------
+
+def _attente(courant, precedent, ecoule, fenetre, limite):
+    """Secondes avant qu'une nouvelle tentative repasse sous la limite"""
+    if precedent and courant < limite:
+        # Dans la fenêtre courante, quand le poids du précédent aura assez baissé
+        return fenetre * (1 - (limite - courant - 1) / precedent) - ecoule
+    # Dans la fenêtre suivante, où le compteur courant devient le précédent
+    return fenetre - ecoule + max(0, fenetre * (1 - (limite - 1) / courant))
+
+
+class Limiteur:
+    def __init__(self, compteurs, prefixe='limitation:', horloge=time.time):
+        self.compteurs = compteurs
+        self.prefixe = prefixe
+        self._horloge = horloge
+
+    def _cles(self, nom, identifiant, fenetre, index):
+        base = f'{self.prefixe}{nom}:{fenetre}:{identifiant}:'
+        return base + str(index), base + str(index - 1)
+
+    def tenter(self, nom, identifiant, limite, fenetre):
+        """Compte une tentative; TropDeTentatives si la fenêtre glissante dépasse la limite"""
+        maintenant = self._horloge()
+        index = int(maintenant // fenetre)
+        cle, cle_precedente = self._cles(nom, identifiant, fenetre, index)
+        courant, precedent = self.compteurs.incrementer(cle, cle_precedente, 2 * fenetre)
+
+        ecoule = maintenant - index * fenetre
+        if precedent * (1 - ecoule / fenetre) + courant > limite:
+            attente = _attente(courant, precedent, ecoule, fenetre, limite)
+            raise TropDeTentatives(nom, max(1, math.ceil(attente)))
+
+    def reinitialiser(self, nom, identifiant, fenetre):
+        index = int(self._horloge() // fenetre)
+        self.compteurs.supprimer(*self._cles(nom, identifiant, fenetre, index))
+
+
+def _limiteur():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('limitation')
+
+
+def _ip():
+    """Adresse du client; derrière RATELIMIT_PROXIES proxys, lue dans X-Forwarded-For"""
+    proxys = int(current_app.config.get('RATELIMIT_PROXIES', 0))
+    if proxys:
+        adresses = [a.strip() for a in request.headers.get('X-Forwarded-For', '').split(',') if a.strip()]
+        if len(adresses) >= proxys:
+            return adresses[-proxys]
+    return request.remote_addr or 'inconnue'
+
+
+def _empreinte(email):
+    # Pas d'email en clair dans le stockage partagé
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+def verifier_connexion(email):
+    """
+    Compte une tentative de connexion pour l'IP et pour l'email;
+    TropDeTentatives si l'une des deux limites est dépassée
+    """
+    limiteur = _limiteur()
+    if limiteur is None:
+        return
+    tentatives = (
+        ('login_ip', _ip(), current_app.config['LOGIN_RATE_LIMIT_IP']),
+        ('login_email', _empreinte(email), current_app.config['LOGIN_RATE_LIMIT_EMAIL']),
+    )
+    for nom, identifiant, valeur in tentatives:
+        try:
+            limiteur.tenter(nom, identifiant, *regle(valeur))
+        except TropDeTentatives:
+            raise
+        except Exception:
+            # Stockage indisponible: on laisse passer plutôt que de bloquer toutes les connexions
+            logger.warning("Limitation des connexions indisponible", exc_info=True)
+            return
+
+
+def connexion_reussie(email):
+    """Remet à zéro le compteur de l'email (l'IP reste comptée)"""
+    limiteur = _limiteur()
+    if limiteur is None:
+        return
+    _, fenetre = regle(current_app.config['LOGIN_RATE_LIMIT_EMAIL'])
+    try:
+        limiteur.reinitialiser('login_email', _empreinte(email), fenetre)
+    except Exception:
+        logger.warning("Limitation des connexions indisponible", exc_info=True)
+
+
+def init_app(app):
+    app.config.setdefault('RATELIMIT_ENABLED', True)
+    app.config.setdefault('RATELIMIT_STORAGE', 'memoire')
+    app.config.setdefault('RATELIMIT_PROXIES', 0)
+    app.config.setdefault('LOGIN_RATE_LIMIT_IP', '30/60')
+    app.config.setdefault('LOGIN_RATE_LIMIT_EMAIL', '10/300')
+    # Limites invalides: erreur au démarrage plutôt qu'à la première connexion
+    regle(app.config['LOGIN_RATE_LIMIT_IP'])
+    regle(app.config['LOGIN_RATE_LIMIT_EMAIL'])
+
+    if not app.config['RATELIMIT_ENABLED']:
+        app.extensions['limitation'] = None
+        return
+    stockage = app.config['RATELIMIT_STORAGE']
+    if stockage == 'memoire':
+        compteurs = CompteursMemoire()
+    elif stockage.startswith(('redis://', 'rediss://', 'unix://')):
+        compteurs = CompteursRedis.depuis_url(stockage)
+    else:
+        raise ValueError(f"RATELIMIT_STORAGE inconnu: {stockage}")
+    app.extensions['limitation'] = Limiteur(compteurs)
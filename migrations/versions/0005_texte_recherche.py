@@ -0,0 +1,107 @@
+"""texte de recherche
+
+Revision ID: 0005_texte_recherche
+Revises: 0004_photo_variantes
+Create Date: 2026-10-17 22:01:15.981534
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_texte_recherche'
+down_revision = '0004_photo_variantes'
+branch_labels = None
+depends_on = None
+
+# Index de /api/search (voir recherche.py): GIN pg_trgm sous PostgreSQL,
+# table FTS5 synchronisée par des triggers sous SQLite
+FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS utilisateurs_fts USING fts5("
+    "texte_recherche, content='utilisateurs', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_ai AFTER INSERT ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(rowid, texte_recherche) VALUES (new.id, new.texte_recherche); END",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_ad AFTER DELETE ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts, rowid, texte_recherche) "
+    "VALUES ('delete', old.id, old.texte_recherche); END",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_au AFTER UPDATE OF texte_recherche ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts, rowid, texte_recherche) "
+    "VALUES ('delete', old.id, old.texte_recherche); "
+    "INSERT INTO utilisateurs_fts(rowid, texte_recherche) VALUES (new.id, new.texte_recherche); END",
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts) VALUES ('rebuild')",
+]
+
+
+# Normalisation de recherche.py figée à cette révision: une évolution du code
+# de l'application ne doit pas changer ce que fait cette migration
+CHAMPS = ('nom', 'prenom', 'matricule', 'email', 'pere', 'mere')
+_LETTRES = str.maketrans({'ŋ': 'n', 'Ŋ': 'n', 'ß': 'ss', 'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe'})
+
+
+def normaliser(texte):
+    decompose = unicodedata.normalize('NFKD', (texte or '').translate(_LETTRES))
+    sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^\w@.\-]+', ' ', sans_accents.lower()).split())
+
+
+def texte_de(ligne):
+    return normaliser(' '.join(str(ligne[champ]) for champ in CHAMPS if ligne[champ]))
+
+
+def remplir_texte_recherche(connection):
+    """Texte normalisé des utilisateurs existants (comme recherche.reindexer)"""
+    utilisateurs = sa.table('utilisateurs', sa.column('id'), sa.column('texte_recherche'),
+                            *[sa.column(champ) for champ in ('nom', 'prenom', 'matricule', 'email')])
+    talibes = sa.table('talibes', sa.column('id'), sa.column('pere'), sa.column('mere'))
+    lignes = connection.execute(
+        sa.select(utilisateurs.c.id, utilisateurs.c.nom, utilisateurs.c.prenom,
+                  utilisateurs.c.matricule, utilisateurs.c.email, talibes.c.pere, talibes.c.mere)
+        .select_from(utilisateurs.outerjoin(talibes, talibes.c.id == utilisateurs.c.id))
+    ).mappings().all()
+    if lignes:
+        connection.execute(
+            utilisateurs.update()
+            .where(utilisateurs.c.id == sa.bindparam('b_id'))
+            .values(texte_recherche=sa.bindparam('b_texte')),
+            [{'b_id': ligne['id'], 'b_texte': texte_de(ligne)} for ligne in lignes]
+        )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('utilisateurs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('texte_recherche', sa.Text(), nullable=True))
+
+    # ### end Alembic commands ###
+    connection = op.get_bind()
+    remplir_texte_recherche(connection)
+
+    if connection.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index('ix_utilisateurs_texte_recherche_trgm', 'utilisateurs', ['texte_recherche'],
+                        unique=False, postgresql_using='gin',
+                        postgresql_ops={'texte_recherche': 'gin_trgm_ops'})
+    elif connection.dialect.name == 'sqlite':
+        for instruction in FTS_SQLITE:
+            op.execute(instruction)
+
+
+def downgrade():
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        op.drop_index('ix_utilisateurs_texte_recherche_trgm', table_name='utilisateurs')
+    elif connection.dialect.name == 'sqlite':
+        for trigger in ('utilisateurs_fts_ai', 'utilisateurs_fts_ad', 'utilisateurs_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS utilisateurs_fts")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('utilisateurs', schema=None) as batch_op:
+        batch_op.drop_column('texte_recherche')
+
+    # ### end Alembic commands ###
@@ -1,9 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import select, func
+from sqlalchemy.orm import (selectinload, joinedload, selectin_polymorphic,
+                            query_expression, with_expression, aliased)
+import mots_de_passe
 import enum
 from datetime import datetime, timezone
-import cloudinary
-import cloudinary.utils
+from photos import url_photo, url_variante, urls_utilisateur
 
 # Créer l'instance SQLAlchemy SANS l'initialiser immédiatement
 db = SQLAlchemy()
@@ -64,11 +66,24 @@ class Utilisateur(db.Model):
     role = db.Column(db.Enum(RoleEnum), nullable=False)
 
     photo_profil = db.Column(db.String(255))
+    # Variantes produites à l'envoi: {'miniature': public_id, 'moyenne': ..., 'grande': ...}
+    photo_variantes = db.Column(db.JSON)
 
-    type = db.Column(db.String(20))
+    type = db.Column(db.String(20), index=True)
     sexe = db.Column(db.String(20))
     nationalite = db.Column(db.String(50))
 
+    # Nom, prénom, matricule, email (+ père, mère) sans accents ni majuscules,
+    # tenu à jour par recherche.py
+    texte_recherche = db.Column(db.Text)
+
+    __table_args__ = (
+        # Trigrammes (pg_trgm) pour /api/search; SQLite utilise une table FTS5
+        db.Index('ix_utilisateurs_texte_recherche_trgm', 'texte_recherche',
+                 postgresql_using='gin',
+                 postgresql_ops={'texte_recherche': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     __mapper_args__ = {
         'polymorphic_identity': 'utilisateur',
         'polymorphic_on': type
@@ -82,10 +97,17 @@ class Utilisateur(db.Model):
     # Sécurité : gestion des passwords
     # -------------------------------
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = mots_de_passe.hacher(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """
+        Vérifie le mot de passe; s'il est correct mais haché avec d'anciens
+        paramètres, le ré-hache (modification à valider par l'appelant)
+        """
+        valide = mots_de_passe.verifier(self.password_hash, password)
+        if valide and mots_de_passe.a_rehacher(self.password_hash):
+            self.password_hash = mots_de_passe.hacher(password)
+        return valide
 
     # -------------------------------
     # Propriétés dynamiques
@@ -111,14 +133,22 @@ class Utilisateur(db.Model):
     # -------------------------------
     # Sérialisation JSON
     # -------------------------------
-    def to_dict(self):
-        photo_url = None
-        if self.photo_profil:
-            photo_url, options = cloudinary.utils.cloudinary_url(
-                self.photo_profil,
-                secure=True
-            )
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement nécessaires à to_dict() pour une liste mixte d'utilisateurs"""
+        return [
+            selectin_polymorphic(Utilisateur, [Talibe, Enseignant, Admin]),
+            selectinload(Talibe.cours).options(*Cours.serialization_options()),
+            selectinload(Enseignant.cours).options(*Cours.serialization_options()),
+        ]
+
+    def photo_url(self, variante='original'):
+        """URL de la photo dans la variante adaptée au contexte (miniature, moyenne, grande)"""
+        if variante == 'original':
+            return url_photo(self.photo_profil)
+        return url_variante(self.photo_profil, self.photo_variantes, variante)
 
+    def to_dict(self):
         return {
             'id': self.id,
             'matricule': self.matricule,
@@ -134,7 +164,9 @@ class Utilisateur(db.Model):
             'sexe': self.sexe,
             'nationalite': self.nationalite,
             'role': self.role.value,
-            'photo_profil': photo_url,  # maintenant c’est directement l’URL
+            'photo_profil': url_photo(self.photo_profil),  # maintenant c’est directement l’URL
+            'photo_miniature': self.photo_url('miniature'),  # pour les listes
+            'photos': urls_utilisateur(self.photo_profil, self.photo_variantes),
             'type': self.type
         }
 
@@ -149,8 +181,8 @@ class Talibe(Utilisateur):
     niveau = db.Column(db.String(50))
     extrait_naissance = db.Column(db.Boolean, default=False)
     
-    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'))
-    chambre_id = db.Column(db.Integer, db.ForeignKey('chambres.id'))
+    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'), index=True)
+    chambre_id = db.Column(db.Integer, db.ForeignKey('chambres.id'), index=True)
     
     cours = db.relationship(
         'Cours', 
@@ -171,6 +203,11 @@ class Talibe(Utilisateur):
         kwargs['type'] = 'talibe'
         super().__init__(**kwargs)
     
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement nécessaires à to_dict() (cours et leurs compteurs)"""
+        return [selectinload(Talibe.cours).options(*Cours.serialization_options())]
+    
     def to_dict(self):
         data = super().to_dict()
         data.update({
@@ -196,7 +233,7 @@ class Enseignant(Utilisateur):
     diplome_origine = db.Column(db.String(50))
     statut = db.Column(db.String(50))
     
-    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'))
+    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'), index=True)
     
     cours = db.relationship('Cours', secondary='enseignant_cours', back_populates='enseignants')
     
@@ -208,6 +245,11 @@ class Enseignant(Utilisateur):
         kwargs['type'] = 'enseignant'
         super().__init__(**kwargs)
     
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement nécessaires à to_dict() (cours et leurs compteurs)"""
+        return [selectinload(Enseignant.cours).options(*Cours.serialization_options())]
+    
     def to_dict(self):
         data = super().to_dict()
         data.update({
@@ -284,7 +326,9 @@ enseignant_cours = db.Table('enseignant_cours',
     db.Column('enseignant_id', db.Integer, db.ForeignKey('enseignants.id'), primary_key=True),
     db.Column('cours_id', db.Integer, db.ForeignKey('cours.id'), primary_key=True),
     db.Column('role', db.String(50), default='titulaire'),  # ⬅️ Ajouter un rôle
-    db.Column('date_assignation', db.DateTime, default=datetime.utcnow)
+    db.Column('date_assignation', db.DateTime, default=datetime.utcnow),
+    # La clé primaire (enseignant_id, cours_id) ne sert pas aux recherches par cours
+    db.Index('ix_enseignant_cours_cours_id', 'cours_id')
 )
 
 class Cours(db.Model):
@@ -298,12 +342,12 @@ class Cours(db.Model):
     description = db.Column(db.Text)  # Nouveau champ
     
     # Étape 2: Configuration (nouveaux champs)
-    categorie = db.Column(db.String(50), nullable=False, default='Coran')
-    niveau = db.Column(db.String(20), nullable=False, default='Débutant')
+    categorie = db.Column(db.String(50), nullable=False, default='Coran', index=True)
+    niveau = db.Column(db.String(20), nullable=False, default='Débutant', index=True)
     duree = db.Column(db.Integer, nullable=False, default=2)  # heures/semaine
     capacite_max = db.Column(db.Integer, nullable=False, default=20)
     prerequis = db.Column(db.String(100), nullable=True)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
     is_certificat = db.Column(db.Boolean, default=False)
     is_online = db.Column(db.Boolean, default=False)
     
@@ -319,6 +363,10 @@ class Cours(db.Model):
     # Relations existantes (conservées)
     enseignants = db.relationship('Enseignant', secondary=enseignant_cours, back_populates='cours')
     
+    # Compteurs calculés en SQL, renseignés par serialization_options()
+    nombre_talibes = query_expression()
+    nombre_enseignants = query_expression()
+    
     def __init__(self, **kwargs):
         super(Cours, self).__init__(**kwargs)
         # Générer un code si non fourni
@@ -338,6 +386,48 @@ class Cours(db.Model):
             existing = Cours.query.filter(Cours.code.like(f"{prefix}%")).count()
             self.code = f"{prefix}{101 + existing}"
     
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement nécessaires à to_dict() (compteurs de talibés et d'enseignants)"""
+        # Alias pour ne pas corréler avec la table d'association d'un selectinload parent
+        inscription = aliased(Inscription)
+        assignation = enseignant_cours.alias()
+        return [
+            with_expression(
+                Cours.nombre_talibes,
+                select(func.count(inscription.id))
+                .where(inscription.cours_id == Cours.id)
+                .scalar_subquery()
+            ),
+            with_expression(
+                Cours.nombre_enseignants,
+                select(func.count(assignation.c.enseignant_id))
+                .where(assignation.c.cours_id == Cours.id)
+                .scalar_subquery()
+            )
+        ]
+    
+    def compter_talibes(self):
+        """Nombre d'inscrits, sans charger les inscriptions"""
+        if self.nombre_talibes is not None:
+            return self.nombre_talibes
+        if self.id is None:
+            return 0
+        return db.session.scalar(
+            select(func.count(Inscription.id)).where(Inscription.cours_id == self.id)
+        )
+    
+    def compter_enseignants(self):
+        """Nombre d'enseignants assignés, sans charger les enseignants"""
+        if self.nombre_enseignants is not None:
+            return self.nombre_enseignants
+        if self.id is None:
+            return 0
+        return db.session.scalar(
+            select(func.count(enseignant_cours.c.enseignant_id))
+            .where(enseignant_cours.c.cours_id == self.id)
+        )
+    
     def to_dict(self):
         """Convertit l'objet en dictionnaire pour JSON"""
         return {
@@ -359,8 +449,8 @@ class Cours(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             # Informations sur les relations
-            'nombre_talibes': len(self.talibes_inscrites),
-            'nombre_enseignants': len(self.enseignants)
+            'nombre_talibes': self.compter_talibes(),
+            'nombre_enseignants': self.compter_enseignants()
         }
     
     def update_from_dict(self, data):
@@ -403,7 +493,7 @@ class Batiment(db.Model):
     nom = db.Column(db.String(100), nullable=False)
     nb_chambres = db.Column(db.Integer, default=0)
     
-    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'))
+    daara_id = db.Column(db.Integer, db.ForeignKey('daaras.id'), index=True)
     chambres = db.relationship('Chambre', backref='batiment', lazy=True)
     
     def to_dict(self):
@@ -421,7 +511,7 @@ class Chambre(db.Model):
     numero = db.Column(db.String(20), nullable=False)
     nb_lits = db.Column(db.Integer, default=0)
     
-    batiment_id = db.Column(db.Integer, db.ForeignKey('batiments.id'))
+    batiment_id = db.Column(db.Integer, db.ForeignKey('batiments.id'), index=True)
     talibes = db.relationship('Talibe', backref='chambre', lazy=True)
     lits = db.relationship('Lit', backref='chambre', lazy=True)
     
@@ -441,11 +531,30 @@ class Lit(db.Model):
     
     chambre_id = db.Column(db.Integer, db.ForeignKey('chambres.id'))
     
+    # Occupation: un talibé occupe au plus un lit, NULL = lit disponible
+    talibe_id = db.Column(db.Integer, db.ForeignKey('talibes.id', ondelete='SET NULL'), unique=True)
+    talibe = db.relationship('Talibe', backref=db.backref('lit', uselist=False))
+    
+    # Recherche des lits libres d'une chambre: WHERE chambre_id = ? AND talibe_id IS NULL.
+    # chambre_id en tête: sert aussi d'index pour les lits d'une chambre
+    __table_args__ = (db.Index('ix_lits_chambre_occupation', 'chambre_id', 'talibe_id'),)
+    
+    @property
+    def disponible(self):
+        return self.talibe_id is None
+    
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement pour les listes qui incluent la chambre du lit"""
+        return [joinedload(Lit.chambre)]
+    
     def to_dict(self):
         return {
             'id': self.id,
             'numero': self.numero,
-            'chambre_id': self.chambre_id
+            'chambre_id': self.chambre_id,
+            'talibe_id': self.talibe_id,
+            'disponible': self.disponible
         }
         
 
@@ -454,7 +563,7 @@ class Inscription(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     talibe_id = db.Column(db.Integer, db.ForeignKey('talibes.id'), nullable=False)
-    cours_id = db.Column(db.Integer, db.ForeignKey('cours.id'), nullable=False)
+    cours_id = db.Column(db.Integer, db.ForeignKey('cours.id'), nullable=False, index=True)
     date_inscription = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     note = db.Column(db.Float, nullable=True)
     
@@ -465,6 +574,11 @@ class Inscription(db.Model):
     # Contrainte d'unicité
     __table_args__ = (db.UniqueConstraint('talibe_id', 'cours_id', name='unique_inscription'),)
     
+    @classmethod
+    def serialization_options(cls):
+        """Options de chargement nécessaires à to_dict() (nom du talibé, libellé du cours)"""
+        return [joinedload(Inscription.talibe), joinedload(Inscription.cours)]
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -478,4 +592,21 @@ class Inscription(db.Model):
         }
     
     def __repr__(self):
-        return f'<Inscription Talibe:{self.talibe_id} Cours:{self.cours_id}>'
\ No newline at end of file
+        return f'<Inscription Talibe:{self.talibe_id} Cours:{self.cours_id}>'
+
+
+class StatistiqueSnapshot(db.Model):
+    """Compteurs du tableau de bord, tenus à jour par statistiques.py"""
+    __tablename__ = 'statistiques_snapshot'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    categorie = db.Column(db.String(50), nullable=False, index=True)  # total, talibes_par_daara, ...
+    cle = db.Column(db.String(50), nullable=False)
+    libelle = db.Column(db.String(200))
+    valeur = db.Column(db.Integer, nullable=False, default=0)
+    mis_a_jour = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('categorie', 'cle', name='unique_statistique'),)
+    
+    def __repr__(self):
+        return f'<Statistique {self.categorie}:{self.cle}={self.valeur}>'
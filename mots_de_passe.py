@@ -0,0 +1,141 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+# Import conditionnel pour argon2
+try:
+    import argon2
+    ARGON2_DISPONIBLE = True
+except ImportError:
+    ARGON2_DISPONIBLE = False
+
+# Hachage des mots de passe: méthode et coût configurables (PASSWORD_HASH_METHOD),
+# ré-hachage à la connexion quand les paramètres changent, calculs exécutés
+# dans un pool de threads borné (hashlib et argon2 relâchent le GIL).
+#
+#     pbkdf2[:hash[:iterations]]   ex. pbkdf2:sha256:600000 (défaut de werkzeug)
+#     scrypt[:n:r:p]               ex. scrypt:32768:8:1
+#     argon2[:temps:memoire:para]  ex. argon2:3:65536:4 (paquet argon2-cffi)
+
+METHODE_PAR_DEFAUT = 'pbkdf2'
+
+
+class ServeurOccupe(RuntimeError):
+    """Trop de vérifications en attente: la requête doit être rejouée plus tard"""
+
+
+@lru_cache(maxsize=32)
+def normaliser(methode):
+    """Méthode avec tous ses paramètres, telle qu'elle apparaît dans les hashes"""
+    nom, *args = (methode or METHODE_PAR_DEFAUT).split(':')
+    if nom == 'argon2' and not ARGON2_DISPONIBLE:
+        raise ValueError("Le hachage argon2 nécessite le paquet argon2-cffi")
+    try:
+        if nom == 'pbkdf2' and len(args) <= 2:
+            hash_name = args[0] if args else 'sha256'
+            iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+            return f'pbkdf2:{hash_name}:{iterations}'
+        if nom == 'scrypt' and len(args) in (0, 3):
+            n, r, p = map(int, args) if args else (2 ** 15, 8, 1)
+            return f'scrypt:{n}:{r}:{p}'
+        if nom == 'argon2' and len(args) in (0, 3):
+            defaut = argon2.PasswordHasher()
+            t, m, p = map(int, args) if args else (defaut.time_cost, defaut.memory_cost, defaut.parallelism)
+            return f'argon2:{t}:{m}:{p}'
+    except ValueError:
+        pass
+    raise ValueError(f'Méthode de hachage invalide: {methode}')
+
+
+@lru_cache(maxsize=8)
+def _argon2(methode):
+    _, t, m, p = methode.split(':')
+    return argon2.PasswordHasher(time_cost=int(t), memory_cost=int(m), parallelism=int(p))
+
+
+def methode_courante():
+    if has_app_context():
+        return normaliser(current_app.config.get('PASSWORD_HASH_METHOD'))
+    return normaliser(METHODE_PAR_DEFAUT)
+
+
+def hacher_avec(methode, mot_de_passe):
+    """Hash du mot de passe avec une méthode donnée (fonction sérialisable, pour un pool de processus)"""
+    methode = normaliser(methode)
+    if methode.startswith('argon2:'):
+        return _argon2(methode).hash(mot_de_passe)
+    return generate_password_hash(mot_de_passe, method=methode)
+
+
+def _verifier(hash_, mot_de_passe):
+    if not hash_:
+        return False
+    if hash_.startswith('$argon2'):
+        if not ARGON2_DISPONIBLE:
+            raise ValueError("Hash argon2 mais paquet argon2-cffi absent")
+        try:
+            # Les paramètres sont lus dans le hash
+            return argon2.PasswordHasher().verify(hash_, mot_de_passe)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHash):
+            return False
+    return check_password_hash(hash_, mot_de_passe)
+
+
+def a_rehacher(hash_, methode=None):
+    """Vrai si le hash n'a pas été produit avec la méthode (et le coût) courants"""
+    methode = normaliser(methode) if methode else methode_courante()
+    if methode.startswith('argon2:'):
+        return not hash_.startswith('$argon2') or _argon2(methode).check_needs_rehash(hash_)
+    return hash_.split('$', 1)[0] != methode
+
+
+# ---------------------------------------------------------------------------
+# Pool borné
+# ---------------------------------------------------------------------------
+
+class PoolHachage:
+    def __init__(self, nb_workers, file_max, attente_max):
+        self.pool = ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix='mots_de_passe')
+        # Calculs en cours + en file; au-delà, on attend attente_max secondes puis on refuse
+        self._places = threading.BoundedSemaphore(nb_workers + file_max)
+        self.attente_max = attente_max
+
+    def executer(self, fonction, *args):
+        if not self._places.acquire(timeout=self.attente_max):
+            raise ServeurOccupe('Trop de connexions simultanées')
+        try:
+            return self.pool.submit(fonction, *args).result()
+        finally:
+            self._places.release()
+
+
+def _executer(fonction, *args):
+    pool = current_app.extensions.get('mots_de_passe') if has_app_context() else None
+    if pool is None:
+        return fonction(*args)
+    return pool.executer(fonction, *args)
+
+
+def hacher(mot_de_passe):
+    return _executer(hacher_avec, methode_courante(), mot_de_passe)
+
+
+def verifier(hash_, mot_de_passe):
+    return _executer(_verifier, hash_, mot_de_passe)
+
+
+def init_app(app):
+    app.config.setdefault('PASSWORD_HASH_METHOD', METHODE_PAR_DEFAUT)
+    app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+    app.config.setdefault('PASSWORD_HASH_QUEUE', 32)
+    app.config.setdefault('PASSWORD_HASH_WAIT', 2)
+    # Méthode invalide ou argon2 indisponible: erreur au démarrage plutôt qu'à la première connexion
+    normaliser(app.config['PASSWORD_HASH_METHOD'])
+    app.extensions['mots_de_passe'] = PoolHachage(
+        int(app.config['PASSWORD_HASH_WORKERS']),
+        int(app.config['PASSWORD_HASH_QUEUE']),
+        float(app.config['PASSWORD_HASH_WAIT'])
+    )
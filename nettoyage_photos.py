@@ -0,0 +1,108 @@
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, cast, or_, Text
+from models import db, Utilisateur
+import stockage
+import taches_photos
+
+# Nettoyage des photos orphelines (présentes dans le stockage, référencées par
+# aucun utilisateur): parcours page par page, vérification des références par
+# lot, suppression par lot. Reprise possible à partir du curseur du rapport.
+
+# Photos principales, puis variantes réduites (Utilisateur.photo_variantes)
+DOSSIERS = (taches_photos.DOSSIER, taches_photos.DOSSIER_VARIANTES)
+TAILLE_PAGE = 100
+LISTE_MAX = 1000
+
+
+def _references(public_ids):
+    """public_ids encore utilisés par un utilisateur (tous types confondus)"""
+    if not public_ids:
+        return set()
+    return set(db.session.execute(
+        select(Utilisateur.photo_profil).where(Utilisateur.photo_profil.in_(public_ids))
+    ).scalars())
+
+
+def _references_variantes(public_ids):
+    """public_ids encore cités dans la colonne JSON photo_variantes d'un utilisateur"""
+    if not public_ids:
+        return set()
+    texte = cast(Utilisateur.photo_variantes, Text)
+    variantes = db.session.execute(
+        select(Utilisateur.photo_variantes)
+        .where(or_(*(texte.contains(public_id, autoescape=True) for public_id in public_ids)))
+    ).scalars()
+    return {public_id for v in variantes for public_id in (v or {}).values()} & set(public_ids)
+
+
+def _position(curseur):
+    """Curseur du rapport: '<indice du dossier>:<curseur du stockage>'"""
+    if not curseur:
+        return 0, None
+    indice, _, suite = curseur.partition(':')
+    if not indice.isdigit():
+        return 0, curseur  # curseur antérieur aux variantes: dossier principal
+    return int(indice), suite or None
+
+
+def nettoyer(progression=None, dry_run=False, curseur=None, pages_max=None):
+    """
+    Parcourt le dossier des photos à partir du curseur. Les photos plus
+    récentes que PHOTO_CLEANUP_MIN_AGE secondes sont ignorées (envoi en cours,
+    référence pas encore enregistrée). PHOTO_CLEANUP_INTERVAL limite le
+    rythme des appels au stockage.
+    """
+    backend = stockage.courant()
+    intervalle = current_app.config.get('PHOTO_CLEANUP_INTERVAL', 0.5)
+    limite = datetime.now(timezone.utc) - timedelta(
+        seconds=current_app.config.get('PHOTO_CLEANUP_MIN_AGE', 3600)
+    )
+
+    rapport = {
+        'dry_run': dry_run,
+        'curseur_depart': curseur,
+        'pages': 0,
+        'examinees': 0,
+        'recentes_ignorees': 0,
+        'orphelines': 0,
+        'supprimees': 0,
+        'liste_orphelines': [],
+        'curseur': curseur,
+        'termine': False,
+    }
+    indice, curseur_dossier = _position(curseur)
+    while True:
+        dossier = DOSSIERS[indice]
+        ressources, suivant = backend.lister(dossier, curseur_dossier, TAILLE_PAGE)
+        anciennes = [r['public_id'] for r in ressources if r['cree_le'] <= limite]
+        references = _references if dossier == taches_photos.DOSSIER else _references_variantes
+        orphelines = sorted(set(anciennes) - references(anciennes))
+        db.session.rollback()  # pas de transaction ouverte pendant les appels au stockage
+
+        if orphelines and not dry_run:
+            backend.supprimer_lot(orphelines)
+            rapport['supprimees'] += len(orphelines)
+
+        rapport['pages'] += 1
+        rapport['examinees'] += len(ressources)
+        rapport['recentes_ignorees'] += len(ressources) - len(anciennes)
+        rapport['orphelines'] += len(orphelines)
+        place = LISTE_MAX - len(rapport['liste_orphelines'])
+        rapport['liste_orphelines'].extend(orphelines[:max(place, 0)])
+        if suivant:
+            curseur_dossier = suivant
+        elif indice + 1 < len(DOSSIERS):
+            indice, curseur_dossier = indice + 1, None
+        else:
+            rapport['termine'] = True
+        rapport['curseur'] = None if rapport['termine'] else f"{indice}:{curseur_dossier or ''}"
+        if progression:
+            progression(**{cle: valeur for cle, valeur in rapport.items() if cle != 'liste_orphelines'})
+
+        if rapport['termine']:
+            return rapport
+        if pages_max and rapport['pages'] >= pages_max:
+            return rapport
+        time.sleep(intervalle)
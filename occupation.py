@@ -0,0 +1,168 @@
+from sqlalchemy import select, func, case, and_, update, bindparam, cast, Integer
+from models import db, Talibe, Chambre, Lit
+
+# Occupation des chambres calculée en SQL (une seule requête agrégée),
+# sans charger les chambres ni leurs talibés.
+
+talibes = Talibe.__table__
+chambres = Chambre.__table__
+lits = Lit.__table__
+
+
+def occupants_par_chambre():
+    """Sous-requête: nombre de talibés hébergés par chambre"""
+    return (
+        select(talibes.c.chambre_id, func.count().label('nb_talibes'))
+        .where(talibes.c.chambre_id.isnot(None))
+        .group_by(talibes.c.chambre_id)
+        .subquery('occupants')
+    )
+
+
+def statistiques_chambres():
+    occupants = occupants_par_chambre()
+    nb_talibes = func.coalesce(occupants.c.nb_talibes, 0)
+    nb_lits = func.coalesce(chambres.c.nb_lits, 0)
+
+    # SUM renvoie un numeric sous PostgreSQL (Decimal, sérialisé en chaîne): cast en entier
+    ligne = db.session.execute(
+        select(
+            func.count(chambres.c.id).label('total_chambres'),
+            cast(func.sum(case((and_(nb_lits > 0, nb_talibes >= nb_lits), 1), else_=0)), Integer).label('pleines'),
+            cast(func.sum(case((nb_talibes == 0, 1), else_=0)), Integer).label('vides'),
+            cast(func.sum(nb_talibes), Integer).label('total_talibes'),
+            cast(func.sum(nb_lits), Integer).label('total_lits'),
+        )
+        .select_from(chambres)
+        .outerjoin(occupants, occupants.c.chambre_id == chambres.c.id)
+    ).one()
+
+    total_chambres = ligne.total_chambres
+    chambres_pleines = ligne.pleines or 0
+    chambres_vides = ligne.vides or 0
+    total_talibes = ligne.total_talibes or 0
+    total_lits = ligne.total_lits or 0
+
+    return {
+        'total_chambres': total_chambres,
+        'chambres_pleines': chambres_pleines,
+        'chambres_vides': chambres_vides,
+        'chambres_partiellement_occupees': total_chambres - chambres_pleines - chambres_vides,
+        'total_talibes_heberges': total_talibes,
+        'total_lits': total_lits,
+        'taux_occupation': round((total_talibes / total_lits * 100) if total_lits > 0 else 0, 2)
+    }
+
+
+def statistiques_lits():
+    occupes = (
+        select(func.count())
+        .select_from(lits)
+        .where(lits.c.talibe_id.isnot(None))
+        .scalar_subquery()
+    )
+    ligne = db.session.execute(
+        select(
+            select(func.count()).select_from(lits).scalar_subquery().label('total_lits'),
+            select(func.count()).select_from(chambres).scalar_subquery().label('total_chambres'),
+            occupes.label('lits_occupes'),
+        )
+    ).one()
+
+    total_lits = ligne.total_lits
+    total_chambres = ligne.total_chambres
+    lits_occupes = ligne.lits_occupes
+
+    return {
+        'total_lits': total_lits,
+        'total_chambres': total_chambres,
+        'lits_occupes': lits_occupes,
+        'lits_disponibles': total_lits - lits_occupes,
+        'taux_occupation_lits': round((lits_occupes / total_lits * 100) if total_lits > 0 else 0, 2),
+        'moyenne_lits_par_chambre': round(total_lits / total_chambres, 2) if total_chambres > 0 else 0
+    }
+
+
+# ---------------------------------------------------------------------------
+# Attribution des lits
+# ---------------------------------------------------------------------------
+
+class ChambrePleine(Exception):
+    pass
+
+
+def premier_lit_libre(chambre_id):
+    """Premier lit disponible d'une chambre (index ix_lits_chambre_occupation)"""
+    return Lit.query\
+        .filter(Lit.chambre_id == chambre_id, Lit.talibe_id.is_(None))\
+        .order_by(Lit.id)\
+        .with_for_update(skip_locked=True)\
+        .first()
+
+
+def liberer_lit(talibe_id, sauf=None):
+    """Libère le lit occupé par le talibé (sauf le lit donné)"""
+    requete = update(Lit).where(Lit.talibe_id == talibe_id)
+    if sauf is not None:
+        requete = requete.where(Lit.id != sauf.id)
+    db.session.execute(requete.values(talibe_id=None))
+
+
+def attribuer_lit(talibe, chambre, lit=None):
+    """
+    Installe le talibé dans la chambre, sur le lit donné ou le premier lit
+    libre. Lève ChambrePleine si aucun lit n'est disponible. Une chambre
+    sans lit enregistré garde l'ancienne règle (nb_talibes < nb_lits).
+    """
+    if lit is None:
+        lit = premier_lit_libre(chambre.id)
+    if lit is None:
+        a_des_lits = db.session.query(Lit.query.filter_by(chambre_id=chambre.id).exists()).scalar()
+        if a_des_lits:
+            raise ChambrePleine()
+        if chambre.nb_lits > 0:
+            heberges = Talibe.query.filter(Talibe.chambre_id == chambre.id, Talibe.id != talibe.id).count()
+            if heberges >= chambre.nb_lits:
+                raise ChambrePleine()
+    elif lit.talibe_id is not None and lit.talibe_id != talibe.id:
+        raise ChambrePleine()
+
+    liberer_lit(talibe.id, sauf=lit)
+    talibe.chambre_id = chambre.id
+    if lit is not None:
+        lit.talibe_id = talibe.id
+    return lit
+
+
+def attribuer_lits_existants():
+    """
+    Reprise des données: attribue un lit libre de leur chambre aux talibés
+    déjà hébergés mais sans lit. Renvoie le nombre de lits attribués.
+    """
+    sans_lit = db.session.execute(
+        select(talibes.c.id, talibes.c.chambre_id)
+        .where(talibes.c.chambre_id.isnot(None))
+        .where(~select(lits.c.id).where(lits.c.talibe_id == talibes.c.id).exists())
+        .order_by(talibes.c.chambre_id, talibes.c.id)
+    ).all()
+
+    libres = {}
+    for lit_id, chambre_id in db.session.execute(
+        select(lits.c.id, lits.c.chambre_id)
+        .where(lits.c.talibe_id.is_(None))
+        .order_by(lits.c.chambre_id, lits.c.id)
+    ):
+        libres.setdefault(chambre_id, []).append(lit_id)
+
+    attributions = []
+    for talibe_id, chambre_id in sans_lit:
+        if libres.get(chambre_id):
+            attributions.append({'b_lit_id': libres[chambre_id].pop(0), 'b_talibe_id': talibe_id})
+
+    if attributions:
+        db.session.execute(
+            update(lits).where(lits.c.id == bindparam('b_lit_id')).values(talibe_id=bindparam('b_talibe_id')),
+            attributions
+        )
+    db.session.commit()
+    return len(attributions)
@@ -0,0 +1,100 @@
+import base64
+import json
+from flask import request, jsonify
+from sqlalchemy import text
+from models import db
+from streaming import flux_demande, reponse_en_flux
+
+LIMITE_PAR_DEFAUT = 50
+LIMITE_MAX = 200
+
+
+class CurseurInvalide(ValueError):
+    pass
+
+
+def encoder_curseur(dernier_id):
+    """Curseur opaque à partir du dernier identifiant renvoyé"""
+    brut = json.dumps({'id': dernier_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
+    """Retrouve le dernier identifiant à partir d'un curseur opaque"""
+    try:
+        brut = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4))
+        dernier_id = json.loads(brut)['id']
+    except (ValueError, KeyError, TypeError):
+        raise CurseurInvalide('Curseur invalide')
+    if not isinstance(dernier_id, int):
+        raise CurseurInvalide('Curseur invalide')
+    return dernier_id
+
+
+def pagination_demandee():
+    return 'after' in request.args or 'limit' in request.args
+
+
+def lire_limite():
+    limite = request.args.get('limit', LIMITE_PAR_DEFAUT)
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        raise CurseurInvalide('Le paramètre limit doit être un entier')
+    if limite < 1:
+        raise CurseurInvalide('Le paramètre limit doit être positif')
+    return min(limite, LIMITE_MAX)
+
+
+def estimer_total(query, modele):
+    """Total approximatif: statistiques du planificateur PostgreSQL si la liste n'est pas filtrée"""
+    if query.whereclause is None and db.engine.dialect.name == 'postgresql':
+        estimation = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {'table': modele.__table__.name}
+        ).scalar()
+        if estimation is not None and estimation >= 0:
+            return estimation
+    return query.order_by(None).count()
+
+
+def page_keyset(query, colonne, serialiser):
+    """Exécute une page keyset (after/limit) et construit le corps de la réponse"""
+    limite = lire_limite()
+    curseur = request.args.get('after')
+
+    page_query = query
+    if curseur:
+        page_query = page_query.filter(colonne > decoder_curseur(curseur))
+    lignes = page_query.order_by(colonne).limit(limite + 1).all()
+
+    suivant = None
+    if len(lignes) > limite:
+        lignes = lignes[:limite]
+        suivant = encoder_curseur(getattr(lignes[-1], colonne.key))
+
+    corps = {
+        'items': [serialiser(ligne) for ligne in lignes],
+        'next_cursor': suivant,
+        'limit': limite
+    }
+    if request.args.get('total') == 'estimate':
+        corps['estimated_total'] = estimer_total(query, colonne.class_)
+    return corps
+
+
+def liste_paginee(query, colonne, serialiser):
+    """
+    Réponse d'une liste: tableau complet par défaut, page keyset si
+    ?after=<curseur> ou ?limit=<n> est fourni (ajouter ?total=estimate
+    pour obtenir une estimation du nombre total de lignes), flux
+    NDJSON / JSON si demandé (voir streaming.flux_demande).
+    """
+    if not pagination_demandee():
+        if flux_demande():
+            return reponse_en_flux(query, serialiser)
+        return jsonify([serialiser(ligne) for ligne in query.all()]), 200
+    try:
+        return jsonify(page_keyset(query, colonne, serialiser)), 200
+    except CurseurInvalide as e:
+        return jsonify({'error': str(e)}), 400
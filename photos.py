@@ -0,0 +1,77 @@
+from functools import lru_cache
+import stockage
+
+# URLs des photos de profil, mémorisées par public_id et variante: pour
+# Cloudinary, cloudinary_url() construit la chaîne et relit la configuration
+# à chaque appel.
+
+TAILLE_CACHE = 4096
+
+VARIANTES = {
+    'original': {},
+    'miniature': {'width': 64, 'height': 64, 'crop': 'fill', 'gravity': 'face',
+                  'fetch_format': 'auto', 'quality': 'auto'},
+    'moyenne': {'width': 256, 'height': 256, 'crop': 'limit',
+                'fetch_format': 'auto', 'quality': 'auto'},
+    'grande': {'width': 1024, 'height': 1024, 'crop': 'limit',
+               'fetch_format': 'auto', 'quality': 'auto'},
+}
+
+# Variantes proposées aux clients (listes: miniature, fiches: moyenne...)
+TAILLES = ['miniature', 'moyenne', 'grande']
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def _url(public_id, variante, backend, cle):
+    return backend.url(public_id, VARIANTES[variante])
+
+
+def url_photo(public_id, variante='original'):
+    """URL sécurisée d'une photo dans la variante demandée (None si pas de photo)"""
+    if not public_id:
+        return None
+    if variante not in VARIANTES:
+        raise ValueError(f'Variante inconnue: {variante}')
+    backend = stockage.courant()
+    # La clé du stockage (ex. cloud_name) fait partie de la clé du cache:
+    # un changement de configuration invalide les URLs mémorisées
+    return _url(public_id, variante, backend, backend.cle_cache())
+
+
+def url_variante(public_id, variantes, variante):
+    """
+    URL d'une variante: celle produite à l'envoi si elle existe
+    (Utilisateur.photo_variantes), sinon une transformation de l'original
+    """
+    if variantes and variante in variantes:
+        return url_photo(variantes[variante])
+    return url_photo(public_id, variante)
+
+
+def urls_utilisateur(public_id, variantes):
+    if not public_id:
+        return None
+    return {variante: url_variante(public_id, variantes, variante) for variante in TAILLES}
+
+
+def variantes_valides(public_id, variantes):
+    """
+    photo_variantes envoyé par un client (résultat de /upload/photo):
+    {variante: public_id}, la grande variante étant la photo principale
+    """
+    if variantes is None:
+        return True
+    return (isinstance(variantes, dict) and set(variantes) <= set(TAILLES)
+            and all(isinstance(v, str) and v for v in variantes.values())
+            and variantes.get('grande') == public_id)
+
+
+def urls_photo(public_id):
+    """Toutes les variantes d'une photo"""
+    if not public_id:
+        return None
+    return {variante: url_photo(public_id, variante) for variante in VARIANTES}
+
+
+def vider_cache():
+    _url.cache_clear()
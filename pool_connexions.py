@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Pool de connexions à la base: réglages lus dans l'environnement et mesures
+# (connexions empruntées, débordement, temps d'attente) pour dimensionner le
+# nombre de workers gunicorn face à la limite de connexions de PostgreSQL.
+
+
+def _entier(env, nom, defaut):
+    return int(env.get(nom, defaut))
+
+
+def _booleen(env, nom, defaut):
+    return str(env.get(nom, defaut)).lower() in ('1', 'true', 'yes', 'oui')
+
+
+class Mesures:
+    """Temps d'obtention des connexions (attente dans la file et ouverture éventuelle)"""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.demandes = 0
+        self.attente_totale = 0.0
+        self.attente_max = 0.0
+        self.delais_depasses = 0
+        self.connexions_ouvertes = 0
+
+    def attente(self, duree):
+        with self._verrou:
+            self.demandes += 1
+            self.attente_totale += duree
+            self.attente_max = max(self.attente_max, duree)
+
+    def delai_depasse(self):
+        with self._verrou:
+            self.delais_depasses += 1
+
+    def connexion_ouverte(self):
+        with self._verrou:
+            self.connexions_ouvertes += 1
+
+    def to_dict(self):
+        with self._verrou:
+            return {
+                'demandes': self.demandes,
+                'attente_moyenne_ms': round(self.attente_totale * 1000 / self.demandes, 3) if self.demandes else 0,
+                'attente_max_ms': round(self.attente_max * 1000, 3),
+                'delais_depasses': self.delais_depasses,
+                'connexions_ouvertes': self.connexions_ouvertes,
+            }
+
+
+class QueuePoolMesure(QueuePool):
+    """QueuePool qui mesure le temps mis à fournir chaque connexion"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mesures = Mesures()
+
+    def connect(self):
+        debut = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.mesures.delai_depasse()
+            raise
+        finally:
+            self.mesures.attente(time.perf_counter() - debut)
+
+    def _create_connection(self):
+        self.mesures.connexion_ouverte()
+        return super()._create_connection()
+
+
+def options_moteur(uri, env=os.environ):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS pour l'URI donnée, d'après les variables
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_TIMEOUT_MS et DB_CONNECT_TIMEOUT
+    """
+    if not uri or ':memory:' in uri:
+        return {}
+
+    options = {
+        'poolclass': QueuePoolMesure,
+        'pool_size': _entier(env, 'DB_POOL_SIZE', 5),
+        'max_overflow': _entier(env, 'DB_MAX_OVERFLOW', 5),
+        'pool_timeout': _entier(env, 'DB_POOL_TIMEOUT', 10),
+        # Recycler avant que le serveur ou un proxy ne ferme les connexions inactives
+        'pool_recycle': _entier(env, 'DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _booleen(env, 'DB_POOL_PRE_PING', True),
+    }
+
+    if uri.startswith('postgresql'):
+        connect_args = {
+            'connect_timeout': _entier(env, 'DB_CONNECT_TIMEOUT', 10),
+            # Détecter côté client les connexions TLS mortes plutôt que d'attendre le timeout TCP
+            'keepalives': 1,
+            'keepalives_idle': 60,
+            'keepalives_interval': 10,
+            'keepalives_count': 3,
+        }
+        statement_timeout = _entier(env, 'DB_STATEMENT_TIMEOUT_MS', 30000)
+        if statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+        options['connect_args'] = connect_args
+
+    return options
+
+
+def etat(engine):
+    """Photographie du pool de l'engine (champs à None si le pool ne les expose pas)"""
+    pool = engine.pool
+    taille = pool.size() if hasattr(pool, 'size') else None
+    max_overflow = getattr(pool, '_max_overflow', None)
+    resultat = {
+        'pool': type(pool).__name__,
+        'processus': os.getpid(),
+        'taille': taille,
+        'max_overflow': max_overflow,
+        'connexions_max': taille + max(max_overflow, 0) if taille is not None and max_overflow is not None else None,
+        'empruntees': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+        'disponibles': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+        # Négatif tant que le pool n'a pas ouvert toutes ses connexions de base
+        'debordement': pool.overflow() if hasattr(pool, 'overflow') else None,
+        'timeout': getattr(pool, '_timeout', None),
+        'recycle': getattr(pool, '_recycle', None),
+        'pre_ping': getattr(pool, '_pre_ping', None),
+        'attente': pool.mesures.to_dict() if isinstance(pool, QueuePoolMesure) else None,
+    }
+    workers = os.environ.get('WEB_CONCURRENCY')
+    if workers and resultat['connexions_max'] is not None:
+        # Borne haute pour l'ensemble des workers gunicorn, à comparer à max_connections
+        resultat['connexions_max_workers'] = int(workers) * resultat['connexions_max']
+    return resultat
@@ -0,0 +1,145 @@
+import re
+import unicodedata
+from sqlalchemy import event, DDL, select, text, func, and_, update, bindparam, Integer, Float
+from models import db, Utilisateur, Talibe
+from photos import url_variante
+
+# Recherche plein texte sur les utilisateurs (nom, prénom, matricule, email,
+# père et mère des talibés). Le texte est normalisé en Python (sans accents,
+# minuscules) dans utilisateurs.texte_recherche, puis indexé:
+# - PostgreSQL: index GIN pg_trgm (voir Utilisateur.__table_args__)
+# - SQLite: table FTS5 utilisateurs_fts, synchronisée par des triggers
+
+CHAMPS = ('nom', 'prenom', 'matricule', 'email', 'pere', 'mere')
+# Les administrateurs ne sont jamais exposés par la recherche
+TYPES = ('talibe', 'enseignant')
+LIMITE_PAR_DEFAUT = 10
+LIMITE_MAX = 50
+
+# Lettres sans décomposition Unicode (ŋ du wolof, ligatures)
+_LETTRES = str.maketrans({'ŋ': 'n', 'Ŋ': 'n', 'ß': 'ss', 'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe'})
+
+
+def normaliser(texte):
+    """Minuscules, sans accents ni ponctuation superflue: 'Ñdèye Ŋom' -> 'ndeye nom'"""
+    decompose = unicodedata.normalize('NFKD', (texte or '').translate(_LETTRES))
+    sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^\w@.\-]+', ' ', sans_accents.lower()).split())
+
+
+def mots(texte):
+    return re.findall(r'\w+', normaliser(texte))
+
+
+def texte_de(source):
+    """Texte de recherche d'un utilisateur (objet) ou d'une ligne à insérer (dict)"""
+    lire = source.get if isinstance(source, dict) else lambda champ: getattr(source, champ, None)
+    return normaliser(' '.join(str(lire(champ)) for champ in CHAMPS if lire(champ)))
+
+
+@event.listens_for(Utilisateur, 'before_insert', propagate=True)
+@event.listens_for(Utilisateur, 'before_update', propagate=True)
+def _maj_texte_recherche(mapper, connection, target):
+    target.texte_recherche = texte_de(target)
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS utilisateurs_fts USING fts5("
+    "texte_recherche, content='utilisateurs', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_ai AFTER INSERT ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(rowid, texte_recherche) VALUES (new.id, new.texte_recherche); END",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_ad AFTER DELETE ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts, rowid, texte_recherche) "
+    "VALUES ('delete', old.id, old.texte_recherche); END",
+    "CREATE TRIGGER IF NOT EXISTS utilisateurs_fts_au AFTER UPDATE OF texte_recherche ON utilisateurs BEGIN "
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts, rowid, texte_recherche) "
+    "VALUES ('delete', old.id, old.texte_recherche); "
+    "INSERT INTO utilisateurs_fts(rowid, texte_recherche) VALUES (new.id, new.texte_recherche); END",
+    "INSERT INTO utilisateurs_fts(utilisateurs_fts) VALUES ('rebuild')",
+]
+
+_utilisateurs = Utilisateur.__table__
+event.listen(_utilisateurs, 'before_create',
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect='postgresql'))
+for _instruction in _DDL_SQLITE:
+    event.listen(_utilisateurs, 'after_create', DDL(_instruction).execute_if(dialect='sqlite'))
+event.listen(_utilisateurs, 'after_drop',
+             DDL("DROP TABLE IF EXISTS utilisateurs_fts").execute_if(dialect='sqlite'))
+
+
+def reindexer(taille_lot=1000):
+    """Recalcule texte_recherche pour tous les utilisateurs (reprise des données)"""
+    talibes = Talibe.__table__
+    requete = select(_utilisateurs.c.id, *[_utilisateurs.c[c] for c in CHAMPS if c in _utilisateurs.c],
+                     talibes.c.pere, talibes.c.mere)\
+        .select_from(_utilisateurs.outerjoin(talibes, talibes.c.id == _utilisateurs.c.id))\
+        .order_by(_utilisateurs.c.id)
+    modification = update(_utilisateurs)\
+        .where(_utilisateurs.c.id == bindparam('b_id'))\
+        .values(texte_recherche=bindparam('b_texte'))
+
+    total = 0
+    for partition in db.session.execute(requete.execution_options(yield_per=taille_lot)).partitions():
+        lignes = [{'b_id': ligne.id, 'b_texte': texte_de(ligne._asdict())} for ligne in partition]
+        db.session.connection().execute(modification, lignes)
+        total += len(lignes)
+    db.session.commit()
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Requête
+# ---------------------------------------------------------------------------
+
+COLONNES = (Utilisateur.id, Utilisateur.type, Utilisateur.matricule, Utilisateur.nom,
+            Utilisateur.prenom, Utilisateur.email, Utilisateur.photo_profil,
+            Utilisateur.photo_variantes)
+
+
+def rechercher(q, type_=None, limite=LIMITE_PAR_DEFAUT, decalage=0):
+    """Utilisateurs correspondant à tous les mots de q (préfixes), les plus pertinents d'abord"""
+    termes = mots(q)
+    if not termes:
+        return []
+
+    dialecte = db.engine.dialect.name
+    requete = select(*COLONNES)
+    if dialecte == 'sqlite':
+        correspondance = ' '.join(f'"{terme}"*' for terme in termes)
+        fts = text("SELECT rowid, rank FROM utilisateurs_fts WHERE utilisateurs_fts MATCH :m")\
+            .bindparams(m=correspondance)\
+            .columns(rowid=Integer, rank=Float)\
+            .subquery('fts')
+        requete = requete.join(fts, fts.c.rowid == Utilisateur.id).order_by(fts.c.rank, Utilisateur.id)
+    else:
+        requete = requete.where(and_(*[
+            Utilisateur.texte_recherche.contains(terme, autoescape=True) for terme in termes
+        ]))
+        if dialecte == 'postgresql':
+            requete = requete.order_by(
+                func.word_similarity(' '.join(termes), Utilisateur.texte_recherche).desc(),
+                Utilisateur.id
+            )
+        else:
+            requete = requete.order_by(Utilisateur.nom, Utilisateur.id)
+
+    requete = requete.where(Utilisateur.type == type_ if type_ else Utilisateur.type.in_(TYPES))
+    return db.session.execute(requete.limit(limite).offset(decalage)).all()
+
+
+def resultat_to_dict(ligne):
+    return {
+        'id': ligne.id,
+        'type': ligne.type,
+        'matricule': ligne.matricule,
+        'nom': ligne.nom,
+        'prenom': ligne.prenom,
+        'email': ligne.email,
+        'photo_miniature': url_variante(ligne.photo_profil, ligne.photo_variantes, 'miniature')
+                           if ligne.photo_profil else None,
+    }
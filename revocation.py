@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from flask import current_app, has_app_context
+
+# Import conditionnel pour redis
+try:
+    import redis
+    REDIS_DISPONIBLE = True
+except ImportError:
+    REDIS_DISPONIBLE = False
+
+# Révocation des tokens JWT (liste de jti refusés jusqu'à leur expiration).
+#
+# Chaque requête authentifiée consulte d'abord un filtre de Bloom local: la
+# quasi-totalité des tokens n'est pas révoquée et la réponse "absent" est
+# certaine, sans verrou ni aller-retour réseau. Seuls les jti présents dans le
+# filtre (révoqués, ou faux positifs ~0,1 %) sont vérifiés dans le stockage.
+#
+#     REVOCATION_STORAGE = 'memoire'   # ou redis://hote:6379/0 (partagé entre workers)
+#
+# Avec un stockage partagé, chaque worker rattrape les révocations des autres
+# au plus toutes les REVOCATION_SYNC_INTERVAL secondes (journal trié par date).
+
+logger = logging.getLogger(__name__)
+
+
+class FiltreBloom:
+    """Ensemble probabiliste: pas de faux négatif, faux positifs au taux choisi"""
+
+    def __init__(self, capacite, taux_faux_positifs=0.001):
+        self.capacite = capacite
+        self.nb_bits = max(64, math.ceil(-capacite * math.log(taux_faux_positifs) / math.log(2) ** 2))
+        self.nb_hachages = max(1, round(self.nb_bits / capacite * math.log(2)))
+        self._bits = bytearray((self.nb_bits + 7) // 8)
+        self.nb_elements = 0
+
+    def _positions(self, element):
+        # Double hachage: k positions à partir de deux entiers de 64 bits
+        empreinte = hashlib.blake2b(element.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(empreinte[:8], 'little')
+        h2 = int.from_bytes(empreinte[8:], 'little') | 1
+        return [(h1 + i * h2) % self.nb_bits for i in range(self.nb_hachages)]
+
+    def ajouter(self, element):
+        for position in self._positions(element):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.nb_elements += 1
+
+    def __contains__(self, element):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(element))
+
+
+# ---------------------------------------------------------------------------
+# Stockages
+# ---------------------------------------------------------------------------
+
+class StockageRevocations(ABC):
+    partage = False
+
+    @abstractmethod
+    def ajouter(self, jti, expire_a):
+        """Révoque jti jusqu'à expire_a (timestamp d'expiration du token)"""
+
+    @abstractmethod
+    def contient(self, jti):
+        pass
+
+    @abstractmethod
+    def depuis(self, instant):
+        """jti révoqués à partir de instant: [(jti, revoque_a)]"""
+
+
+class StockageMemoire(StockageRevocations):
+    """Révocations du processus: un seul worker, ou développement et tests"""
+
+    def __init__(self, horloge=time.time):
+        self._horloge = horloge
+        self._entrees = {}  # jti -> (expire_a, revoque_a)
+        self._verrou = threading.Lock()
+
+    def ajouter(self, jti, expire_a):
+        with self._verrou:
+            self._entrees[jti] = (expire_a, self._horloge())
+
+    def contient(self, jti):
+        entree = self._entrees.get(jti)
+        return entree is not None and entree[0] > self._horloge()
+
+    def depuis(self, instant):
+        # Appelé pour reconstruire le filtre: on en profite pour oublier les tokens expirés
+        with self._verrou:
+            maintenant = self._horloge()
+            self._entrees = {jti: e for jti, e in self._entrees.items() if e[0] > maintenant}
+            return [(jti, revoque_a) for jti, (_, revoque_a) in self._entrees.items() if revoque_a >= instant]
+
+    def __len__(self):
+        return len(self._entrees)
+
+
+class StockageRedis(StockageRevocations):
+    """
+    Révocations partagées via le protocole Redis: une clé par jti (expirant
+    avec le token) et un journal trié par date de révocation pour la synchronisation
+    """
+    partage = True
+
+    def __init__(self, client, duree_max, prefixe='revocation:', horloge=time.time):
+        self.client = client
+        self.duree_max = duree_max  # durée de vie du plus long token émis
+        self.prefixe = prefixe
+        self.journal = prefixe + 'journal'
+        self._horloge = horloge
+
+    @classmethod
+    def depuis_url(cls, url, duree_max):
+        if not REDIS_DISPONIBLE:
+            raise ValueError("REVOCATION_STORAGE redis:// nécessite le paquet redis")
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5), duree_max)
+
+    def ajouter(self, jti, expire_a):
+        maintenant = self._horloge()
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.set(self.prefixe + jti, 1, ex=max(1, math.ceil(expire_a - maintenant)))
+        pipeline.zadd(self.journal, {jti: maintenant})
+        # Au-delà de duree_max, les tokens révoqués ont tous expiré
+        pipeline.zremrangebyscore(self.journal, '-inf', maintenant - self.duree_max)
+        pipeline.execute()
+
+    def contient(self, jti):
+        return bool(self.client.exists(self.prefixe + jti))
+
+    def depuis(self, instant):
+        resultat = self.client.zrangebyscore(self.journal, instant, '+inf', withscores=True)
+        return [(jti.decode() if isinstance(jti, bytes) else jti, score) for jti, score in resultat]
+
+
+# ---------------------------------------------------------------------------
+# Liste de révocation
+# ---------------------------------------------------------------------------
+
+class ListeRevocation:
+    # Recouvrement lors des synchronisations (horloges des workers légèrement décalées)
+    MARGE_SYNCHRO = 5
+
+    def __init__(self, stockage, capacite=100000, taux_faux_positifs=0.001,
+                 intervalle_synchro=1.0, horloge=time.time):
+        self.stockage = stockage
+        self.capacite = capacite
+        self.taux_faux_positifs = taux_faux_positifs
+        self.intervalle_synchro = intervalle_synchro
+        self._horloge = horloge
+        self._verrou = threading.Lock()
+        self._filtre = FiltreBloom(capacite, taux_faux_positifs)
+        self._derniere_synchro = None
+
+    def revoquer(self, jti, expire_a):
+        self.stockage.ajouter(jti, expire_a)
+        with self._verrou:
+            if jti not in self._filtre:
+                self._filtre.ajouter(jti)
+            if self._filtre.nb_elements > self._filtre.capacite:
+                self._reconstruire()
+
+    def est_revoque(self, jti):
+        if self.stockage.partage:
+            self._synchroniser()
+        if jti not in self._filtre:
+            return False
+        return self.stockage.contient(jti)
+
+    def _reconstruire(self):
+        """Nouveau filtre sans les tokens expirés, agrandi si nécessaire (sous verrou)"""
+        maintenant = self._horloge()
+        revoques = self.stockage.depuis(float('-inf'))
+        filtre = FiltreBloom(max(self.capacite, 2 * len(revoques)), self.taux_faux_positifs)
+        for jti, _ in revoques:
+            filtre.ajouter(jti)
+        self._filtre = filtre
+        self._derniere_synchro = maintenant
+
+    def _synchroniser(self):
+        maintenant = self._horloge()
+        if self._derniere_synchro is not None and maintenant - self._derniere_synchro < self.intervalle_synchro:
+            return
+        # Une seule synchronisation à la fois; les autres requêtes gardent le filtre courant
+        if not self._verrou.acquire(blocking=False):
+            return
+        try:
+            if self._derniere_synchro is None:
+                self._reconstruire()
+                return
+            # Le recouvrement renvoie des jti déjà présents: seuls les nouveaux comptent
+            # pour la capacité, sinon le filtre serait reconstruit sans raison
+            for jti, _ in self.stockage.depuis(self._derniere_synchro - self.MARGE_SYNCHRO):
+                if jti not in self._filtre:
+                    self._filtre.ajouter(jti)
+            self._derniere_synchro = maintenant
+            if self._filtre.nb_elements > self._filtre.capacite:
+                self._reconstruire()
+        except Exception:
+            # Stockage indisponible: on garde le filtre local, nouvel essai au prochain intervalle
+            self._derniere_synchro = maintenant
+            logger.warning("Synchronisation des révocations impossible", exc_info=True)
+        finally:
+            self._verrou.release()
+
+
+def _liste():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('revocation')
+
+
+def revoquer(jwt_payload):
+    """Révoque le token décodé jwt_payload jusqu'à son expiration"""
+    liste = _liste()
+    if liste is None or not jwt_payload.get('jti'):
+        return
+    expire_a = jwt_payload.get('exp') or time.time() + _duree_max(current_app)
+    liste.revoquer(jwt_payload['jti'], expire_a)
+
+
+def est_revoque(jwt_payload):
+    """Pour JWTManager.token_in_blocklist_loader"""
+    liste = _liste()
+    if liste is None:
+        return False
+    try:
+        return liste.est_revoque(jwt_payload['jti'])
+    except Exception:
+        # Stockage indisponible pour un jti présent dans le filtre: on refuse
+        logger.warning("Vérification de révocation impossible", exc_info=True)
+        return True
+
+
+def _duree_max(app):
+    durees = [app.config.get('JWT_ACCESS_TOKEN_EXPIRES'), app.config.get('JWT_REFRESH_TOKEN_EXPIRES')]
+    return max((d.total_seconds() for d in durees if hasattr(d, 'total_seconds')), default=30 * 86400)
+
+
+def init_app(app):
+    app.config.setdefault('REVOCATION_STORAGE', 'memoire')
+    app.config.setdefault('REVOCATION_CAPACITY', 100000)
+    app.config.setdefault('REVOCATION_SYNC_INTERVAL', 1.0)
+    stockage = app.config['REVOCATION_STORAGE']
+    if stockage == 'memoire':
+        stockage = StockageMemoire()
+    elif stockage.startswith(('redis://', 'rediss://', 'unix://')):
+        stockage = StockageRedis.depuis_url(stockage, _duree_max(app))
+    else:
+        raise ValueError(f"REVOCATION_STORAGE inconnu: {stockage}")
+    app.extensions['revocation'] = ListeRevocation(
+        stockage,
+        capacite=int(app.config['REVOCATION_CAPACITY']),
+        intervalle_synchro=float(app.config['REVOCATION_SYNC_INTERVAL'])
+    )
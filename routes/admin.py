@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from models import Admin, Utilisateur, Talibe, Enseignant, Daara, Batiment, Chambre, db
 from models import RoleEnum
+import statistiques
+import photos
+import export
+import pool_connexions
+from pagination import pagination_demandee, page_keyset, CurseurInvalide
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -16,10 +21,8 @@ def admin_required(f):
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_email = get_jwt_identity()
-        user = Utilisateur.query.filter_by(email=current_user_email).first()
-        
-        if not user or user.role != RoleEnum.ADMIN:
+        # Rôle lu dans le token: aucune requête SQL
+        if get_jwt().get('role') != RoleEnum.ADMIN.value:
             return jsonify({"error": "Accès refusé. Administrateur requis"}), 403
         
         return f(*args, **kwargs)
@@ -33,48 +36,31 @@ def admin_required(f):
 @admin_bp.route('/dashboard', methods=['GET'])
 @admin_required
 def get_dashboard():
-    """Récupère les statistiques du dashboard admin"""
+    """Récupère les statistiques du dashboard admin (snapshot maintenu en continu)"""
     try:
-        # Statistiques générales
-        total_talibes = Talibe.query.count()
-        total_enseignants = Enseignant.query.count()
-        total_daaras = Daara.query.count()
-        total_batiments = Batiment.query.count()
-        total_chambres = Chambre.query.count()
-        
-        # Talibes par daara
-        talibes_par_daara = db.session.query(
-            Daara.nom, 
-            db.func.count(Talibe.id)
-        ).outerjoin(Talibe).group_by(Daara.id).all()
-        
-        # Statistiques des chambres
-        chambres_par_batiment = db.session.query(
-            Batiment.nom,
-            db.func.count(Chambre.id)
-        ).outerjoin(Chambre).group_by(Batiment.id).all()
-        
-        return jsonify({
-            "statistiques": {
-                "total_talibes": total_talibes,
-                "total_enseignants": total_enseignants,
-                "total_daaras": total_daaras,
-                "total_batiments": total_batiments,
-                "total_chambres": total_chambres
-            },
-            "talibes_par_daara": [
-                {"daara": daara, "count": count} 
-                for daara, count in talibes_par_daara
-            ],
-            "chambres_par_batiment": [
-                {"batiment": batiment, "count": count} 
-                for batiment, count in chambres_par_batiment
-            ]
-        }), 200
+        return jsonify(statistiques.lire()), 200
         
     except Exception as e:
         return jsonify({"error": f"Erreur lors de la récupération du dashboard: {str(e)}"}), 500
 
+@admin_bp.route('/dashboard/reconstruire', methods=['POST'])
+@admin_required
+def reconstruire_dashboard():
+    """Recalcule entièrement le snapshot des statistiques"""
+    try:
+        statistiques.reconstruire()
+        return jsonify(statistiques.lire()), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Erreur lors de la reconstruction des statistiques: {str(e)}"}), 500
+
+@admin_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def etat_pool():
+    """État du pool de connexions de ce processus (dimensionnement des workers)"""
+    return jsonify(pool_connexions.etat(db.engine)), 200
+
 # ============================================================================
 # GESTION DES UTILISATEURS
 # ============================================================================
@@ -88,11 +74,18 @@ def get_all_utilisateurs():
         per_page = request.args.get('per_page', 10, type=int)
         role = request.args.get('role')
         
-        query = Utilisateur.query
+        query = Utilisateur.query.options(*Utilisateur.serialization_options())
         
         if role:
             query = query.filter_by(role=RoleEnum(role))
         
+        # Pagination par curseur (?after=&limit=), sans OFFSET ni COUNT(*)
+        if pagination_demandee():
+            try:
+                return jsonify(page_keyset(query, Utilisateur.id, lambda user: user.to_dict())), 200
+            except CurseurInvalide as e:
+                return jsonify({"error": str(e)}), 400
+        
         pagination = query.paginate(
             page=page, 
             per_page=per_page, 
@@ -132,10 +125,21 @@ def update_utilisateur(user_id):
         allowed_fields = ['nom', 'prenom', 'email', 'adresse', 'date_naissance', 
                          'lieu_naissance', 'role', 'photo_profil']
         
+        ancienne_photo = user.photo_profil
         for field in allowed_fields:
             if field in data:
                 setattr(user, field, data[field])
         
+        # Variantes de la photo (résultat de /upload/photo); une nouvelle photo
+        # sans variantes ne garde pas celles de l'ancienne
+        if 'photo_variantes' in data:
+            if not photos.variantes_valides(user.photo_profil, data['photo_variantes']):
+                db.session.rollback()
+                return jsonify({"error": "photo_variantes invalide"}), 400
+            user.photo_variantes = data['photo_variantes']
+        elif user.photo_profil != ancienne_photo:
+            user.photo_variantes = None
+        
         # Gestion spéciale du mot de passe
         if 'password' in data and data['password']:
             user.set_password(data['password'])
@@ -379,4 +383,34 @@ def rapport_enseignants():
         }), 200
         
     except Exception as e:
-        return jsonify({"error": f"Erreur lors de la génération du rapport: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Erreur lors de la génération du rapport: {str(e)}"}), 500
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+@admin_bp.route('/export/<entite>', methods=['GET'])
+@admin_required
+def exporter(entite):
+    """
+    Exporter talibes, enseignants, inscriptions ou hebergement en flux.
+    ?format=csv|ndjson|parquet, ?colonnes=a,b,c, filtres en paramètres (ex. ?daara_id=1)
+    """
+    try:
+        definition = export.EXPORTS.get(entite)
+        if not definition:
+            return jsonify({"error": "Export inconnu"}), 404
+        
+        format_ = request.args.get('format', 'csv')
+        colonnes = [c for c in request.args.get('colonnes', '').split(',') if c]
+        filtres = {nom: request.args[nom] for nom in definition.filtres if nom in request.args}
+        
+        requete, noms = definition.requete(colonnes, filtres)
+        generateur = export.generateur(format_, requete, noms)
+        return Response(stream_with_context(generateur), mimetype=export.FORMATS[format_], headers={
+            'Content-Disposition': f'attachment; filename={entite}.{format_}'
+        })
+        
+    except export.ExportInvalide as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Erreur lors de l'export: {str(e)}"}), 500
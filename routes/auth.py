@@ -1,26 +1,45 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt, unset_jwt_cookies
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt_identity, get_jwt, unset_jwt_cookies
 from flask_jwt_extended import verify_jwt_in_request
 from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 import sys
 import os
-import traceback
+import logging
 
 # Ajouter le chemin pour les imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from models import db, Utilisateur, Talibe, Enseignant, RoleEnum
 from decorators import role_required  # Maintenant ça devrait fonctionner
+from identity_cache import memoriser
+import mots_de_passe
+import limitation
+import revocation
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
+
+def create_token(user):
+    """
+    Token d'accès: l'email en identity; rôle, id, type et daara en claims
+    (identity_cache.claims, servi par le cache que l'on remplit ici)
+    """
+    memoriser(user)
+    return create_access_token(identity=user.email)
+
+def create_tokens(user):
+    return {
+        'access_token': create_token(user),
+        'refresh_token': create_refresh_token(identity=user.email)
+    }
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
     try:
         data = request.get_json()
-        print("=== DÉBUT REGISTER ===")
-        print(f"Données: {data}")
+        logger.debug("Inscription", extra={'donnees': data})
         
         # Validation basique
         if not data:
@@ -57,95 +76,103 @@ def register():
         user.role = RoleEnum(data['role'])
         user.date_naissance = datetime.now().date()
         user.lieu_naissance = data.get('lieu_naissance', 'Dakar')
-        user.age = data.get('age', 25)
+        # age et nb_annees sont calculés à partir des dates (propriétés en lecture seule)
         user.adresse = data.get('adresse', '')
         user.date_entree = datetime.now().date()
-        user.nb_annees = data.get('nb_annees', 1)
-        
-        print(f"Utilisateur créé: {user.__class__.__name__}")
         
         db.session.add(user)
         db.session.commit()
         
-        print(f"Utilisateur sauvegardé avec ID: {user.id}")
+        logger.info("Utilisateur inscrit", extra={'utilisateur_id': user.id, 'type': user.type})
         
         # CORRECTION : Utiliser l'email comme identity (doit être une string)
-        token = create_access_token(identity=user.email)
-        
         response = {
             'message': 'Success',
-            'access_token': token,
+            **create_tokens(user),
             'user': user.to_dict()
         }
         
-        print(f"Réponse: {response}")
-        print("=== FIN REGISTER ===")
-        
         return jsonify(response), 201
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR: {str(e)}")
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de l'inscription")
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     try:
         data = request.get_json()
-        print("=== DÉBUT LOGIN ===")
-        print(f"Données: {data}")
+        logger.debug("Connexion", extra={'donnees': data})
         
         if not data or not data.get('email') or not data.get('password'):
             return jsonify({'error': 'Email and password required'}), 400
         
+        # Avant la requête SQL et le calcul du hash
+        limitation.verifier_connexion(data['email'])
         user = Utilisateur.query.filter_by(email=data['email']).first()
-        print(f"Utilisateur trouvé: {user}")
         
         if user and user.check_password(data['password']):
+            # Hash ré-calculé avec les paramètres courants
+            if user in db.session.dirty:
+                db.session.commit()
+                logger.info("Mot de passe ré-haché", extra={'utilisateur_id': user.id})
             # CORRECTION : Utiliser l'email comme identity (doit être une string)
-            token = create_access_token(identity=user.email)
-            response = {'access_token': token, 'user': user.to_dict()}
-            print(f"Réponse succès: {response}")
-            print("=== FIN LOGIN ===")
+            limitation.connexion_reussie(data['email'])
+            response = {**create_tokens(user), 'user': user.to_dict()}
+            logger.info("Connexion réussie", extra={'utilisateur_id': user.id})
             return jsonify(response), 200
         else:
-            print("Échec authentification")
-            print("=== FIN LOGIN ===")
+            logger.info("Échec de connexion", extra={'email': data['email']})
             return jsonify({'error': 'Invalid credentials'}), 401
             
+    except limitation.TropDeTentatives as e:
+        logger.warning("Connexion refusée: limite %s atteinte", e.regle)
+        return jsonify({'error': 'Trop de tentatives, réessayez plus tard'}), 429, {'Retry-After': str(e.attente)}
+    except mots_de_passe.ServeurOccupe:
+        logger.warning("Connexion refusée: trop de vérifications en attente")
+        return jsonify({'error': 'Serveur occupé, réessayez'}), 503, {'Retry-After': '1'}
     except Exception as e:
-        print(f"ERREUR LOGIN: {str(e)}")
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la connexion")
+        return jsonify({'error': str(e)}), 500
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Nouveau couple de tokens contre un refresh token, révoqué au passage
+    (rotation: un refresh token rejoué est refusé). Les claims sont relus en
+    base: un rôle modifié ou un compte supprimé prend effet ici.
+    """
+    try:
+        user = Utilisateur.query.filter_by(email=get_jwt_identity()).first()
+        revocation.revoquer(get_jwt())
+        if not user:
+            logger.info("Renouvellement refusé: utilisateur supprimé", extra={'email': get_jwt_identity()})
+            return jsonify({'error': 'Utilisateur non trouvé'}), 401
+        return jsonify(create_tokens(user)), 200
+    except Exception as e:
+        logger.exception("Erreur lors du renouvellement du token")
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
-        print("=== DÉBUT PROFILE ===")
-        
         # Récupérer l'email depuis le token JWT
         user_email = get_jwt_identity()
-        print(f"Email du token JWT: {user_email}")
         
         # Trouver l'utilisateur par email
         user = Utilisateur.query.filter_by(email=user_email).first()
-        print(f"Utilisateur trouvé en DB: {user}")
         
         if not user:
-            print("Utilisateur non trouvé en base de données")
+            logger.warning("Profil demandé pour un utilisateur inexistant", extra={'email': user_email})
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
             
-        print(f"Profil retourné: {user.to_dict()}")
-        print("=== FIN PROFILE ===")
-        
         return jsonify({'user': user.to_dict()}), 200
         
     except Exception as e:
-        print(f"ERREUR PROFILE: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la lecture du profil")
         return jsonify({'error': str(e)}), 500
     
     
@@ -156,8 +183,6 @@ def logout_expired_friendly():
     Déconnexion qui gère proprement les tokens expirés
     """
     try:
-        print("🔄 Traitement déconnexion")
-        
         # Variables pour les infos du token
         user_email = None
         token_status = "unknown"
@@ -169,14 +194,24 @@ def logout_expired_friendly():
             
             if user_email:
                 token_status = "valid"
-                print(f"✅ Token valide pour: {user_email}")
             else:
                 token_status = "invalid_or_missing"
-                print("ℹ️ Pas de token valide")
                 
         except Exception as jwt_error:
             token_status = "expired_or_invalid"
-            print(f"⚠️ Token expiré/invalide: {str(jwt_error)}")
+            logger.debug("Déconnexion avec un token expiré ou invalide: %s", jwt_error)
+        
+        if token_status == "valid":
+            # Le token reste refusé jusqu'à son expiration
+            revocation.revoquer(get_jwt())
+        
+        # Refresh token éventuellement transmis dans le corps: révoqué lui aussi
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                revocation.revoquer(decode_token(refresh_token))
+            except (JWTExtendedException, PyJWTError) as jwt_error:
+                logger.debug("Refresh token ignoré à la déconnexion: %s", jwt_error)
         
         # Réponse adaptée
         if user_email:
@@ -205,11 +240,11 @@ def logout_expired_friendly():
             response.set_cookie('access_token_cookie', '', expires=0)
             response.set_cookie('refresh_token_cookie', '', expires=0)
         
-        print(f"📤 Réponse: {response_data}")
+        logger.info("Déconnexion", extra={'email': user_email, 'token_status': token_status})
         return response, 200
         
     except Exception as e:
-        print(f"🔥 Erreur critique: {str(e)}")
+        logger.exception("Erreur lors de la déconnexion")
         # Réponse minimaliste en cas d'erreur critique
         return jsonify({
             'success': True,
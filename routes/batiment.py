@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 import sys
 import os
+import logging
 
 # Ajouter le chemin pour les imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -10,6 +11,7 @@ from models import db, Batiment, Daara, Chambre
 from decorators import role_required
 
 batiment_bp = Blueprint('batiment', __name__)
+logger = logging.getLogger(__name__)
 
 @batiment_bp.route('/batiments', methods=['GET'])
 @jwt_required()
@@ -33,9 +35,8 @@ def get_batiment(id):
 @role_required('ADMIN')
 def create_batiment():
     try:
-        print("=== DÉBUT CREATE BATIMENT ===")
         data = request.get_json()
-        print(f"Données reçues: {data}")
+        logger.debug("Création de bâtiment", extra={'donnees': data})
         
         required_fields = ['nom', 'daara_id']
         for field in required_fields:
@@ -56,8 +57,7 @@ def create_batiment():
         db.session.add(batiment)
         db.session.commit()
         
-        print(f"Batiment créé avec ID: {batiment.id}")
-        print("=== FIN CREATE BATIMENT ===")
+        logger.info("Bâtiment créé", extra={'batiment_id': batiment.id})
         
         return jsonify({
             'message': 'Batiment créé avec succès',
@@ -66,9 +66,7 @@ def create_batiment():
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR CREATE BATIMENT: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création du bâtiment")
         return jsonify({'error': str(e)}), 500
 
 @batiment_bp.route('/batiments/<int:id>', methods=['PUT'])
@@ -103,23 +101,18 @@ def update_batiment(id):
 @role_required('ADMIN')
 def delete_batiment(id):
     try:
-        print(f"=== DÉBUT DELETE BATIMENT {id} ===")
         batiment = Batiment.query.get_or_404(id)
-        print(f"Batiment trouvé: {batiment.nom}")
         
         db.session.delete(batiment)
         db.session.commit()
         
-        print(f"Batiment {id} supprimé avec succès")
-        print("=== FIN DELETE BATIMENT ===")
+        logger.info("Bâtiment supprimé", extra={'batiment_id': id})
         
         return jsonify({'message': 'Batiment supprimé avec succès'}), 200
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR DELETE BATIMENT: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la suppression du bâtiment")
         return jsonify({'error': str(e)}), 500
 
 @batiment_bp.route('/batiments/daara/<int:daara_id>', methods=['GET'])
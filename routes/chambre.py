@@ -2,21 +2,24 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 import sys
 import os
+import logging
 
 # Ajouter le chemin pour les imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from models import db, Chambre, Batiment, Talibe
+from models import db, Chambre, Batiment, Talibe, Lit
 from decorators import role_required
+from pagination import liste_paginee
+import occupation
 
 chambre_bp = Blueprint('chambre', __name__)
+logger = logging.getLogger(__name__)
 
 @chambre_bp.route('/chambres', methods=['GET'])
 @jwt_required()
 def get_chambres():
     try:
-        chambres = Chambre.query.all()
-        return jsonify([chambre.to_dict() for chambre in chambres]), 200
+        return liste_paginee(Chambre.query, Chambre.id, Chambre.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -35,9 +38,8 @@ def get_chambre(id):
 @role_required('ADMIN')
 def create_chambre():
     try:
-        print("=== DÉBUT CREATE CHAMBRE ===")
         data = request.get_json()
-        print(f"Données reçues: {data}")
+        logger.debug("Création de chambre", extra={'donnees': data})
         
         required_fields = ['numero', 'batiment_id']
         for field in required_fields:
@@ -58,8 +60,7 @@ def create_chambre():
         db.session.add(chambre)
         db.session.commit()
         
-        print(f"Chambre créée avec ID: {chambre.id}")
-        print("=== FIN CREATE CHAMBRE ===")
+        logger.info("Chambre créée", extra={'chambre_id': chambre.id})
         
         return jsonify({
             'message': 'Chambre créée avec succès',
@@ -68,9 +69,7 @@ def create_chambre():
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR CREATE CHAMBRE: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création de la chambre")
         return jsonify({'error': str(e)}), 500
 
 @chambre_bp.route('/chambres/<int:id>', methods=['PUT'])
@@ -132,7 +131,8 @@ def get_talibes_by_chambre(id):
         if not chambre:
             return jsonify({'error': 'Chambre non trouvée'}), 404
             
-        talibes = Talibe.query.filter_by(chambre_id=id).all()
+        talibes = Talibe.query.options(*Talibe.serialization_options())\
+            .filter_by(chambre_id=id).all()
         return jsonify([talibe.to_dict() for talibe in talibes]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -143,9 +143,8 @@ def get_talibes_by_chambre(id):
 def affecter_talibe_chambre(id):
     """Affecter un talibé à une chambre"""
     try:
-        print(f"=== DÉBUT AFFECTATION TALIBE CHAMBRE {id} ===")
         data = request.get_json()
-        print(f"Données reçues: {data}")
+        logger.debug("Affectation d'un talibé à une chambre", extra={'chambre_id': id, 'donnees': data})
         
         if not data.get('talibe_id'):
             return jsonify({'error': 'ID du talibé requis'}), 400
@@ -159,41 +158,42 @@ def affecter_talibe_chambre(id):
         if not talibe:
             return jsonify({'error': 'Talibé non trouvé'}), 404
         
-        # Vérifier si la chambre a de la place
-        if chambre.nb_lits > 0:
-            talibes_dans_chambre = Talibe.query.filter_by(chambre_id=id).count()
-            if talibes_dans_chambre >= chambre.nb_lits:
-                return jsonify({'error': 'La chambre est pleine'}), 400
+        # Lit demandé (optionnel), sinon le premier lit libre de la chambre
+        lit = None
+        if data.get('lit_id'):
+            lit = db.session.get(Lit, data['lit_id'])
+            if not lit or lit.chambre_id != id:
+                return jsonify({'error': 'Lit non trouvé dans cette chambre'}), 404
         
-        # Retirer le talibé de son ancienne chambre s'il en a une
-        if talibe.chambre_id:
-            ancienne_chambre = db.session.get(Chambre, talibe.chambre_id)
-            if ancienne_chambre:
-                print(f"Talibé retiré de l'ancienne chambre: {ancienne_chambre.id}")
+        ancienne_chambre_id = talibe.chambre_id
         
         # CORRECTION: Utiliser datetime.now(timezone.utc)
         from datetime import datetime, timezone
         
-        # Affecter à la nouvelle chambre
-        talibe.chambre_id = id
+        # Affecter à la nouvelle chambre (libère l'ancien lit)
+        try:
+            lit = occupation.attribuer_lit(talibe, chambre, lit)
+        except occupation.ChambrePleine:
+            db.session.rollback()
+            return jsonify({'error': 'La chambre est pleine'}), 400
         talibe.date_entree = datetime.now(timezone.utc).date()  # CORRECTION
         
         db.session.commit()
         
-        print(f"Talibé {talibe.id} affecté à la chambre {id}")
-        print("=== FIN AFFECTATION TALIBE CHAMBRE ===")
+        logger.info("Talibé affecté à une chambre", extra={
+            'talibe_id': talibe.id, 'chambre_id': id, 'ancienne_chambre_id': ancienne_chambre_id
+        })
         
         return jsonify({
             'message': 'Talibé affecté à la chambre avec succès',
             'talibe': talibe.to_dict(),
-            'chambre': chambre.to_dict()
+            'chambre': chambre.to_dict(),
+            'lit': lit.to_dict() if lit else None
         }), 200
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR AFFECTATION TALIBE CHAMBRE: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de l'affectation du talibé à la chambre")
         return jsonify({'error': str(e)}), 500
 
 @chambre_bp.route('/chambres/<int:id>/retirer-talibe/<int:talibe_id>', methods=['POST'])
@@ -212,6 +212,7 @@ def retirer_talibe_chambre(id, talibe_id):
             return jsonify({'error': 'Ce talibé n\'est pas dans cette chambre'}), 400
         
         talibe.chambre_id = None
+        occupation.liberer_lit(talibe.id)
         db.session.commit()
         
         return jsonify({
@@ -240,33 +241,7 @@ def get_lits_by_chambre(id):
 @jwt_required()
 def get_statistiques_chambres():
     try:
-        total_chambres = Chambre.query.count()
-        chambres_pleines = 0
-        chambres_vides = 0
-        total_talibes = 0
-        total_lits = 0
-        
-        chambres = Chambre.query.all()
-        for chambre in chambres:
-            nb_talibes = len(chambre.talibes)
-            nb_lits = chambre.nb_lits
-            total_talibes += nb_talibes
-            total_lits += nb_lits
-            
-            if nb_lits > 0 and nb_talibes >= nb_lits:
-                chambres_pleines += 1
-            elif nb_talibes == 0:
-                chambres_vides += 1
-        
-        return jsonify({
-            'total_chambres': total_chambres,
-            'chambres_pleines': chambres_pleines,
-            'chambres_vides': chambres_vides,
-            'chambres_partiellement_occupees': total_chambres - chambres_pleines - chambres_vides,
-            'total_talibes_heberges': total_talibes,
-            'total_lits': total_lits,
-            'taux_occupation': round((total_talibes / total_lits * 100) if total_lits > 0 else 0, 2)
-        }), 200
+        return jsonify(occupation.statistiques_chambres()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -4,6 +4,7 @@ from marshmallow import ValidationError
 from models import db, Cours, Inscription, Talibe,Enseignant,enseignant_cours
 from schemas import CoursCreateSchema, CoursUpdateSchema
 from decorators import role_required
+from pagination import liste_paginee
 from datetime import datetime, timezone
 
 cours_bp = Blueprint('cours', __name__)
@@ -18,7 +19,7 @@ def get_cours():
         niveau = request.args.get('niveau')
         actif = request.args.get('actif', type=lambda x: x.lower() == 'true')
         
-        query = Cours.query
+        query = Cours.query.options(*Cours.serialization_options())
         
         if categorie:
             query = query.filter(Cours.categorie == categorie)
@@ -27,8 +28,7 @@ def get_cours():
         if actif is not None:
             query = query.filter(Cours.is_active == actif)
         
-        cours_list = query.all()
-        return jsonify([cours.to_dict() for cours in cours_list]), 200
+        return liste_paginee(query, Cours.id, Cours.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -126,7 +126,7 @@ def delete_cours(id):
             return jsonify({'error': 'Cours non trouvé'}), 404
         
         # Vérifier s'il y a des talibés inscrits
-        if cours.talibes:
+        if cours.compter_talibes():
             return jsonify({
                 'error': 'Impossible de supprimer ce cours car des talibés y sont inscrits'
             }), 400
@@ -230,7 +230,7 @@ def get_cours_talibes(id):
         if not cours:
             return jsonify({'error': 'Cours non trouvé'}), 404
         
-        talibes_inscrits = Talibe.query\
+        talibes_inscrits = Talibe.query.options(*Talibe.serialization_options())\
             .join(Inscription)\
             .filter(Inscription.cours_id == cours.id)\
             .all()
@@ -259,7 +259,8 @@ def get_cours_enseignants(id):
         ).scalars().all()
         
         # 🔥 Récupérer les enseignants
-        enseignants = Enseignant.query.filter(Enseignant.id.in_(enseignant_ids)).all()
+        enseignants = Enseignant.query.options(*Enseignant.serialization_options())\
+            .filter(Enseignant.id.in_(enseignant_ids)).all()
         
         # 🔥 Convertir en JSON
         return jsonify([enseignant.to_dict() for enseignant in enseignants]), 200
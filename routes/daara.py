@@ -2,21 +2,23 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import sys
 import os
+import logging
 
 # Ajouter le chemin pour les imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from models import db, Daara, Talibe, Enseignant, Batiment
 from decorators import role_required
+from pagination import liste_paginee
 
 daara_bp = Blueprint('daara', __name__)
+logger = logging.getLogger(__name__)
 
 @daara_bp.route('/daaras', methods=['GET'])
 @jwt_required()
 def get_daaras():
     try:
-        daaras = Daara.query.all()
-        return jsonify([daara.to_dict() for daara in daaras]), 200
+        return liste_paginee(Daara.query, Daara.id, Daara.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -33,9 +35,8 @@ def get_daara(id):
 @role_required('ADMIN')
 def create_daara():
     try:
-        print("=== DÉBUT CREATE DAARA ===")
         data = request.get_json()
-        print(f"Données reçues: {data}")
+        logger.debug("Création de daara", extra={'donnees': data})
         
         required_fields = ['nom', 'lieu']
         for field in required_fields:
@@ -54,8 +55,7 @@ def create_daara():
         db.session.add(daara)
         db.session.commit()
         
-        print(f"Daara créé avec ID: {daara.id}")
-        print("=== FIN CREATE DAARA ===")
+        logger.info("Daara créé", extra={'daara_id': daara.id})
         
         return jsonify({
             'message': 'Daara créé avec succès',
@@ -64,9 +64,7 @@ def create_daara():
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR CREATE DAARA: {str(e)}")
-        import traceback
-        print(f"TRACEBACK: {traceback.format_exc()}")
+        logger.exception("Erreur lors de la création du daara")
         return jsonify({'error': str(e)}), 500
 
 @daara_bp.route('/update_daara/<int:id>', methods=['PUT'])
@@ -119,7 +117,8 @@ def delete_daara(id):
 @jwt_required()
 def get_talibes_by_daara(id):
     try:
-        talibes = Talibe.query.filter_by(daara_id=id).all()
+        talibes = Talibe.query.options(*Talibe.serialization_options())\
+            .filter_by(daara_id=id).all()
         return jsonify([talibe.to_dict() for talibe in talibes]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -128,7 +127,8 @@ def get_talibes_by_daara(id):
 @jwt_required()
 def get_enseignants_by_daara(id):
     try:
-        enseignants = Enseignant.query.filter_by(daara_id=id).all()
+        enseignants = Enseignant.query.options(*Enseignant.serialization_options())\
+            .filter_by(daara_id=id).all()
         return jsonify([enseignant.to_dict() for enseignant in enseignants]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
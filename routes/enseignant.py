@@ -1,17 +1,20 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from models import db, Enseignant, Cours,RoleEnum, Talibe, Inscription
 from decorators import role_required
+from pagination import liste_paginee
 
 enseignant_bp = Blueprint('enseignant', __name__)
+logger = logging.getLogger(__name__)
 
 @enseignant_bp.route('/enseignants', methods=['GET'])
 @jwt_required()
 def get_enseignants():
     try:
-        enseignants = Enseignant.query.all()
-        return jsonify([enseignant.to_dict() for enseignant in enseignants]), 200
+        query = Enseignant.query.options(*Enseignant.serialization_options())
+        return liste_paginee(query, Enseignant.id, Enseignant.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -19,7 +22,7 @@ def get_enseignants():
 @jwt_required()
 def get_enseignant(id):
     try:
-        enseignant = Enseignant.query.get(id)
+        enseignant = db.session.get(Enseignant, id, options=Enseignant.serialization_options())
         if not enseignant:
             return jsonify({'error': 'Enseignant non trouvé'}), 404
         return jsonify(enseignant.to_dict()), 200
@@ -32,7 +35,7 @@ def get_enseignant(id):
 def create_enseignant():
     try:
         data = request.get_json()
-        print(f"Données création enseignant: {data}")
+        logger.debug("Création d'enseignant", extra={'donnees': data})
         
         if not data:
             return jsonify({'error': 'Données JSON requises'}), 400
@@ -85,7 +88,7 @@ def create_enseignant():
         db.session.add(enseignant)
         db.session.commit()
         
-        print(f"Enseignant créé avec ID: {enseignant.id}")
+        logger.info("Enseignant créé", extra={'enseignant_id': enseignant.id})
         
         return jsonify({
             'message': 'Enseignant créé avec succès',
@@ -94,7 +97,7 @@ def create_enseignant():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Erreur création enseignant: {str(e)}")
+        logger.exception("Erreur lors de la création de l'enseignant")
         return jsonify({'error': f'Erreur lors de la création: {str(e)}'}), 500
 
 @enseignant_bp.route('/enseignants/<int:id>', methods=['PUT'])
@@ -166,7 +169,9 @@ def get_cours_enseignant(id):
         if not enseignant:
             return jsonify({'error': 'Enseignant non trouvé'}), 404
             
-        cours_list = enseignant.cours
+        cours_list = Cours.query.options(*Cours.serialization_options())\
+            .filter(Cours.enseignants.any(Enseignant.id == id))\
+            .all()
         return jsonify([cours.to_dict() for cours in cours_list]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -188,7 +193,7 @@ def get_talibes_enseignant(id):
         cours_ids = [cours.id for cours in enseignant.cours]
         
         # Récupérer les talibés inscrits dans ces cours
-        talibes = Talibe.query\
+        talibes = Talibe.query.options(*Talibe.serialization_options())\
             .join(Inscription)\
             .filter(Inscription.cours_id.in_(cours_ids))\
             .distinct()\
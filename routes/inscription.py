@@ -1,18 +1,22 @@
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timezone
 from models import db, Inscription, Talibe, Cours
 from decorators import role_required
+from pagination import liste_paginee
+import inscriptions_masse
 
 inscription_bp = Blueprint('inscription', __name__)
+logger = logging.getLogger(__name__)
 
 @inscription_bp.route('/inscriptions', methods=['GET'])
 @jwt_required()
 def get_inscriptions():
     """Récupérer toutes les inscriptions"""
     try:
-        inscriptions = Inscription.query.all()
-        return jsonify([inscription.to_dict() for inscription in inscriptions]), 200
+        query = Inscription.query.options(*Inscription.serialization_options())
+        return liste_paginee(query, Inscription.id, Inscription.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -23,8 +27,7 @@ def create_inscription():
     """Créer une nouvelle inscription"""
     try:
         data = request.get_json()
-        print(f"=== CRÉATION INSCRIPTION ===")
-        print(f"Données: {data}")
+        logger.debug("Création d'inscription", extra={'donnees': data})
         
         if not data:
             return jsonify({'error': 'Données JSON requises'}), 400
@@ -63,8 +66,7 @@ def create_inscription():
         db.session.add(inscription)
         db.session.commit()
         
-        print(f"Inscription créée avec ID: {inscription.id}")
-        print("=== FIN CRÉATION INSCRIPTION ===")
+        logger.info("Inscription créée", extra={'inscription_id': inscription.id})
         
         return jsonify({
             'message': 'Inscription créée avec succès',
@@ -73,7 +75,34 @@ def create_inscription():
         
     except Exception as e:
         db.session.rollback()
-        print(f"ERREUR CRÉATION INSCRIPTION: {str(e)}")
+        logger.exception("Erreur lors de la création de l'inscription")
+        return jsonify({'error': str(e)}), 500
+
+@inscription_bp.route('/inscriptions/masse', methods=['POST'])
+@jwt_required()
+@role_required('ADMIN')
+def create_inscriptions_masse():
+    """
+    Inscrire en masse: {"talibe_ids": [...], "cours_ids": [...]} ou
+    {"paires": [{"talibe_id": .., "cours_id": ..}]}. Renvoie un rapport par paire.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Données JSON requises'}), 400
+        
+        try:
+            paires = inscriptions_masse.paires_depuis(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        rapport = inscriptions_masse.inscrire_en_masse(paires, note=data.get('note'))
+        db.session.commit()
+        
+        return jsonify(rapport), 200
+        
+    except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @inscription_bp.route('/inscriptions/<int:id>', methods=['GET'])
@@ -144,8 +173,10 @@ def get_cours_by_talibe(talibe_id):
         if not talibe:
             return jsonify({'error': 'Talibé non trouvé'}), 404
         
-        inscriptions = Inscription.query.filter_by(talibe_id=talibe_id).all()
-        cours_list = [inscription.cours for inscription in inscriptions]
+        cours_list = Cours.query.options(*Cours.serialization_options())\
+            .join(Inscription)\
+            .filter(Inscription.talibe_id == talibe_id)\
+            .all()
         
         return jsonify([cours.to_dict() for cours in cours_list]), 200
     except Exception as e:
@@ -160,8 +191,10 @@ def get_talibes_by_cours(cours_id):
         if not cours:
             return jsonify({'error': 'Cours non trouvé'}), 404
         
-        inscriptions = Inscription.query.filter_by(cours_id=cours_id).all()
-        talibes_list = [inscription.talibe for inscription in inscriptions]
+        talibes_list = Talibe.query.options(*Talibe.serialization_options())\
+            .join(Inscription)\
+            .filter(Inscription.cours_id == cours_id)\
+            .all()
         
         return jsonify([talibe.to_dict() for talibe in talibes_list]), 200
     except Exception as e:
@@ -176,7 +209,8 @@ def get_inscriptions_by_talibe(talibe_id):
         if not talibe:
             return jsonify({'error': 'Talibé non trouvé'}), 404
         
-        inscriptions = Inscription.query.filter_by(talibe_id=talibe_id).all()
+        inscriptions = Inscription.query.options(*Inscription.serialization_options())\
+            .filter_by(talibe_id=talibe_id).all()
         return jsonify([inscription.to_dict() for inscription in inscriptions]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -190,7 +224,8 @@ def get_inscriptions_by_cours(cours_id):
         if not cours:
             return jsonify({'error': 'Cours non trouvé'}), 404
         
-        inscriptions = Inscription.query.filter_by(cours_id=cours_id).all()
+        inscriptions = Inscription.query.options(*Inscription.serialization_options())\
+            .filter_by(cours_id=cours_id).all()
         return jsonify([inscription.to_dict() for inscription in inscriptions]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
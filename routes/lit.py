@@ -6,11 +6,25 @@ import os
 # Ajouter le chemin pour les imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from models import db, Lit, Chambre
+from sqlalchemy.orm import joinedload
+from models import db, Lit, Chambre, Talibe
 from decorators import role_required
+from pagination import liste_paginee
+import occupation
 
 lit_bp = Blueprint('lit', __name__)
 
+def lit_avec_chambre(lit):
+    lit_data = lit.to_dict()
+    lit_data['chambre'] = lit.chambre.to_dict() if lit.chambre else None
+    return lit_data
+
+def lit_avec_batiment(lit):
+    lit_data = lit_avec_chambre(lit)
+    if lit.chambre and lit.chambre.batiment:
+        lit_data['batiment'] = lit.chambre.batiment.to_dict()
+    return lit_data
+
 # === ROUTES POUR LITS ===
 
 @lit_bp.route('/lits', methods=['GET'])
@@ -20,15 +34,8 @@ def get_lits():
     Récupérer tous les lits
     """
     try:
-        lits = Lit.query.all()
-        
-        lits_data = []
-        for lit in lits:
-            lit_data = lit.to_dict()
-            lit_data['chambre'] = lit.chambre.to_dict() if lit.chambre else None
-            lits_data.append(lit_data)
-            
-        return jsonify(lits_data), 200
+        query = Lit.query.options(*Lit.serialization_options())
+        return liste_paginee(query, Lit.id, lit_avec_chambre)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -132,6 +139,9 @@ def update_lit(id):
             # Mettre à jour les compteurs des anciennes et nouvelles chambres
             old_chambre_id = lit.chambre_id
             lit.chambre_id = data['chambre_id']
+            if old_chambre_id != lit.chambre_id:
+                # L'occupant reste dans son ancienne chambre
+                lit.talibe_id = None
             
             # Mettre à jour le compteur de l'ancienne chambre
             old_chambre = db.session.get(Chambre, old_chambre_id)
@@ -203,32 +213,73 @@ def get_lits_by_chambre(chambre_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@lit_bp.route('/lits/statistiques', methods=['GET'])
-@jwt_required()
-def get_statistiques_lits():
+@lit_bp.route('/lits/<int:id>/affecter', methods=['POST'])
+@role_required('ADMIN')
+def affecter_lit(id):
     """
-    Récupérer les statistiques des lits
+    Installer un talibé sur un lit (et dans la chambre du lit)
     """
     try:
-        total_lits = Lit.query.count()
-        total_chambres = Chambre.query.count()
+        lit = db.session.get(Lit, id)
+        if not lit:
+            return jsonify({'error': 'Lit non trouvé'}), 404
+        
+        data = request.get_json() or {}
+        talibe = db.session.get(Talibe, data.get('talibe_id')) if data.get('talibe_id') else None
+        if not talibe:
+            return jsonify({'error': 'Talibé non trouvé'}), 404
+        
+        if lit.chambre is None:
+            return jsonify({'error': "Le lit n'est rattaché à aucune chambre"}), 400
         
-        # Calculer les lits occupés (en supposant qu'un talibé = un lit occupé)
-        chambres = Chambre.query.all()
-        lits_occupes = 0
+        try:
+            occupation.attribuer_lit(talibe, lit.chambre, lit)
+        except occupation.ChambrePleine:
+            db.session.rollback()
+            return jsonify({'error': 'Le lit est déjà occupé'}), 400
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Talibé installé sur le lit avec succès',
+            'lit': lit.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@lit_bp.route('/lits/<int:id>/liberer', methods=['POST'])
+@role_required('ADMIN')
+def liberer_lit(id):
+    """
+    Libérer un lit (le talibé reste dans la chambre)
+    """
+    try:
+        lit = db.session.get(Lit, id)
+        if not lit:
+            return jsonify({'error': 'Lit non trouvé'}), 404
         
-        for chambre in chambres:
-            lits_occupes += len(chambre.talibes)
+        lit.talibe_id = None
+        db.session.commit()
         
         return jsonify({
-            'total_lits': total_lits,
-            'total_chambres': total_chambres,
-            'lits_occupes': lits_occupes,
-            'lits_disponibles': total_lits - lits_occupes,
-            'taux_occupation_lits': round((lits_occupes / total_lits * 100) if total_lits > 0 else 0, 2),
-            'moyenne_lits_par_chambre': round(total_lits / total_chambres, 2) if total_chambres > 0 else 0
+            'message': 'Lit libéré avec succès',
+            'lit': lit.to_dict()
         }), 200
         
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@lit_bp.route('/lits/statistiques', methods=['GET'])
+@jwt_required()
+def get_statistiques_lits():
+    """
+    Récupérer les statistiques des lits
+    """
+    try:
+        return jsonify(occupation.statistiques_lits()), 200
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -243,47 +294,22 @@ def rechercher_lits():
         batiment_id = request.args.get('batiment_id', type=int)
         disponible = request.args.get('disponible', type=str)
         
-        query = Lit.query
+        query = Lit.query.options(joinedload(Lit.chambre).joinedload(Chambre.batiment))
         
         if chambre_id:
-            query = query.filter_by(chambre_id=chambre_id)
+            query = query.filter(Lit.chambre_id == chambre_id)
         
         if batiment_id:
-            query = query.join(Chambre).filter(Chambre.batiment_id == batiment_id)
-        
-        lits = query.all()
+            query = query.join(Lit.chambre).filter(Chambre.batiment_id == batiment_id)
         
-        # Filtrer par disponibilité si demandé
+        # Disponibilité filtrée en SQL: un lit est libre s'il n'a pas d'occupant
         if disponible:
-            lits_filtres = []
-            for lit in lits:
-                # Un lit est considéré comme occupé si sa chambre a plus de talibés que de lits disponibles
-                chambre = lit.chambre
-                lits_occupes = len(chambre.talibes)
-                est_occupe = lits_occupes >= chambre.nb_lits
-                
-                if disponible.lower() == 'true' and not est_occupe:
-                    lits_filtres.append(lit)
-                elif disponible.lower() == 'false' and est_occupe:
-                    lits_filtres.append(lit)
-            
-            lits = lits_filtres
+            if disponible.lower() == 'true':
+                query = query.filter(Lit.talibe_id.is_(None))
+            elif disponible.lower() == 'false':
+                query = query.filter(Lit.talibe_id.isnot(None))
         
-        lits_data = []
-        for lit in lits:
-            lit_data = lit.to_dict()
-            lit_data['chambre'] = lit.chambre.to_dict() if lit.chambre else None
-            if lit.chambre and lit.chambre.batiment:
-                lit_data['batiment'] = lit.chambre.batiment.to_dict()
-            
-            # Déterminer si le lit est disponible
-            chambre = lit.chambre
-            lits_occupes = len(chambre.talibes)
-            lit_data['disponible'] = lits_occupes < chambre.nb_lits
-            
-            lits_data.append(lit_data)
-        
-        return jsonify(lits_data), 200
+        return liste_paginee(query, Lit.id, lit_avec_batiment)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
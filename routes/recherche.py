@@ -0,0 +1,41 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+import recherche
+
+recherche_bp = Blueprint('recherche', __name__)
+
+@recherche_bp.route('/search', methods=['GET'])
+@jwt_required()
+def rechercher():
+    """
+    Rechercher des talibés / enseignants par nom, prénom, matricule, père, mère ou email.
+    ?q=<texte>&type=talibe|enseignant&limit=<n>&offset=<n>
+    """
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'error': 'Le paramètre q est requis'}), 400
+        
+        type_ = request.args.get('type')
+        if type_ and type_ not in recherche.TYPES:
+            return jsonify({'error': 'Type inconnu'}), 400
+        
+        limite = request.args.get('limit', recherche.LIMITE_PAR_DEFAUT, type=int)
+        decalage = request.args.get('offset', 0, type=int)
+        if limite < 1 or decalage < 0:
+            return jsonify({'error': 'Paramètres de pagination invalides'}), 400
+        limite = min(limite, recherche.LIMITE_MAX)
+        
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        lignes = recherche.rechercher(q, type_, limite + 1, decalage)
+        suivant = decalage + limite if len(lignes) > limite else None
+        
+        return jsonify({
+            'items': [recherche.resultat_to_dict(ligne) for ligne in lignes[:limite]],
+            'limit': limite,
+            'offset': decalage,
+            'next_offset': suivant
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
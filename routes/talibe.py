@@ -1,9 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
-from models import db, Talibe, Cours, RoleEnum, Inscription
+from models import db, Talibe, Cours, RoleEnum, Inscription, Chambre
 from decorators import role_required
-import traceback
+from pagination import liste_paginee
+import occupation
+import photos
+import inscriptions_masse
+import import_talibes
+import logging
 
 # Import conditionnel pour Inscription
 try:
@@ -11,16 +16,19 @@ try:
     INSCRIPTION_AVAILABLE = True
 except ImportError:
     INSCRIPTION_AVAILABLE = False
-    print("Avertissement: Le modèle Inscription n'est pas disponible")
 
 talibe_bp = Blueprint('talibe', __name__)
+logger = logging.getLogger(__name__)
+
+if not INSCRIPTION_AVAILABLE:
+    logger.warning("Le modèle Inscription n'est pas disponible")
 
 @talibe_bp.route('/talibes', methods=['GET'])
 @jwt_required()
 def get_talibes():
     try:
-        talibes = Talibe.query.all()
-        return jsonify([talibe.to_dict() for talibe in talibes]), 200
+        query = Talibe.query.options(*Talibe.serialization_options())
+        return liste_paginee(query, Talibe.id, Talibe.to_dict)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -28,7 +36,7 @@ def get_talibes():
 @jwt_required()
 def get_talibe(id):
     try:
-        talibe = Talibe.query.get(id)
+        talibe = db.session.get(Talibe, id, options=Talibe.serialization_options())
         if not talibe:
             return jsonify({'error': 'Talibé non trouvé'}), 404
         return jsonify(talibe.to_dict()), 200
@@ -44,7 +52,7 @@ def to_int_or_none(value):
 def create_talibe():
     try:
         data = request.get_json()
-        print(f"Données création talibé: {data}")
+        logger.debug("Création de talibé", extra={'donnees': data})
         
         if not data:
             return jsonify({'error': 'Données JSON requises'}), 400
@@ -83,6 +91,10 @@ def create_talibe():
         
         # CORRECTION : Ajouter photo_profil
         talibe.photo_profil = data.get('photo_profil')  # ← AJOUT IMPORTANT
+        # Variantes produites par /upload/photo (sinon supprimées comme orphelines)
+        if not photos.variantes_valides(talibe.photo_profil, data.get('photo_variantes')):
+            return jsonify({'error': 'photo_variantes invalide'}), 400
+        talibe.photo_variantes = data.get('photo_variantes')
         
         # Gestion des dates
         if data.get('date_naissance'):
@@ -95,12 +107,10 @@ def create_talibe():
         else:
             talibe.date_entree = datetime.now().date() 
         
-        print(f"📸 Photo à enregistrer: {talibe.photo_profil}")  # Debug
-        
         db.session.add(talibe)
         db.session.commit()
         
-        print(f"✅ Talibé créé avec ID: {talibe.id}, Photo: {talibe.photo_profil}")
+        logger.info("Talibé créé", extra={'talibe_id': talibe.id, 'photo_profil': talibe.photo_profil})
         
         return jsonify({
             'message': 'Talibé créé avec succès',
@@ -108,11 +118,42 @@ def create_talibe():
         }), 201
         
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Erreur lors de la création du talibé")
         db.session.rollback()
-        print(f"Erreur création talibé: {str(e)}")
         return jsonify({'error': f'Erreur lors de la création: {str(e)}'}), 500
 
+@talibe_bp.route('/talibes/import', methods=['POST'])
+@jwt_required()
+@role_required('ADMIN')
+def importer_talibes():
+    """
+    Importer des talibés depuis un fichier CSV ou XLSX (champ 'fichier').
+    ?dry_run=1 valide sans écrire; ?erreurs=csv renvoie le fichier d'erreurs.
+    """
+    try:
+        fichier = request.files.get('fichier')
+        if not fichier:
+            return jsonify({'error': 'Le fichier est requis'}), 400
+        
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true')
+        try:
+            lignes = import_talibes.lire_fichier(fichier.stream, fichier.filename)
+            rapport = import_talibes.importer(lignes, dry_run=dry_run)
+        except import_talibes.FormatNonSupporte as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if request.args.get('erreurs') == 'csv':
+            return Response(rapport.erreurs_csv(), mimetype='text/csv', headers={
+                'Content-Disposition': 'attachment; filename=erreurs_import.csv'
+            })
+        
+        return jsonify(rapport.to_dict()), 200 if dry_run else 201
+        
+    except Exception as e:
+        logger.exception("Erreur lors de l'import des talibés")
+        db.session.rollback()
+        return jsonify({'error': f"Erreur lors de l'import: {str(e)}"}), 500
+
 @talibe_bp.route('/talibes/<int:talibe_id>/cours', methods=['POST'])
 @jwt_required()
 @role_required('ADMIN')
@@ -123,7 +164,7 @@ def affecter_cours_talibe(talibe_id):
             return jsonify({'error': 'Système d\'inscription non disponible'}), 501
         
         data = request.get_json()
-        print(f"Données affectation cours: {data}")
+        logger.debug("Affectation de cours", extra={'talibe_id': talibe_id, 'donnees': data})
         
         if not data or 'cours_ids' not in data:
             return jsonify({'error': 'La liste des cours_ids est requise'}), 400
@@ -141,35 +182,23 @@ def affecter_cours_talibe(talibe_id):
         if len(cours_list) != len(cours_ids):
             return jsonify({'error': 'Un ou plusieurs cours non trouvés'}), 404
         
-        # Créer les inscriptions
-        inscriptions = []
-        for cours_id in cours_ids:
-            # Vérifier si l'inscription existe déjà
-            inscription_existante = Inscription.query.filter_by(
-                talibe_id=talibe_id, 
-                cours_id=cours_id
-            ).first()
-            
-            if not inscription_existante:
-                inscription = Inscription(
-                    talibe_id=talibe_id,
-                    cours_id=cours_id,
-                    date_inscription=datetime.utcnow()
-                )
-                db.session.add(inscription)
-                inscriptions.append(inscription)
+        # Créer les inscriptions (paires existantes détectées en une requête)
+        rapport = inscriptions_masse.inscrire_en_masse([(talibe_id, cours_id) for cours_id in cours_ids])
+        inscrits = {resultat['cours_id'] for resultat in rapport['resultats']
+                    if resultat['statut'] == inscriptions_masse.INSCRIT}
         
         db.session.commit()
         
         return jsonify({
-            'message': f'{len(inscriptions)} cours affectés au talibé avec succès',
+            'message': f'{len(inscrits)} cours affectés au talibé avec succès',
             'talibe': talibe.to_dict(),
-            'cours_affectes': [cours.to_dict() for cours in cours_list]
+            'cours_affectes': [cours.to_dict() for cours in cours_list if cours.id in inscrits],
+            'rapport': rapport
         }), 200
         
     except Exception as e:
         db.session.rollback()
-        print(f"Erreur affectation cours: {str(e)}")
+        logger.exception("Erreur lors de l'affectation des cours")
         return jsonify({'error': str(e)}), 500
 
 # ... autres routes sans dépendance à Inscription ...
@@ -178,7 +207,8 @@ def affecter_cours_talibe(talibe_id):
 @jwt_required()
 def get_talibes_by_chambre(chambre_id):
     try:
-        talibes = Talibe.query.filter_by(chambre_id=chambre_id).all()
+        talibes = Talibe.query.options(*Talibe.serialization_options())\
+            .filter_by(chambre_id=chambre_id).all()
         return jsonify([talibe.to_dict() for talibe in talibes]), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -192,8 +222,10 @@ def get_talibes_by_cours(cours_id):
             return jsonify({'error': 'Cours non trouvé'}), 404
             
         # Récupérer les talibés via la table d'inscription
-        inscriptions = Inscription.query.filter_by(cours_id=cours_id).all()
-        talibes = [inscription.talibe for inscription in inscriptions]
+        talibes = Talibe.query.options(*Talibe.serialization_options())\
+            .join(Inscription)\
+            .filter(Inscription.cours_id == cours_id)\
+            .all()
         
         return jsonify([talibe.to_dict() for talibe in talibes]), 200
     except Exception as e:
@@ -209,8 +241,10 @@ def get_cours_by_talibe(id):
             return jsonify({'error': 'Talibé non trouvé'}), 404
             
         # Récupérer les cours via la table d'inscription
-        inscriptions = Inscription.query.filter_by(talibe_id=id).all()
-        cours_list = [inscription.cours for inscription in inscriptions]
+        cours_list = Cours.query.options(*Cours.serialization_options())\
+            .join(Inscription)\
+            .filter(Inscription.talibe_id == id)\
+            .all()
         
         return jsonify([cours.to_dict() for cours in cours_list]), 200
     except Exception as e:
@@ -232,12 +266,28 @@ def update_talibe(id):
         
         # Champs modifiables
         updatable_fields = ['nom', 'prenom', 'pere', 'mere', 'niveau', 'extrait_naissance', 
-                           'daara_id', 'chambre_id', 'lieu_naissance', 'age', 'nb_annees']
+                           'daara_id', 'lieu_naissance', 'age', 'nb_annees']
         
         for field in updatable_fields:
             if field in data:
                 setattr(talibe, field, data[field])
         
+        # Changement de chambre: même contrôle de capacité que l'affectation
+        if 'chambre_id' in data and data['chambre_id'] != talibe.chambre_id:
+            if data['chambre_id'] is None:
+                occupation.liberer_lit(talibe.id)
+                talibe.chambre_id = None
+            else:
+                chambre = db.session.get(Chambre, data['chambre_id'])
+                if not chambre:
+                    db.session.rollback()
+                    return jsonify({'error': 'Chambre non trouvée'}), 404
+                try:
+                    occupation.attribuer_lit(talibe, chambre)
+                except occupation.ChambrePleine:
+                    db.session.rollback()
+                    return jsonify({'error': 'La chambre est pleine'}), 400
+        
         # Gestion des dates
         if 'date_naissance' in data and data['date_naissance']:
             talibe.date_naissance = datetime.strptime(data['date_naissance'], '%Y-%m-%d').date()
@@ -1,9 +1,13 @@
 import cloudinary
-import cloudinary.uploader
-from flask import request, jsonify, Blueprint
-from flask_jwt_extended import jwt_required
+from flask import request, jsonify, Blueprint, send_from_directory
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from models import Talibe, db
-import traceback
+from photos import urls_utilisateur
+import stockage
+import taches_photos
+import nettoyage_photos
+from decorators import role_required
+import logging
 import os
 
 # Configurer Cloudinary (à mettre dans config ou variables d'environnement)
@@ -16,6 +20,7 @@ cloudinary.config(
 
 # Blueprint
 upload_bp = Blueprint('upload', __name__, url_prefix='/api')
+logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
@@ -42,22 +47,22 @@ def upload_photo():
         if size > MAX_FILE_SIZE:
             return jsonify({'error': 'Fichier trop volumineux'}), 400
 
-        # Upload Cloudinary
-        result = cloudinary.uploader.upload(
-            file,
-            folder="profiles",
-            resource_type="image",
-            overwrite=True
+        # Ré-encodage WebP et variantes en arrière-plan, comme les photos des talibés.
+        # Le résultat de la tâche (public_id, variantes) est à renvoyer avec
+        # photo_profil / photo_variantes à la création ou la mise à jour.
+        tache_id = taches_photos.taches().soumettre(
+            taches_photos.envoyer_photo, file.read(), file.filename,
+            proprietaire=get_jwt_identity()
         )
 
         return jsonify({
-            'url': result.get('secure_url'),
-            'public_id': result.get('public_id'),
+            'job_id': tache_id,
+            'statut': taches_photos.EN_ATTENTE,
             'size': size
-        }), 200
+        }), 202, {'Location': f'/api/upload/jobs/{tache_id}'}
 
     except Exception as e:
-        traceback.print_exc()  # affichera le détail dans les logs Render
+        logger.exception("Erreur lors de l'envoi de la photo")
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
         
@@ -86,27 +91,17 @@ def upload_photo_for_talibe(talibe_id):
         if size > MAX_FILE_SIZE:
             return jsonify({'error': 'Fichier trop volumineux'}), 400
 
-        # Supprimer ancienne photo si existante
-        if talibe.photo_profil:
-            cloudinary.uploader.destroy(talibe.photo_profil, resource_type="image")
-
-        # Upload
-        result = cloudinary.uploader.upload(
-            file,
-            folder="profiles",
-            resource_type="image",
-            overwrite=True
+        # Envoi et remplacement de l'ancienne photo en arrière-plan
+        tache_id = taches_photos.taches().soumettre(
+            taches_photos.remplacer_photo, talibe.id, file.read(), file.filename,
+            proprietaire=get_jwt_identity()
         )
 
-        # Mettre à jour Talibe
-        talibe.photo_profil = result.get('public_id')
-        db.session.commit()
-
         return jsonify({
-            'url': result.get('secure_url'),
-            'public_id': result.get('public_id'),
+            'job_id': tache_id,
+            'statut': taches_photos.EN_ATTENTE,
             'size': size
-        }), 200
+        }), 202, {'Location': f'/api/upload/jobs/{tache_id}'}
 
     except Exception as e:
         db.session.rollback()
@@ -123,9 +118,13 @@ def delete_photo_for_talibe(talibe_id):
             return jsonify({'error': 'Talibe introuvable'}), 404
 
         if talibe.photo_profil:
-            cloudinary.uploader.destroy(talibe.photo_profil, resource_type="image")
+            public_ids = taches_photos.fichiers_photo(talibe)
             talibe.photo_profil = None
+            talibe.photo_variantes = None
             db.session.commit()
+            # Suppression dans le stockage en arrière-plan
+            taches_photos.taches().soumettre(taches_photos.supprimer_photo, public_ids,
+                                             proprietaire=get_jwt_identity())
             return jsonify({'message': 'Photo supprimée'}), 200
         else:
             return jsonify({'error': 'Aucune photo à supprimer'}), 404
@@ -135,28 +134,64 @@ def delete_photo_for_talibe(talibe_id):
         return jsonify({'error': str(e)}), 500
 
 
+# --- Suivi d'un envoi en arrière-plan ---
+@upload_bp.route('/upload/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_upload_job(job_id):
+    tache = taches_photos.taches().etat(job_id)
+    # Seul le demandeur (ou un administrateur) suit une tâche; sinon elle n'existe pas pour lui
+    if not tache or (tache.pop('proprietaire') != get_jwt_identity() and get_jwt().get('role') != 'ADMIN'):
+        return jsonify({'error': 'Tâche introuvable'}), 404
+    # URLs seulement pour un envoi de photo: nettoyage et suppression
+    # renvoient d'autres résultats, sans public_id
+    resultat = tache['resultat'] if isinstance(tache['resultat'], dict) else {}
+    if tache['statut'] == taches_photos.TERMINEE and resultat.get('public_id'):
+        tache['urls'] = urls_utilisateur(resultat['public_id'], resultat.get('variantes'))
+    return jsonify(tache), 200
+
+
+# --- Photos du stockage local ---
+@upload_bp.route('/photos/<path:public_id>', methods=['GET'])
+def get_photo_locale(public_id):
+    backend = stockage.courant()
+    if backend.nom != 'local':
+        return jsonify({'error': 'Photo introuvable'}), 404
+    return send_from_directory(backend.racine, public_id)
+
+
 # --- Nettoyer photos orphelines ---
 @upload_bp.route('/cleanup-orphaned', methods=['POST'])
+@jwt_required()
+@role_required('ADMIN')
 def cleanup_orphaned_photos():
-    """Supprimer les photos Cloudinary non référencées en BD"""
+    """
+    Supprimer les photos du stockage non référencées en BD (tâche en arrière-plan).
+    Corps optionnel: {"dry_run": true, "curseur": "<reprise>", "pages_max": n}
+    """
     try:
-        talibes = Talibe.query.filter(Talibe.photo_profil.isnot(None)).all()
-        photos_referencees = {t.photo_profil for t in talibes}
-
-        # Récupérer tous les fichiers dans Cloudinary (dossier profiles)
-        resources = cloudinary.Search().expression("folder:profiles").execute()
-        all_public_ids = {r['public_id'] for r in resources.get('resources', [])}
-
-        orphelines = all_public_ids - photos_referencees
-
-        for public_id in orphelines:
-            cloudinary.uploader.destroy(public_id, resource_type="image")
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Corps JSON invalide'}), 400
+        if not isinstance(data.get('dry_run', False), bool):
+            return jsonify({'error': 'dry_run doit être un booléen'}), 400
+        if not isinstance(data.get('curseur') or '', str):
+            return jsonify({'error': 'curseur doit être une chaîne'}), 400
+        pages_max = data.get('pages_max')
+        if pages_max is not None and (isinstance(pages_max, bool) or not isinstance(pages_max, int) or pages_max < 1):
+            return jsonify({'error': 'pages_max doit être un entier positif'}), 400
+        
+        tache_id = taches_photos.taches().soumettre(
+            nettoyage_photos.nettoyer,
+            dry_run=data.get('dry_run', False),
+            curseur=data.get('curseur'),
+            pages_max=pages_max,
+            proprietaire=get_jwt_identity()
+        )
 
         return jsonify({
-            'photos_referencees': len(photos_referencees),
-            'photos_orphelines_supprimees': len(orphelines),
-            'liste_orphelines': list(orphelines)
-        })
+            'job_id': tache_id,
+            'statut': taches_photos.EN_ATTENTE
+        }), 202, {'Location': f'/api/upload/jobs/{tache_id}'}
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,225 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, delete, insert, func
+from models import db, StatistiqueSnapshot, Talibe, Enseignant, Daara, Batiment, Chambre
+
+# Snapshot des statistiques du tableau de bord admin.
+# Reconstruit entièrement par reconstruire(), puis ajusté à chaque
+# insertion / suppression via les événements ORM ci-dessous.
+
+TOTAL = 'total'
+TALIBES_PAR_DAARA = 'talibes_par_daara'
+CHAMBRES_PAR_BATIMENT = 'chambres_par_batiment'
+META = 'meta'
+RECONSTRUCTION = 'reconstruction'
+
+TOTAUX = {
+    Talibe: 'talibes',
+    Enseignant: 'enseignants',
+    Daara: 'daaras',
+    Batiment: 'batiments',
+    Chambre: 'chambres',
+}
+
+snapshot = StatistiqueSnapshot.__table__
+
+
+def reconstruire():
+    """Recalcule tout le snapshot à partir des tables (à lancer après un import en masse)"""
+    maintenant = datetime.utcnow()
+    lignes = []
+
+    for modele, cle in TOTAUX.items():
+        lignes.append({'categorie': TOTAL, 'cle': cle, 'libelle': None,
+                       'valeur': modele.query.count()})
+
+    talibes_par_daara = db.session.query(
+        Daara.id, Daara.nom, func.count(Talibe.id)
+    ).outerjoin(Talibe).group_by(Daara.id).all()
+    for daara_id, nom, count in talibes_par_daara:
+        lignes.append({'categorie': TALIBES_PAR_DAARA, 'cle': str(daara_id),
+                       'libelle': nom, 'valeur': count})
+
+    chambres_par_batiment = db.session.query(
+        Batiment.id, Batiment.nom, func.count(Chambre.id)
+    ).outerjoin(Chambre).group_by(Batiment.id).all()
+    for batiment_id, nom, count in chambres_par_batiment:
+        lignes.append({'categorie': CHAMBRES_PAR_BATIMENT, 'cle': str(batiment_id),
+                       'libelle': nom, 'valeur': count})
+
+    lignes.append({'categorie': META, 'cle': RECONSTRUCTION, 'libelle': None, 'valeur': 0})
+    for ligne in lignes:
+        ligne['mis_a_jour'] = maintenant
+
+    db.session.execute(delete(snapshot))
+    db.session.execute(insert(snapshot), lignes)
+    db.session.commit()
+
+
+def lire():
+    """Lit le snapshot en une requête; le reconstruit s'il n'existe pas encore"""
+    lignes = db.session.execute(select(snapshot)).all()
+    if not any(ligne.categorie == META for ligne in lignes):
+        reconstruire()
+        lignes = db.session.execute(select(snapshot)).all()
+
+    totaux = {}
+    talibes_par_daara = []
+    chambres_par_batiment = []
+    reconstruit_le = mis_a_jour_le = None
+    for ligne in sorted(lignes, key=lambda l: (l.categorie, int(l.cle) if l.cle.isdigit() else 0)):
+        if ligne.categorie == TOTAL:
+            totaux[f'total_{ligne.cle}'] = ligne.valeur
+        elif ligne.categorie == TALIBES_PAR_DAARA:
+            talibes_par_daara.append({'daara': ligne.libelle, 'count': ligne.valeur})
+        elif ligne.categorie == CHAMBRES_PAR_BATIMENT:
+            chambres_par_batiment.append({'batiment': ligne.libelle, 'count': ligne.valeur})
+        elif ligne.categorie == META:
+            reconstruit_le = ligne.mis_a_jour
+        if mis_a_jour_le is None or ligne.mis_a_jour > mis_a_jour_le:
+            mis_a_jour_le = ligne.mis_a_jour
+
+    return {
+        'statistiques': totaux,
+        'talibes_par_daara': talibes_par_daara,
+        'chambres_par_batiment': chambres_par_batiment,
+        'snapshot': {
+            'reconstruit_le': reconstruit_le.isoformat(),
+            'mis_a_jour_le': mis_a_jour_le.isoformat(),
+            'age_secondes': round((datetime.utcnow() - reconstruit_le).total_seconds(), 3)
+        }
+    }
+
+
+# ---------------------------------------------------------------------------
+# Mise à jour incrémentale
+# ---------------------------------------------------------------------------
+
+def _ajuster(connection, categorie, cle, delta):
+    if cle is None:
+        return
+    connection.execute(
+        update(snapshot)
+        .where(snapshot.c.categorie == categorie, snapshot.c.cle == str(cle))
+        .values(valeur=snapshot.c.valeur + delta, mis_a_jour=datetime.utcnow())
+    )
+
+
+def _snapshot_existe(connection):
+    return connection.execute(
+        select(snapshot.c.id).where(snapshot.c.categorie == META)
+    ).first() is not None
+
+
+def _ajouter_groupe(connection, categorie, cible):
+    if _snapshot_existe(connection):
+        connection.execute(insert(snapshot).values(
+            categorie=categorie, cle=str(cible.id), libelle=cible.nom,
+            valeur=0, mis_a_jour=datetime.utcnow()
+        ))
+
+
+def _retirer_groupe(connection, categorie, cible):
+    connection.execute(
+        delete(snapshot).where(snapshot.c.categorie == categorie, snapshot.c.cle == str(cible.id))
+    )
+
+
+def _deplacement(connection, target, attribut, categorie):
+    historique = inspect(target).attrs[attribut].history
+    if not historique.has_changes():
+        return
+    for ancien in historique.deleted or []:
+        _ajuster(connection, categorie, ancien, -1)
+    for nouveau in historique.added or []:
+        _ajuster(connection, categorie, nouveau, 1)
+
+
+def _renommage(connection, target, categorie):
+    if inspect(target).attrs.nom.history.has_changes():
+        connection.execute(
+            update(snapshot)
+            .where(snapshot.c.categorie == categorie, snapshot.c.cle == str(target.id))
+            .values(libelle=target.nom, mis_a_jour=datetime.utcnow())
+        )
+
+
+def _ecouter_totaux(modele, cle):
+    @event.listens_for(modele, 'after_insert')
+    def _apres_insertion(mapper, connection, target):
+        _ajuster(connection, TOTAL, cle, 1)
+
+    @event.listens_for(modele, 'after_delete')
+    def _apres_suppression(mapper, connection, target):
+        _ajuster(connection, TOTAL, cle, -1)
+
+
+for _modele, _cle in TOTAUX.items():
+    _ecouter_totaux(_modele, _cle)
+
+
+@event.listens_for(Talibe, 'after_insert')
+def _talibe_insere(mapper, connection, target):
+    _ajuster(connection, TALIBES_PAR_DAARA, target.daara_id, 1)
+
+
+@event.listens_for(Talibe, 'after_delete')
+def _talibe_supprime(mapper, connection, target):
+    _ajuster(connection, TALIBES_PAR_DAARA, target.daara_id, -1)
+
+
+# active_history: charge l'ancienne valeur à l'affectation (même expirée après
+# un commit), pour savoir quel groupe décrémenter
+@event.listens_for(Talibe.daara_id, 'set', active_history=True)
+@event.listens_for(Chambre.batiment_id, 'set', active_history=True)
+def _charger_ancienne_valeur(target, value, oldvalue, initiator):
+    pass
+
+
+@event.listens_for(Talibe, 'after_update')
+def _talibe_modifie(mapper, connection, target):
+    _deplacement(connection, target, 'daara_id', TALIBES_PAR_DAARA)
+
+
+@event.listens_for(Chambre, 'after_insert')
+def _chambre_inseree(mapper, connection, target):
+    _ajuster(connection, CHAMBRES_PAR_BATIMENT, target.batiment_id, 1)
+
+
+@event.listens_for(Chambre, 'after_delete')
+def _chambre_supprimee(mapper, connection, target):
+    _ajuster(connection, CHAMBRES_PAR_BATIMENT, target.batiment_id, -1)
+
+
+@event.listens_for(Chambre, 'after_update')
+def _chambre_modifiee(mapper, connection, target):
+    _deplacement(connection, target, 'batiment_id', CHAMBRES_PAR_BATIMENT)
+
+
+@event.listens_for(Daara, 'after_insert')
+def _daara_insere(mapper, connection, target):
+    _ajouter_groupe(connection, TALIBES_PAR_DAARA, target)
+
+
+@event.listens_for(Daara, 'after_delete')
+def _daara_supprime(mapper, connection, target):
+    _retirer_groupe(connection, TALIBES_PAR_DAARA, target)
+
+
+@event.listens_for(Daara, 'after_update')
+def _daara_modifie(mapper, connection, target):
+    _renommage(connection, target, TALIBES_PAR_DAARA)
+
+
+@event.listens_for(Batiment, 'after_insert')
+def _batiment_insere(mapper, connection, target):
+    _ajouter_groupe(connection, CHAMBRES_PAR_BATIMENT, target)
+
+
+@event.listens_for(Batiment, 'after_delete')
+def _batiment_supprime(mapper, connection, target):
+    _retirer_groupe(connection, CHAMBRES_PAR_BATIMENT, target)
+
+
+@event.listens_for(Batiment, 'after_update')
+def _batiment_modifie(mapper, connection, target):
+    _renommage(connection, target, CHAMBRES_PAR_BATIMENT)
@@ -0,0 +1,158 @@
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from flask import current_app, has_app_context
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+
+# Stockage des photos: interface commune, implémentée pour Cloudinary et pour
+# le système de fichiers local (développement, tests).
+
+
+class Stockage(ABC):
+    nom = None
+
+    @abstractmethod
+    def envoyer(self, contenu, dossier, nom_fichier):
+        """Enregistre le contenu (bytes) et renvoie son public_id"""
+
+    @abstractmethod
+    def supprimer(self, public_id):
+        pass
+
+    def supprimer_lot(self, public_ids):
+        for public_id in public_ids:
+            self.supprimer(public_id)
+
+    @abstractmethod
+    def lister(self, dossier, curseur=None, taille=100):
+        """
+        Une page du dossier: ([{'public_id', 'cree_le'}], curseur_suivant),
+        curseur_suivant valant None à la dernière page
+        """
+
+    @abstractmethod
+    def url(self, public_id, options):
+        """URL de la photo; options: transformation de la variante demandée"""
+
+    def cle_cache(self):
+        """Ce qui, s'il change, rend les URLs déjà calculées invalides"""
+        return self.nom
+
+
+class StockageCloudinary(Stockage):
+    nom = 'cloudinary'
+
+    def envoyer(self, contenu, dossier, nom_fichier):
+        resultat = cloudinary.uploader.upload(
+            contenu,
+            folder=dossier,
+            resource_type="image",
+            overwrite=True
+        )
+        return resultat.get('public_id')
+
+    def supprimer(self, public_id):
+        cloudinary.uploader.destroy(public_id, resource_type="image")
+
+    def supprimer_lot(self, public_ids):
+        # L'API d'administration accepte jusqu'à 100 public_ids par appel
+        for debut in range(0, len(public_ids), 100):
+            cloudinary.api.delete_resources(public_ids[debut:debut + 100], resource_type="image")
+
+    def lister(self, dossier, curseur=None, taille=100):
+        recherche = cloudinary.Search()\
+            .expression(f"folder:{dossier}")\
+            .sort_by('public_id', 'asc')\
+            .max_results(taille)
+        if curseur:
+            recherche = recherche.next_cursor(curseur)
+        resultat = recherche.execute()
+        ressources = [{
+            'public_id': ressource['public_id'],
+            'cree_le': datetime.fromisoformat(ressource['created_at'].replace('Z', '+00:00'))
+        } for ressource in resultat.get('resources', [])]
+        return ressources, resultat.get('next_cursor')
+
+    def url(self, public_id, options):
+        url, _ = cloudinary.utils.cloudinary_url(public_id, secure=True, **options)
+        return url
+
+    def cle_cache(self):
+        return (self.nom, cloudinary.config().cloud_name)
+
+
+class StockageLocal(Stockage):
+    nom = 'local'
+
+    def __init__(self, racine, url_base='/api/photos'):
+        self.racine = racine
+        self.url_base = url_base.rstrip('/')
+
+    def chemin(self, public_id):
+        chemin = os.path.realpath(os.path.join(self.racine, public_id))
+        if not chemin.startswith(os.path.realpath(self.racine) + os.sep):
+            raise ValueError('public_id invalide')
+        return chemin
+
+    def envoyer(self, contenu, dossier, nom_fichier):
+        extension = os.path.splitext(nom_fichier or '')[1].lower()
+        public_id = f"{dossier}/{uuid.uuid4().hex}{extension}"
+        chemin = self.chemin(public_id)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        with open(chemin, 'wb') as fichier:
+            fichier.write(contenu)
+        return public_id
+
+    def supprimer(self, public_id):
+        try:
+            os.remove(self.chemin(public_id))
+        except FileNotFoundError:
+            pass
+
+    def lister(self, dossier, curseur=None, taille=100):
+        # Curseur: dernier public_id renvoyé (ordre alphabétique)
+        repertoire = self.chemin(dossier)
+        try:
+            noms = sorted(entree.name for entree in os.scandir(repertoire) if entree.is_file())
+        except FileNotFoundError:
+            return [], None
+        public_ids = [f"{dossier}/{nom}" for nom in noms if f"{dossier}/{nom}" > (curseur or '')]
+        page = public_ids[:taille]
+        ressources = [{
+            'public_id': public_id,
+            'cree_le': datetime.fromtimestamp(os.path.getmtime(self.chemin(public_id)), timezone.utc)
+        } for public_id in page]
+        return ressources, (page[-1] if len(public_ids) > taille else None)
+
+    def url(self, public_id, options):
+        # Pas de transformation à la volée: toutes les variantes pointent sur l'original
+        return f"{self.url_base}/{public_id}"
+
+    def cle_cache(self):
+        return (self.nom, self.url_base)
+
+
+_PAR_DEFAUT = StockageCloudinary()
+
+
+def init_app(app):
+    app.config.setdefault('PHOTO_STORAGE', 'cloudinary')
+    app.config.setdefault('PHOTO_STORAGE_DIR', os.path.join(app.instance_path, 'photos'))
+    if app.config['PHOTO_STORAGE'] == 'local':
+        stockage = StockageLocal(app.config['PHOTO_STORAGE_DIR'])
+    elif app.config['PHOTO_STORAGE'] == 'cloudinary':
+        stockage = _PAR_DEFAUT
+    else:
+        raise ValueError(f"PHOTO_STORAGE inconnu: {app.config['PHOTO_STORAGE']}")
+    app.extensions['stockage'] = stockage
+
+
+def courant():
+    """Stockage de l'application courante (Cloudinary hors contexte d'application)"""
+    if has_app_context():
+        return current_app.extensions.get('stockage', _PAR_DEFAUT)
+    return _PAR_DEFAUT
@@ -0,0 +1,45 @@
+from flask import request, current_app, Response, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+TAILLE_LOT = 500
+
+
+def flux_demande():
+    """Le client demande un flux NDJSON (Accept) ou un tableau JSON en flux (?stream=1)"""
+    return (
+        request.accept_mimetypes.best == NDJSON_MIMETYPE
+        or request.args.get('stream') in ('1', 'true')
+    )
+
+
+def _lignes(query, taille_lot):
+    # yield_per: curseur côté serveur, les objets sont lus par lots
+    return query.yield_per(taille_lot)
+
+
+def generer_ndjson(query, serialiser, taille_lot=TAILLE_LOT):
+    dumps = current_app.json.dumps
+    for ligne in _lignes(query, taille_lot):
+        yield dumps(serialiser(ligne)) + '\n'
+
+
+def generer_tableau_json(query, serialiser, taille_lot=TAILLE_LOT):
+    dumps = current_app.json.dumps
+    separateur = '['
+    for ligne in _lignes(query, taille_lot):
+        yield separateur + dumps(serialiser(ligne))
+        separateur = ','
+    yield '[]' if separateur == '[' else ']'
+
+
+def reponse_en_flux(query, serialiser, taille_lot=TAILLE_LOT):
+    """
+    Réponse envoyée ligne par ligne: NDJSON si le client l'accepte,
+    sinon tableau JSON découpé en morceaux. La mémoire reste bornée
+    par la taille d'un lot, quelle que soit la taille de la table.
+    """
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        generateur, mimetype = generer_ndjson(query, serialiser, taille_lot), NDJSON_MIMETYPE
+    else:
+        generateur, mimetype = generer_tableau_json(query, serialiser, taille_lot), 'application/json'
+    return Response(stream_with_context(generateur), mimetype=mimetype)
@@ -0,0 +1,152 @@
+import inspect
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from models import db, Utilisateur
+import stockage
+import images
+
+# Envoi des photos en arrière-plan: la requête HTTP renvoie 202 avec un
+# identifiant de tâche, l'envoi vers le stockage et la mise à jour de
+# photo_profil se font dans un pool de threads.
+
+DOSSIER = 'profiles'
+DOSSIER_VARIANTES = 'profiles/variantes'
+
+EN_ATTENTE = 'en_attente'
+EN_COURS = 'en_cours'
+TERMINEE = 'terminee'
+ECHOUEE = 'echouee'
+
+
+class TachesPhotos:
+    def __init__(self, app, nb_workers=4, historique=1000):
+        self.app = app
+        self.pool = ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix='photos')
+        self.historique = historique
+        self._taches = OrderedDict()
+        self._futures = {}
+        self._verrou = threading.Lock()
+
+    def _maj(self, tache_id, **valeurs):
+        with self._verrou:
+            self._taches[tache_id].update(valeurs, mis_a_jour=datetime.utcnow().isoformat())
+
+    def soumettre(self, fonction, *args, proprietaire=None, **kwargs):
+        """
+        Lance fonction(*args, **kwargs) dans le pool. Si la fonction accepte
+        un argument 'progression', elle peut y publier son avancement.
+        proprietaire: identité (email) autorisée à suivre la tâche.
+        """
+        tache_id = uuid.uuid4().hex
+        with self._verrou:
+            self._taches[tache_id] = {'id': tache_id, 'statut': EN_ATTENTE, 'resultat': None,
+                                      'progression': None, 'erreur': None, 'proprietaire': proprietaire,
+                                      'mis_a_jour': datetime.utcnow().isoformat()}
+            # On ne garde que les dernières tâches
+            while len(self._taches) > self.historique:
+                ancien_id, _ = self._taches.popitem(last=False)
+                self._futures.pop(ancien_id, None)
+            self._futures[tache_id] = self.pool.submit(self._executer, tache_id, fonction, args, kwargs)
+        return tache_id
+
+    def _executer(self, tache_id, fonction, args, kwargs):
+        self._maj(tache_id, statut=EN_COURS)
+        if 'progression' in inspect.signature(fonction).parameters:
+            kwargs['progression'] = lambda **valeurs: self._maj(tache_id, progression=valeurs)
+        with self.app.app_context():
+            try:
+                resultat = fonction(*args, **kwargs)
+                self._maj(tache_id, statut=TERMINEE, resultat=resultat)
+            except Exception as e:
+                db.session.rollback()
+                self._maj(tache_id, statut=ECHOUEE, erreur=str(e))
+            finally:
+                db.session.remove()
+
+    def etat(self, tache_id):
+        with self._verrou:
+            tache = self._taches.get(tache_id)
+            return dict(tache) if tache else None
+
+    def attendre(self, tache_id, timeout=None):
+        future = self._futures.get(tache_id)
+        if future is not None:
+            future.result(timeout)
+        return self.etat(tache_id)
+
+
+def init_app(app):
+    app.config.setdefault('PHOTO_WORKERS', 4)
+    app.extensions['taches_photos'] = TachesPhotos(app, nb_workers=app.config['PHOTO_WORKERS'])
+
+
+def taches():
+    return current_app.extensions['taches_photos']
+
+
+# ---------------------------------------------------------------------------
+# Tâches
+# ---------------------------------------------------------------------------
+
+def envoyer_variantes(backend, contenu, nom_fichier):
+    """
+    Traite l'image (si Pillow est disponible) et envoie ses variantes.
+    Renvoie (public_id principal, {variante: public_id} ou None).
+    """
+    if not images.IMAGES_DISPONIBLE:
+        return backend.envoyer(contenu, DOSSIER, nom_fichier), None
+    variantes = {}
+    try:
+        for nom, variante in images.traiter(contenu).items():
+            # La grande variante remplace l'original; les autres vont dans un sous-dossier
+            dossier = DOSSIER if nom == 'grande' else DOSSIER_VARIANTES
+            variantes[nom] = backend.envoyer(variante['contenu'], dossier, nom + images.EXTENSION)
+    except Exception:
+        backend.supprimer_lot(list(variantes.values()))
+        raise
+    return variantes['grande'], variantes
+
+
+def fichiers_photo(utilisateur):
+    """Tous les public_ids d'une photo (original et variantes)"""
+    if not utilisateur.photo_profil:
+        return []
+    return sorted({utilisateur.photo_profil, *(utilisateur.photo_variantes or {}).values()})
+
+
+def envoyer_photo(contenu, nom_fichier):
+    """
+    Traite et envoie une photo sans l'associer à un utilisateur: le client
+    renvoie ensuite public_id et variantes (photo_profil, photo_variantes)
+    """
+    public_id, variantes = envoyer_variantes(stockage.courant(), contenu, nom_fichier)
+    return {'public_id': public_id, 'variantes': variantes, 'taille': len(contenu)}
+
+
+def remplacer_photo(utilisateur_id, contenu, nom_fichier):
+    """Traite et envoie la nouvelle photo, met à jour l'utilisateur, puis supprime l'ancienne"""
+    backend = stockage.courant()
+    public_id, variantes = envoyer_variantes(backend, contenu, nom_fichier)
+    nouveaux = sorted({public_id, *(variantes or {}).values()})
+
+    utilisateur = db.session.get(Utilisateur, utilisateur_id)
+    if utilisateur is None:
+        backend.supprimer_lot(nouveaux)
+        raise LookupError('Utilisateur introuvable')
+    anciens = [p for p in fichiers_photo(utilisateur) if p not in nouveaux]
+    utilisateur.photo_profil = public_id
+    utilisateur.photo_variantes = variantes
+    db.session.commit()
+
+    if anciens:
+        backend.supprimer_lot(anciens)
+    return {'public_id': public_id, 'variantes': variantes, 'taille': len(contenu)}
+
+
+def supprimer_photo(public_ids):
+    stockage.courant().supprimer_lot(public_ids)
+    return {'public_ids': public_ids}
@@ -86,8 +86,8 @@ def test_upload(token):
             
         print("📊 Statut HTTP:", response.status_code)
         
-        if response.status_code == 200:
-            print("✅ SUCCÈS - Upload réussi!")
+        if response.status_code == 202:
+            print("✅ SUCCÈS - Upload accepté (suivi: GET /api/upload/jobs/<job_id>)")
             result = response.json()
             print("📄 Réponse:", json.dumps(result, indent=2))
             return result
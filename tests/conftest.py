@@ -1,12 +1,14 @@
 import pytest
 import sys
 import os
+from datetime import date
+from flask_jwt_extended import create_access_token
 
 # Ajouter le dossier backend au path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from backend.app import create_app
-from backend.models import db
+from backend.models import db, Admin, RoleEnum
 
 @pytest.fixture
 def app():
@@ -28,4 +30,139 @@ def client(app):
 @pytest.fixture
 def runner(app):
     """Runner fixture for testing CLI commands"""
-    return app.test_cli_runner()
\ No newline at end of file
+    return app.test_cli_runner()
+def creer_admin(mot_de_passe="123456", **champs):
+    """Administrateur enregistré en base; champs: matricule, email, nom, ..."""
+    admin = Admin(**{
+        'matricule': "ADM_TEST",
+        'nom': "Admin",
+        'prenom': "Test",
+        'email': "admin@example.com",
+        'role': RoleEnum.ADMIN,
+        'date_naissance': date(1980, 1, 1),
+        'lieu_naissance': "Dakar",
+        **champs
+    })
+    admin.set_password(mot_de_passe)
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+@pytest.fixture
+def admin(app):
+    """Administrateur enregistré (mot de passe '123456')"""
+    return creer_admin()
+
+@pytest.fixture
+def admin_headers(app, request):
+    """
+    En-têtes Authorization d'un administrateur; champs de l'administrateur
+    par paramétrage indirect:
+    @pytest.mark.parametrize('admin_headers', [{'email': ...}], indirect=True)
+    """
+    admin = creer_admin(**getattr(request, 'param', {}))
+    return {'Authorization': f'Bearer {create_access_token(identity=admin.email)}'}
+
+@pytest.fixture
+def budget_requetes(client):
+    """
+    budget_requetes('get', url, maximum, headers=...): appelle l'endpoint et
+    vérifie son nombre de requêtes SQL (en-tête X-Query-Count)
+    """
+    def verifier(methode, url, maximum, **kwargs):
+        reponse = getattr(client, methode)(url, **kwargs)
+        nombre = int(reponse.headers['X-Query-Count'])
+        assert nombre <= maximum, f"{methode.upper()} {url}: {nombre} requêtes SQL (budget {maximum})"
+        return reponse
+    return verifier
+
+
+class FauxRedis:
+    """Stand-in local d'un serveur Redis: sous-ensemble des commandes, pipelines, expirations"""
+
+    def __init__(self, horloge=None):
+        import time
+        self.horloge = horloge or time.time
+        self.valeurs = {}
+        self.expirations = {}
+        self.commandes = []
+
+    def _vivante(self, cle):
+        if cle in self.expirations and self.expirations[cle] <= self.horloge():
+            self.valeurs.pop(cle, None)
+            self.expirations.pop(cle, None)
+        return cle in self.valeurs
+
+    def pipeline(self, transaction=True):
+        return FauxPipeline(self)
+
+    def incr(self, cle):
+        self.commandes.append('INCR')
+        valeur = int(self.valeurs[cle]) + 1 if self._vivante(cle) else 1
+        self.valeurs[cle] = str(valeur).encode()
+        return valeur
+
+    def expire(self, cle, secondes):
+        self.commandes.append('EXPIRE')
+        if not self._vivante(cle):
+            return False
+        self.expirations[cle] = self.horloge() + secondes
+        return True
+
+    def get(self, cle):
+        self.commandes.append('GET')
+        return self.valeurs[cle] if self._vivante(cle) else None
+
+    def set(self, cle, valeur, ex=None):
+        self.commandes.append('SET')
+        self.valeurs[cle] = str(valeur).encode()
+        self.expirations.pop(cle, None)
+        if ex is not None:
+            self.expirations[cle] = self.horloge() + ex
+        return True
+
+    def exists(self, *cles):
+        self.commandes.append('EXISTS')
+        return sum(self._vivante(cle) for cle in cles)
+
+    def delete(self, *cles):
+        self.commandes.append('DEL')
+        return sum(self.valeurs.pop(cle, None) is not None for cle in cles)
+
+    def zadd(self, cle, membres):
+        self.commandes.append('ZADD')
+        self.valeurs.setdefault(cle, {}).update({m.encode(): float(s) for m, s in membres.items()})
+        return len(membres)
+
+    def zremrangebyscore(self, cle, minimum, maximum):
+        self.commandes.append('ZREMRANGEBYSCORE')
+        ensemble = self.valeurs.get(cle, {})
+        retires = [m for m, s in ensemble.items() if float(minimum) <= s <= float(maximum)]
+        for membre in retires:
+            del ensemble[membre]
+        return len(retires)
+
+    def zrangebyscore(self, cle, minimum, maximum, withscores=False):
+        self.commandes.append('ZRANGEBYSCORE')
+        membres = sorted(((m, s) for m, s in self.valeurs.get(cle, {}).items()
+                          if float(minimum) <= s <= float(maximum)), key=lambda e: e[1])
+        return membres if withscores else [m for m, _ in membres]
+
+
+class FauxPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.file = []
+
+    def __getattr__(self, commande):
+        return lambda *args, **kwargs: self.file.append((commande, args, kwargs))
+
+    def execute(self):
+        file, self.file = self.file, []
+        return [getattr(self.client, commande)(*args, **kwargs) for commande, args, kwargs in file]
+
+
+@pytest.fixture
+def faux_redis():
+    """Client Redis de substitution (même interface que redis-py pour les commandes utilisées)"""
+    return FauxRedis()
@@ -0,0 +1,35 @@
+# backend/tests/test_audit_index.py
+from sqlalchemy import select
+from backend import audit_index
+from backend.models import Utilisateur, Talibe
+
+
+def test_requetes_frequentes_sans_parcours_sequentiel(app):
+    resultats = audit_index.auditer()
+    assert len(resultats) == len(audit_index.REQUETES)
+    assert [r['requete'] for r in resultats if r['scans']] == []
+
+
+def test_index_declares_utilises(app):
+    plans = {r['requete']: ' '.join(r['plan']) for r in audit_index.auditer()}
+    assert 'ix_talibes_daara_id' in plans['talibes_par_daara']
+    assert 'ix_inscriptions_cours_id' in plans['inscriptions_par_cours']
+    assert 'ix_cours_categorie' in plans['cours_par_categorie']
+    # Couvert par l'index composite (chambre_id, talibe_id)
+    assert 'ix_lits_chambre_occupation' in plans['lits_par_chambre']
+
+
+def test_parcours_sequentiel_signale(app):
+    requetes = {
+        'par_nom': (lambda: select(Utilisateur).where(Utilisateur.nom == 'Diop'), ()),
+        'par_niveau_autorise': (lambda: select(Talibe.id).where(Talibe.niveau == 'Débutant'), ('talibes',)),
+    }
+    resultats = {r['requete']: r['scans'] for r in audit_index.auditer(requetes)}
+    assert resultats['par_nom'] == ['utilisateurs']
+    assert resultats['par_niveau_autorise'] == []
+
+
+def test_commande_audit_index(app):
+    resultat = app.test_cli_runner().invoke(args=['audit-index'])
+    assert resultat.exit_code == 0
+    assert 'talibes_par_daara' in resultat.output
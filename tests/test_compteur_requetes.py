@@ -0,0 +1,42 @@
+# backend/tests/test_compteur_requetes.py
+import logging
+from backend.models import db, Cours
+
+
+def test_entetes_nombre_et_duree(client, admin_headers):
+    db.session.add(Cours(code="CPT1", libelle="Compteur"))
+    db.session.commit()
+
+    client.get('/api/cours', headers=admin_headers)
+    res = client.get('/api/cours', headers=admin_headers)
+
+    assert res.status_code == 200
+    assert res.headers['X-Query-Count'] == '1'
+    assert res.headers['Server-Timing'].startswith('db;dur=')
+    assert res.headers['Server-Timing'].endswith(';desc="SQL"')
+
+
+def test_sans_requete(client):
+    res = client.get('/api/health')
+    assert res.headers['X-Query-Count'] == '0'
+
+
+def test_requete_lente_journalisee_avec_sa_route(app, client, caplog, admin_headers):
+    app.config['SQL_SLOW_QUERY_MS'] = 0
+
+    with caplog.at_level(logging.WARNING, logger='compteur_requetes'):
+        client.get('/api/cours/1', headers=admin_headers)
+
+    messages = [r.getMessage() for r in caplog.records if r.name == 'compteur_requetes']
+    assert messages
+    assert 'GET /api/cours/<int:id>' in messages[0]
+    assert 'FROM cours' in messages[0]
+
+
+def test_seuil_non_atteint(app, client, caplog, admin_headers):
+    app.config['SQL_SLOW_QUERY_MS'] = 10000
+
+    with caplog.at_level(logging.WARNING, logger='compteur_requetes'):
+        client.get('/api/cours', headers=admin_headers)
+
+    assert not [r for r in caplog.records if r.name == 'compteur_requetes']
@@ -0,0 +1,46 @@
+# backend/tests/test_demarrage.py
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend import app as module_app
+from backend import mots_de_passe
+from backend.app import create_app, DEFAULT_USERS
+from backend.models import db, Utilisateur
+
+
+def test_create_app_sans_base_ni_hachage(monkeypatch):
+    connexions = []
+    hachages = []
+    ecouteur = lambda *args: connexions.append(1)
+    monkeypatch.setattr(mots_de_passe, 'hacher_avec', lambda *a, **k: hachages.append(1))
+    event.listen(Engine, 'connect', ecouteur)
+    try:
+        create_app(testing=True)
+    finally:
+        event.remove(Engine, 'connect', ecouteur)
+
+    assert connexions == []
+    assert hachages == []
+
+
+def test_pas_d_application_creee_a_l_import():
+    assert not hasattr(module_app, 'app')
+
+
+def test_bootstrap_cree_les_utilisateurs_une_seule_fois(app, monkeypatch):
+    monkeypatch.setattr(mots_de_passe, 'hacher', lambda mot_de_passe: 'hache:' + mot_de_passe)
+    runner = app.test_cli_runner()
+
+    resultat = runner.invoke(args=['bootstrap'])
+    assert resultat.exit_code == 0
+    assert f'{len(DEFAULT_USERS)} utilisateur(s) par défaut créé(s)' in resultat.output
+    assert db.session.query(Utilisateur).count() == len(DEFAULT_USERS)
+
+    resultat = runner.invoke(args=['bootstrap'])
+    assert '0 utilisateur(s) par défaut créé(s)' in resultat.output
+    assert db.session.query(Utilisateur).count() == len(DEFAULT_USERS)
+
+
+def test_bootstrap_sans_utilisateurs(app):
+    resultat = app.test_cli_runner().invoke(args=['bootstrap', '--sans-utilisateurs'])
+    assert resultat.exit_code == 0
+    assert db.session.query(Utilisateur).count() == 0
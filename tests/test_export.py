@@ -0,0 +1,77 @@
+# backend/tests/test_export.py
+import csv
+import io
+import json
+from datetime import date
+from backend.models import db, Talibe, Daara, Batiment, Chambre, Lit, RoleEnum
+
+
+def peupler(nb_talibes):
+    daaras = [Daara(nom="Daara Nord"), Daara(nom="Daara Sud")]
+    db.session.add_all(daaras)
+    db.session.flush()
+    batiment = Batiment(nom="Bat Export", daara_id=daaras[0].id)
+    db.session.add(batiment)
+    db.session.flush()
+    chambre = Chambre(numero="E1", nb_lits=2, batiment_id=batiment.id)
+    db.session.add(chambre)
+    db.session.flush()
+    db.session.add_all([Lit(numero=str(i), chambre_id=chambre.id) for i in range(2)])
+    for i in range(nb_talibes):
+        talibe = Talibe(
+            matricule=f"EXP{i}",
+            nom="Mbaye",
+            prenom=f"T{i}",
+            email=f"exp{i}@example.com",
+            role=RoleEnum.TALIBE,
+            date_naissance=date(2011, 2, 3),
+            lieu_naissance="Diourbel",
+            daara_id=daaras[i % 2].id
+        )
+        talibe.password_hash = "x"
+        db.session.add(talibe)
+    db.session.commit()
+    return [d.id for d in daaras]
+
+
+def test_export_talibes_csv_colonnes_et_filtre(app, client, admin_headers):
+    nord, _ = peupler(2500)
+
+    res = client.get(f'/api/admin/export/talibes?colonnes=matricule,date_naissance&daara_id={nord}',
+                     headers=admin_headers)
+
+    assert res.status_code == 200
+    assert res.mimetype == 'text/csv'
+    lignes = list(csv.reader(io.StringIO(res.get_data(as_text=True))))
+    assert lignes[0] == ['matricule', 'date_naissance']
+    assert len(lignes) == 1 + 1250
+    assert lignes[1] == ['EXP0', '2011-02-03']
+
+
+def test_export_ndjson_par_lots(app, client, admin_headers):
+    peupler(2500)
+
+    res = client.get('/api/admin/export/talibes?format=ndjson', headers=admin_headers)
+
+    morceaux = list(res.response)
+    assert len(morceaux) == 3  # un morceau par lot de 1000 lignes
+    lignes = [json.loads(l) for l in b''.join(morceaux).decode().splitlines()]
+    assert len(lignes) == 2500
+    assert 'password_hash' not in lignes[0]
+
+
+def test_export_hebergement(app, client, admin_headers):
+    peupler(0)
+
+    res = client.get('/api/admin/export/hebergement?format=ndjson', headers=admin_headers)
+
+    lignes = [json.loads(l) for l in res.get_data(as_text=True).splitlines()]
+    assert [(l['daara_nom'], l['lit_numero']) for l in lignes] == [
+        ("Daara Nord", "0"), ("Daara Nord", "1"), ("Daara Sud", None)
+    ]
+
+
+def test_export_invalide(app, client, admin_headers):
+    assert client.get('/api/admin/export/inconnu', headers=admin_headers).status_code == 404
+    assert client.get('/api/admin/export/talibes?colonnes=password_hash', headers=admin_headers).status_code == 400
+    assert client.get('/api/admin/export/talibes?format=xml', headers=admin_headers).status_code == 400
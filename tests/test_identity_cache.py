@@ -0,0 +1,91 @@
+# backend/tests/test_identity_cache.py
+from datetime import timedelta
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token, decode_token
+from backend.models import db, RoleEnum
+from backend.identity_cache import IdentityCache
+
+
+def compter_requetes(liste):
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        liste.append(statement)
+    return _before
+
+
+def login(client, email):
+    res = client.post("/api/login", json={"email": email, "password": "123456"})
+    return res.get_json()["access_token"]
+
+
+def test_cache_ttl_and_lru():
+    cache = IdentityCache(ttl=60, taille_max=2)
+    cache.set("a", {"role": "ADMIN"})
+    cache.set("b", {"role": "TALIBE"})
+    cache.get("a")
+    cache.set("c", {"role": "TALIBE"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"role": "ADMIN"}
+
+    expire = IdentityCache(ttl=-1)
+    expire.set("a", {"role": "ADMIN"})
+    assert expire.get("a") is None
+
+
+def test_login_token_carries_role_claim(app, client, admin):
+    token = login(client, admin.email)
+
+    assert decode_token(token)["role"] == "ADMIN"
+
+
+def test_authorization_runs_no_sql_once_cached(app, client, admin):
+    headers = {"Authorization": f"Bearer {login(client, admin.email)}"}
+
+    requetes = []
+    listener = compter_requetes(requetes)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        res_role = client.put("/api/chambres/999", json={}, headers=headers)
+        nb_role = len(requetes)
+        res_admin = client.get("/api/admin/batiments", headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert res_role.status_code == 404
+    assert res_admin.status_code == 200
+    # Une seule requête par route: la lecture métier, aucune pour l'autorisation
+    assert nb_role == 1
+    assert len(requetes) == 2
+
+
+def refresh(client, email):
+    res = client.post("/api/login", json={"email": email, "password": "123456"})
+    return {"Authorization": f"Bearer {res.get_json()['refresh_token']}"}
+
+
+def test_role_change_applies_at_refresh(app, client, admin):
+    headers = {"Authorization": f"Bearer {login(client, admin.email)}"}
+    headers_refresh = refresh(client, admin.email)
+    assert client.get("/api/admin/batiments", headers=headers).status_code == 200
+
+    admin.role = RoleEnum.TALIBE
+    db.session.commit()
+
+    # Claims figés jusqu'à l'expiration du token d'accès, relus au renouvellement
+    assert client.get("/api/admin/batiments", headers=headers).status_code == 200
+    token = client.post("/api/refresh", headers=headers_refresh).get_json()["access_token"]
+    assert decode_token(token)["role"] == "TALIBE"
+    assert client.get("/api/admin/batiments", headers={"Authorization": f"Bearer {token}"}).status_code == 403
+
+
+def test_deleted_user_loses_access_at_refresh(app, client, admin):
+    headers_refresh = refresh(client, admin.email)
+
+    db.session.delete(admin)
+    db.session.commit()
+
+    assert client.post("/api/refresh", headers=headers_refresh).status_code == 401
+    # Au plus JWT_ACCESS_TOKEN_EXPIRES: le token d'accès expiré n'est plus accepté
+    expire = create_access_token(identity="admin@example.com", expires_delta=timedelta(seconds=-1))
+    res = client.get("/api/admin/batiments", headers={"Authorization": f"Bearer {expire}"})
+    assert res.status_code == 401
@@ -0,0 +1,37 @@
+# backend/tests/test_images.py
+import io
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from backend import images
+
+
+def image_jpeg(largeur, hauteur):
+    sortie = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = "Appareil"  # Make
+    Image.new('RGB', (largeur, hauteur), 'red').save(sortie, 'JPEG', exif=exif)
+    return sortie.getvalue()
+
+
+def test_variantes_webp_sans_metadonnees():
+    variantes = images.traiter(image_jpeg(2000, 1000))
+
+    assert set(variantes) == {'miniature', 'moyenne', 'grande'}
+    assert (variantes['miniature']['largeur'], variantes['miniature']['hauteur']) == (64, 32)
+    assert variantes['grande']['largeur'] == 1024
+    grande = Image.open(io.BytesIO(variantes['grande']['contenu']))
+    assert grande.format == 'WEBP'
+    assert not grande.getexif()
+
+
+def test_petite_image_non_agrandie():
+    variantes = images.traiter(image_jpeg(100, 50))
+
+    assert variantes['grande']['largeur'] == 100
+
+
+def test_image_invalide():
+    with pytest.raises(images.ImageInvalide):
+        images.traiter(b'pas une image')
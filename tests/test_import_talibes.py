@@ -0,0 +1,101 @@
+# backend/tests/test_import_talibes.py
+import csv
+import io
+from datetime import date
+import pytest
+from backend.models import Talibe, RoleEnum
+
+ENTETE = "matricule,nom,prenom,email,password,date_naissance,lieu_naissance,niveau\n"
+
+
+@pytest.fixture(autouse=True)
+def hachage_rapide(app):
+    app.config['IMPORT_PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+
+
+def fichier_csv(lignes):
+    contenu = ENTETE + "".join(lignes)
+    return {'fichier': (io.BytesIO(contenu.encode('utf-8')), 'talibes.csv')}
+
+
+def lignes_valides(nombre, prefixe="IMP"):
+    return [f"{prefixe}{i},Fall,T{i},{prefixe.lower()}{i}@example.com,secret{i},2010-05-01,Louga,Débutant\n"
+            for i in range(nombre)]
+
+
+def test_import_csv(app, client, admin_headers):
+    res = client.post('/api/talibes/import', headers=admin_headers, data=fichier_csv(lignes_valides(25)),
+                      content_type='multipart/form-data')
+
+    assert res.status_code == 201
+    assert res.get_json()['importes'] == 25
+    assert Talibe.query.count() == 25
+    talibe = Talibe.query.filter_by(matricule="IMP3").one()
+    assert talibe.check_password("secret3")
+    assert talibe.role == RoleEnum.TALIBE
+    assert talibe.date_naissance == date(2010, 5, 1)
+
+
+def test_import_dry_run_n_ecrit_rien(app, client, admin_headers):
+    res = client.post('/api/talibes/import?dry_run=1', headers=admin_headers,
+                      data=fichier_csv(lignes_valides(5)), content_type='multipart/form-data')
+
+    assert res.status_code == 200
+    assert res.get_json()['valides'] == 5
+    assert res.get_json()['importes'] == 0
+    assert Talibe.query.count() == 0
+
+
+def test_import_erreurs_par_ligne(app, client, admin_headers):
+    lignes = lignes_valides(3) + [
+        "IMP0,Fall,Doublon,autre@example.com,x,2010-05-01,Louga,\n",        # matricule en double
+        "IMPX,Fall,Email,admin@example.com,x,2010-05-01,Louga,\n",   # email déjà en base
+        "IMPY,Fall,Date,impy@example.com,x,01/05/2010,Louga,\n",            # date invalide
+        "IMPZ,,SansNom,impz@example.com,x,2010-05-01,Louga,\n",             # champ requis
+    ]
+
+    res = client.post('/api/talibes/import', headers=admin_headers, data=fichier_csv(lignes),
+                      content_type='multipart/form-data')
+
+    rapport = res.get_json()
+    assert rapport['importes'] == 3
+    assert rapport['lignes_en_erreur'] == 4
+    assert {erreur['ligne'] for erreur in rapport['erreurs']} == {5, 6, 7, 8}
+    assert Talibe.query.count() == 3
+
+    res = client.post('/api/talibes/import?dry_run=1&erreurs=csv', headers=admin_headers,
+                      data=fichier_csv(lignes), content_type='multipart/form-data')
+    assert res.mimetype == 'text/csv'
+    erreurs = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+    # les trois premières lignes existent maintenant en base (matricule et email)
+    assert len(erreurs) == 3 * 2 + 4
+
+
+def test_import_format_non_supporte(app, client, admin_headers):
+    res = client.post('/api/talibes/import', headers=admin_headers,
+                      data={'fichier': (io.BytesIO(b'x'), 'talibes.txt')},
+                      content_type='multipart/form-data')
+
+    assert res.status_code == 400
+
+
+def test_pool_de_hachage_partage_et_borne(app, client, admin_headers):
+    from backend import import_talibes
+    app.config['IMPORT_PROCESSUS'] = 2
+    try:
+        pool = import_talibes.pool_hachage()
+        assert import_talibes.pool_hachage() is pool
+        assert pool._max_workers == 2
+        assert pool._mp_context.get_start_method() == 'spawn'
+
+        # Au-delà de SEUIL_POOL: hachage dans le pool, qui reste ouvert après l'import
+        res = client.post('/api/talibes/import', headers=admin_headers,
+                          data=fichier_csv(lignes_valides(import_talibes.SEUIL_POOL + 6)),
+                          content_type='multipart/form-data')
+        assert res.status_code == 201
+        assert Talibe.query.filter_by(matricule="IMP69").one().check_password("secret69")
+        assert import_talibes.pool_hachage() is pool
+    finally:
+        if import_talibes._pool is not None:
+            import_talibes._pool.shutdown()
+            import_talibes._pool = None
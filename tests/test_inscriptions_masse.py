@@ -0,0 +1,98 @@
+# backend/tests/test_inscriptions_masse.py
+from datetime import date
+from sqlalchemy import event
+from backend.models import db, Talibe, Cours, Inscription, RoleEnum
+
+
+def peupler(nb_talibes):
+    """Crée nb_talibes talibés et deux cours (le second limité à 2 places)"""
+    talibes = []
+    for i in range(nb_talibes):
+        talibe = Talibe(
+            matricule=f"MAS{i}",
+            nom="Sarr",
+            prenom=f"T{i}",
+            email=f"mas{i}@example.com",
+            role=RoleEnum.TALIBE,
+            date_naissance=date(2010, 1, 1),
+            lieu_naissance="Kaolack"
+        )
+        talibe.password_hash = "x"
+        talibes.append(talibe)
+    cours = [Cours(code="MAS1", libelle="Tajwid"),
+             Cours(code="MAS2", libelle="Fiqh", capacite_max=2)]
+    db.session.add_all(talibes + cours)
+    db.session.commit()
+    return [t.id for t in talibes], [c.id for c in cours]
+
+
+def test_inscription_masse_rapport(app, client, admin_headers):
+    talibe_ids, (cours_libre, cours_limite) = peupler(4)
+    db.session.add(Inscription(talibe_id=talibe_ids[0], cours_id=cours_libre))
+    db.session.commit()
+
+    res = client.post('/api/inscriptions/masse', headers=admin_headers, json={
+        'talibe_ids': talibe_ids + [9999],
+        'cours_ids': [cours_libre, cours_limite, 8888]
+    })
+
+    assert res.status_code == 200
+    rapport = res.get_json()
+    statuts = {(r['talibe_id'], r['cours_id']): r['statut'] for r in rapport['resultats']}
+    assert statuts[(talibe_ids[0], cours_libre)] == 'deja_inscrit'
+    assert statuts[(talibe_ids[1], cours_libre)] == 'inscrit'
+    assert statuts[(talibe_ids[0], cours_limite)] == 'inscrit'
+    assert statuts[(talibe_ids[1], cours_limite)] == 'inscrit'
+    assert statuts[(talibe_ids[2], cours_limite)] == 'cours_complet'
+    assert statuts[(talibe_ids[0], 8888)] == 'cours_introuvable'
+    assert statuts[(9999, cours_libre)] == 'talibe_introuvable'
+    assert rapport['resume']['inscrit'] == 5
+    assert Inscription.query.filter_by(cours_id=cours_limite).count() == 2
+    assert Inscription.query.count() == 6
+
+
+def test_inscription_masse_requetes_constantes(app, client, admin_headers):
+    talibe_ids, cours_ids = peupler(30)
+    requetes = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _before)
+    try:
+        res = client.post('/api/inscriptions/masse', headers=admin_headers, json={
+            'paires': [{'talibe_id': t, 'cours_id': cours_ids[0]} for t in talibe_ids]
+                      + [{'talibe_id': talibe_ids[0], 'cours_id': cours_ids[0]}]
+        })
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _before)
+
+    assert res.status_code == 200
+    assert res.get_json()['resume'] == {'inscrit': 20, 'cours_complet': 10, 'doublon': 1}
+    inserts = [r for r in requetes if r.lstrip().upper().startswith('INSERT')]
+    assert len(inserts) == 1
+    assert len(requetes) <= 6
+
+
+def test_inscription_masse_corps_invalide(app, client, admin_headers):
+    res = client.post('/api/inscriptions/masse', headers=admin_headers, json={'talibe_ids': [1]})
+
+    assert res.status_code == 400
+
+
+def test_affecter_cours_ne_renvoie_que_les_inscriptions(app, client, admin_headers):
+    talibe_ids, (cours_libre, cours_limite) = peupler(3)
+    db.session.add_all([Inscription(talibe_id=talibe_ids[0], cours_id=cours_libre),
+                        Inscription(talibe_id=talibe_ids[1], cours_id=cours_limite),
+                        Inscription(talibe_id=talibe_ids[2], cours_id=cours_limite)])
+    db.session.commit()
+
+    res = client.post(f'/api/talibes/{talibe_ids[0]}/cours', headers=admin_headers,
+                      json={'cours_ids': [cours_libre, cours_limite]})
+
+    assert res.status_code == 200
+    data = res.get_json()
+    assert data['cours_affectes'] == []
+    assert data['message'].startswith('0 cours')
+    statuts = {r['cours_id']: r['statut'] for r in data['rapport']['resultats']}
+    assert statuts == {cours_libre: 'deja_inscrit', cours_limite: 'cours_complet'}
@@ -0,0 +1,111 @@
+# backend/tests/test_journalisation.py
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+from backend import journalisation
+
+
+def journal_json():
+    """Logger isolé écrivant en JSON via la file, comme en production"""
+    sortie = io.StringIO()
+    flux = logging.StreamHandler(sortie)
+    flux.setFormatter(journalisation.FormateurJSON())
+    file = queue.SimpleQueue()
+    handler = journalisation.HandlerFile(file)
+    handler.addFilter(journalisation.FiltreSecrets())
+    listener = QueueListener(file, flux)
+    logger = logging.getLogger('test_journalisation.isole')
+    logger.propagate = False
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    return logger, listener, sortie
+
+
+def lignes(listener, sortie):
+    listener.start()
+    listener.stop()
+    return [json.loads(ligne) for ligne in sortie.getvalue().splitlines()]
+
+
+def test_masquer_dictionnaires_et_texte():
+    donnees = {'email': 'a@b.sn', 'password': 'admin123', 'profil': {'api_key': 'k', 'nom': 'Fall'}}
+    assert journalisation.masquer(donnees) == {
+        'email': 'a@b.sn', 'password': '***', 'profil': {'api_key': '***', 'nom': 'Fall'}
+    }
+    assert donnees['password'] == 'admin123'
+    texte = journalisation.masquer("Données: {'email': 'a@b.sn', 'password': 'admin123'} token=abc")
+    assert 'admin123' not in texte and 'abc' not in texte
+    assert "'email': 'a@b.sn'" in texte
+
+
+def test_ligne_json_avec_champs_extra_masques():
+    logger, listener, sortie = journal_json()
+    logger.info("Connexion de %s", 'a@b.sn', extra={'donnees': {'email': 'a@b.sn', 'password': 'x'}})
+
+    [entree] = lignes(listener, sortie)
+    assert entree['niveau'] == 'INFO'
+    assert entree['logger'] == 'test_journalisation.isole'
+    assert entree['message'] == 'Connexion de a@b.sn'
+    assert entree['donnees'] == {'email': 'a@b.sn', 'password': '***'}
+
+
+def test_secret_dans_un_message_formate():
+    logger, listener, sortie = journal_json()
+    logger.info("Connexion de %s avec password=%s (%d essai)", 'a@b.sn', 'admin123', 2)
+    logger.info("Requête %s", {'email': 'a@b.sn', 'token': 'abc'})
+
+    premiere, seconde = lignes(listener, sortie)
+    assert premiere['message'] == 'Connexion de a@b.sn avec password=*** (2 essai)'
+    assert 'abc' not in seconde['message'] and "'email': 'a@b.sn'" in seconde['message']
+
+
+def test_contexte_de_requete_et_exception(app):
+    logger, listener, sortie = journal_json()
+    with app.test_request_context('/api/login', method='POST'):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception("Erreur")
+
+    [entree] = lignes(listener, sortie)
+    assert entree['methode'] == 'POST'
+    assert entree['chemin'] == '/api/login'
+    assert 'ValueError: boom' in entree['exception']
+
+
+def test_debug_desactive_ne_serialise_rien():
+    logger, listener, sortie = journal_json()
+    appels = []
+
+    class Couteux:
+        def __str__(self):
+            appels.append(1)
+            return 'couteux'
+
+    logger.debug("Données %s", Couteux())
+    assert appels == []
+    assert lignes(listener, sortie) == []
+
+
+def test_niveaux_par_module(app):
+    journalisation.init_app(app)
+    app.config['LOG_LEVELS'] = 'test_journalisation.a=DEBUG, test_journalisation.b=ERROR'
+    journalisation.init_app(app)
+    assert logging.getLogger('test_journalisation.a').level == logging.DEBUG
+    assert logging.getLogger('test_journalisation.b').level == logging.ERROR
+    # Les handlers ne sont installés qu'une fois par processus
+    assert sum(getattr(h, '_journalisation', False) for h in logging.getLogger().handlers) == 1
+
+
+def test_login_ne_journalise_pas_le_mot_de_passe(client, caplog):
+    filtre = journalisation.FiltreSecrets()
+    with caplog.at_level(logging.DEBUG, logger='routes.auth'):
+        client.post('/api/login', json={'email': 'inconnu@daara.com', 'password': 'motdepasse-secret'})
+
+    records = [r for r in caplog.records if r.name == 'routes.auth']
+    assert records
+    for record in records:
+        filtre.filter(record)
+        assert 'motdepasse-secret' not in json.dumps(vars(record), default=str)
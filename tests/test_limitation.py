@@ -0,0 +1,162 @@
+# backend/tests/test_limitation.py
+import time
+import pytest
+from backend import limitation
+from backend.models import Utilisateur
+
+
+class Horloge:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def login(client, email, password="faux", ip="10.0.0.1"):
+    return client.post('/api/login', json={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+@pytest.fixture(params=['memoire', 'redis'])
+def compteurs(request):
+    if request.param == 'memoire':
+        return limitation.CompteursMemoire()
+    return limitation.CompteursRedis(request.getfixturevalue('faux_redis'))
+
+
+def test_regle():
+    assert limitation.regle('10/60') == (10, 60)
+    for invalide in ('10', '0/60', 'dix/60', '10/0'):
+        with pytest.raises(ValueError):
+            limitation.regle(invalide)
+
+
+def test_fenetre_glissante(compteurs):
+    horloge = Horloge(1000.0)  # début d'une fenêtre de 10 s
+    limiteur = limitation.Limiteur(compteurs, horloge=horloge)
+    for _ in range(3):
+        limiteur.tenter('essai', 'x', 3, 10)
+    with pytest.raises(limitation.TropDeTentatives) as erreur:
+        limiteur.tenter('essai', 'x', 3, 10)
+    assert erreur.value.attente >= 10
+    # Autre identifiant: compteur séparé
+    limiteur.tenter('essai', 'y', 3, 10)
+
+    # Fenêtre suivante: les 4 tentatives précédentes pèsent encore aux trois quarts
+    horloge.t = 1012.5
+    with pytest.raises(limitation.TropDeTentatives):
+        limiteur.tenter('essai', 'x', 3, 10)
+    # Fenêtre précédente presque entièrement sortie: 4 * 0.05 + 2 <= 3
+    horloge.t = 1019.5
+    limiteur.tenter('essai', 'x', 3, 10)
+
+
+def test_attente_calculee(compteurs):
+    horloge = Horloge(1000.0)
+    limiteur = limitation.Limiteur(compteurs, horloge=horloge)
+    for _ in range(2):
+        limiteur.tenter('essai', 'x', 2, 10)
+    horloge.t = 1012.0
+    with pytest.raises(limitation.TropDeTentatives) as erreur:
+        limiteur.tenter('essai', 'x', 2, 10)
+    # 2 * (1 - e/10) + 1 + 1 <= 2 dès e = 10: fin de la fenêtre courante
+    assert erreur.value.attente == 8
+    horloge.t += erreur.value.attente
+    limiteur.tenter('essai', 'x', 2, 10)
+
+
+def test_compteurs_memoire_bornes_et_expiration():
+    horloge = Horloge(0)
+    compteurs = limitation.CompteursMemoire(taille_max=2, horloge=horloge)
+    assert compteurs.incrementer('a', 'z', 5) == (1, 0)
+    assert compteurs.incrementer('a', 'z', 5) == (2, 0)
+    assert compteurs.incrementer('b', 'a', 5) == (1, 2)
+    compteurs.incrementer('c', 'a', 5)
+    assert len(compteurs) == 2
+    horloge.t = 6
+    assert compteurs.incrementer('c', 'b', 5) == (1, 0)
+
+
+def test_redis_un_seul_aller_retour(faux_redis):
+    limiteur = limitation.Limiteur(limitation.CompteursRedis(faux_redis), horloge=Horloge(1000.0))
+    limiteur.tenter('essai', 'x', 3, 60)
+    assert faux_redis.commandes == ['INCR', 'EXPIRE', 'GET']
+    [expiration] = faux_redis.expirations.values()
+    assert round(expiration - time.time()) == 120
+
+
+def test_login_limite_par_email_avant_check_password(app, client, monkeypatch, admin):
+    app.config['LOGIN_RATE_LIMIT_EMAIL'] = '3/60'
+    verifications = []
+    check_password = Utilisateur.check_password
+    monkeypatch.setattr(Utilisateur, 'check_password',
+                        lambda self, mdp: verifications.append(1) or check_password(self, mdp))
+
+    # Même email depuis des IP différentes (bourrage distribué)
+    for i in range(3):
+        assert login(client, admin.email, ip=f'10.0.0.{i}').status_code == 401
+    res = login(client, admin.email, password='123456', ip='10.0.0.9')
+    assert res.status_code == 429
+    assert int(res.headers['Retry-After']) >= 1
+    assert len(verifications) == 3
+    # Un autre compte n'est pas concerné
+    assert login(client, 'autre@example.com').status_code == 401
+
+
+def test_login_limite_par_ip(app, client):
+    app.config['LOGIN_RATE_LIMIT_IP'] = '5/60'
+    for i in range(5):
+        assert login(client, f'inconnu{i}@example.com').status_code == 401
+    assert login(client, 'inconnu9@example.com').status_code == 429
+    assert login(client, 'inconnu9@example.com', ip='10.0.0.2').status_code == 401
+
+
+def test_ip_derriere_proxy(app, client):
+    app.config['LOGIN_RATE_LIMIT_IP'] = '1/60'
+    app.config['RATELIMIT_PROXIES'] = 1
+
+    def via_proxy(client_ip):
+        return client.post('/api/login', json={'email': 'x@example.com', 'password': 'faux'},
+                           headers={'X-Forwarded-For': f'1.2.3.4, {client_ip}'},
+                           environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+    assert via_proxy('192.168.1.1').status_code == 401
+    assert via_proxy('192.168.1.2').status_code == 401
+    assert via_proxy('192.168.1.1').status_code == 429
+
+
+def test_connexion_reussie_remet_email_a_zero(app, client, admin):
+    app.config['LOGIN_RATE_LIMIT_EMAIL'] = '3/60'
+    for _ in range(2):
+        login(client, admin.email)
+    assert login(client, admin.email, password='123456').status_code == 200
+    for _ in range(3):
+        assert login(client, admin.email).status_code == 401
+
+
+def test_stockage_indisponible_laisse_passer(app, client, monkeypatch, admin):
+    def panne(*args):
+        raise ConnectionError('redis injoignable')
+
+    monkeypatch.setattr(app.extensions['limitation'].compteurs, 'incrementer', panne)
+    monkeypatch.setattr(app.extensions['limitation'].compteurs, 'supprimer', panne)
+    assert login(client, admin.email, password='123456').status_code == 200
+
+
+def test_compteurs_incomplets_refuses_a_la_creation():
+    class SansSuppression(limitation.Compteurs):
+        def incrementer(self, cle, cle_precedente, ttl):
+            return 1, 0
+
+    with pytest.raises(TypeError):
+        SansSuppression()
+
+
+def test_init_app_stockage(app):
+    app.config['RATELIMIT_STORAGE'] = 'memcached://localhost'
+    with pytest.raises(ValueError):
+        limitation.init_app(app)
+    app.config['RATELIMIT_ENABLED'] = False
+    limitation.init_app(app)
+    assert app.extensions['limitation'] is None
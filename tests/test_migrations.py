@@ -0,0 +1,70 @@
+# backend/tests/test_migrations.py
+import os
+import pytest
+from flask import Flask
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import Migrate, upgrade, downgrade
+from sqlalchemy import inspect, text
+from backend.models import db
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+
+
+@pytest.fixture
+def app_migrations(tmp_path):
+    """Application minimale sur une base SQLite fichier vide"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'migrations.db'}"
+    db.init_app(app)
+    Migrate(app, db, directory=MIGRATIONS, render_as_batch=True)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_upgrade_puis_downgrade(app_migrations):
+    upgrade(directory=MIGRATIONS)
+    tables = set(inspect(db.engine).get_table_names())
+    assert {'utilisateurs', 'talibes', 'lits', 'statistiques_snapshot', 'alembic_version'} <= tables
+
+    downgrade(directory=MIGRATIONS, revision='base')
+    assert set(inspect(db.engine).get_table_names()) == {'alembic_version'}
+
+
+def test_upgrade_sur_base_creee_par_create_all(app_migrations):
+    # Base antérieure aux migrations: schéma initial déjà présent
+    db.metadata.tables['utilisateurs'].create(db.engine)
+    upgrade(directory=MIGRATIONS, revision='0001_schema_initial')
+    assert 'talibes' not in inspect(db.engine).get_table_names()
+
+
+def test_texte_recherche_rempli_pour_les_utilisateurs_existants(app_migrations):
+    upgrade(directory=MIGRATIONS, revision='0004_photo_variantes')
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO utilisateurs (id, matricule, nom, prenom, date_naissance, lieu_naissance, "
+            "email, password_hash, role, type) VALUES (1, 'TAL1', 'Ndiaye', 'Ñdèye', '2010-01-01', "
+            "'Touba', 'tal1@example.com', 'x', 'TALIBE', 'talibe')"))
+        connection.execute(text("INSERT INTO talibes (id, pere) VALUES (1, 'Mamadou')"))
+
+    upgrade(directory=MIGRATIONS)
+
+    with db.engine.connect() as connection:
+        assert connection.execute(text("SELECT texte_recherche FROM utilisateurs")).scalar() == \
+            "ndiaye ndeye tal1 tal1@example.com mamadou"
+        assert connection.execute(text(
+            "SELECT rowid FROM utilisateurs_fts WHERE utilisateurs_fts MATCH '\"ndey\"*'")).scalar() == 1
+
+
+def test_migrations_a_jour_des_modeles(app_migrations):
+    upgrade(directory=MIGRATIONS)
+
+    with db.engine.connect() as connection:
+        differences = compare_metadata(MigrationContext.configure(connection), db.metadata)
+    # Hors modèles: table FTS5 et ses tables internes; index trigrammes réservé à PostgreSQL
+    differences = [d for d in differences
+                   if not (d[0] == 'remove_table' and d[1].name.startswith('utilisateurs_fts'))
+                   and not (d[0] == 'add_index' and d[1].name.endswith('_trgm'))]
+    assert differences == []
@@ -0,0 +1,92 @@
+# backend/tests/test_mots_de_passe.py
+import threading
+import pytest
+from backend import mots_de_passe
+from backend.models import db, Admin
+
+
+def test_normaliser():
+    assert mots_de_passe.normaliser('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+    assert mots_de_passe.normaliser('pbkdf2').startswith('pbkdf2:sha256:')
+    assert mots_de_passe.normaliser('scrypt') == 'scrypt:32768:8:1'
+    for invalide in ('md5', 'pbkdf2:sha256:beaucoup', 'scrypt:1:2'):
+        with pytest.raises(ValueError):
+            mots_de_passe.normaliser(invalide)
+
+
+def test_methode_et_cout_configurables(app):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    hash_ = mots_de_passe.hacher('secret')
+    assert hash_.startswith('pbkdf2:sha256:1000$')
+    assert mots_de_passe.verifier(hash_, 'secret')
+    assert not mots_de_passe.verifier(hash_, 'autre')
+
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt:1024:8:1'
+    assert mots_de_passe.a_rehacher(hash_)
+    assert mots_de_passe.hacher('secret').startswith('scrypt:1024:8:1$')
+
+
+def test_argon2(app):
+    pytest.importorskip('argon2')
+    app.config['PASSWORD_HASH_METHOD'] = 'argon2:1:1024:1'
+    hash_ = mots_de_passe.hacher('secret')
+    assert hash_.startswith('$argon2')
+    assert mots_de_passe.verifier(hash_, 'secret')
+    assert not mots_de_passe.a_rehacher(hash_)
+    assert mots_de_passe.a_rehacher(hash_, 'argon2:2:1024:1')
+
+
+def test_login_rehache_quand_les_parametres_changent(app, client, admin):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    ancien = admin.password_hash
+
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    res = client.post('/api/login', json={'email': admin.email, 'password': '123456'})
+    assert res.status_code == 200
+
+    db.session.expire_all()
+    admin = db.session.get(Admin, admin.id)
+    assert admin.password_hash != ancien
+    assert admin.password_hash.startswith('pbkdf2:sha256:2000$')
+    assert client.post('/api/login', json={'email': admin.email, 'password': '123456'}).status_code == 200
+
+
+def test_echec_de_login_ne_rehache_pas(app, client, admin):
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    ancien = admin.password_hash
+
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    res = client.post('/api/login', json={'email': admin.email, 'password': 'faux'})
+    assert res.status_code == 401
+    db.session.expire_all()
+    assert db.session.get(Admin, admin.id).password_hash == ancien
+
+
+def test_pool_borne_refuse_au_dela_de_la_file():
+    pool = mots_de_passe.PoolHachage(nb_workers=1, file_max=0, attente_max=0.05)
+    debut, fin = threading.Event(), threading.Event()
+
+    def bloquer():
+        debut.set()
+        fin.wait(5)
+
+    occupe = threading.Thread(target=pool.executer, args=(bloquer,))
+    occupe.start()
+    debut.wait(5)
+    try:
+        with pytest.raises(mots_de_passe.ServeurOccupe):
+            pool.executer(lambda: None)
+    finally:
+        fin.set()
+        occupe.join()
+    assert pool.executer(lambda: 42) == 42
+
+
+def test_login_serveur_occupe(app, client, monkeypatch, admin):
+    def occupe(*args):
+        raise mots_de_passe.ServeurOccupe()
+
+    monkeypatch.setattr(app.extensions['mots_de_passe'], 'executer', occupe)
+    res = client.post('/api/login', json={'email': admin.email, 'password': '123456'})
+    assert res.status_code == 503
+    assert res.headers['Retry-After'] == '1'
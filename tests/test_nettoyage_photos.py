@@ -0,0 +1,129 @@
+# backend/tests/test_nettoyage_photos.py
+import os
+from datetime import date
+from flask_jwt_extended import create_access_token
+from backend import stockage, taches_photos, nettoyage_photos
+from backend.models import db, Admin, Talibe, Enseignant, RoleEnum
+
+
+def preparer(app, tmp_path, monkeypatch):
+    app.config.update(PHOTO_STORAGE='local', PHOTO_STORAGE_DIR=str(tmp_path),
+                      PHOTO_CLEANUP_MIN_AGE=0, PHOTO_CLEANUP_INTERVAL=0)
+    stockage.init_app(app)
+    monkeypatch.setattr(nettoyage_photos, 'TAILLE_PAGE', 2)
+    os.makedirs(tmp_path / 'profiles')
+    for nom in ('a.jpg', 'b.jpg', 'c.jpg', 'd.jpg', 'e.jpg'):
+        (tmp_path / 'profiles' / nom).write_bytes(b'x')
+
+    admin = Admin(matricule="ADM_NET", nom="Admin", prenom="Net", email="admin_net@example.com",
+                  role=RoleEnum.ADMIN, date_naissance=date(1980, 1, 1), lieu_naissance="Dakar")
+    admin.set_password("123456")
+    talibe = Talibe(matricule="NET1", nom="Sy", prenom="T", email="net1@example.com",
+                    role=RoleEnum.TALIBE, date_naissance=date(2010, 1, 1), lieu_naissance="Podor",
+                    photo_profil='profiles/b.jpg')
+    enseignant = Enseignant(matricule="NET2", nom="Sy", prenom="E", email="net2@example.com",
+                            role=RoleEnum.ENSEIGNANT, date_naissance=date(1970, 1, 1),
+                            lieu_naissance="Podor", photo_profil='profiles/d.jpg')
+    talibe.password_hash = enseignant.password_hash = "x"
+    db.session.add_all([admin, talibe, enseignant])
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=admin.email)}'}
+
+
+def lancer(client, headers, corps):
+    res = client.post('/api/cleanup-orphaned', headers=headers, json=corps)
+    assert res.status_code == 202
+    return taches_photos.taches().attendre(res.get_json()['job_id'], timeout=5)
+
+
+def test_dry_run_ne_supprime_rien(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+
+    tache = lancer(client, headers, {'dry_run': True})
+
+    rapport = tache['resultat']
+    # 3 pages de photos, 1 page (vide) de variantes
+    assert rapport['termine'] and rapport['pages'] == 4
+    assert rapport['liste_orphelines'] == ['profiles/a.jpg', 'profiles/c.jpg', 'profiles/e.jpg']
+    assert rapport['supprimees'] == 0
+    assert len(os.listdir(tmp_path / 'profiles')) == 5
+
+
+def test_suppression_par_pages_avec_reprise(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+
+    premiere = lancer(client, headers, {'pages_max': 1})['resultat']
+    assert not premiere['termine']
+    assert premiere['supprimees'] == 1
+
+    suite = lancer(client, headers, {'curseur': premiere['curseur']})['resultat']
+    assert suite['termine']
+    assert suite['supprimees'] == 2
+    # les photos référencées (talibé et enseignant) sont conservées
+    assert sorted(os.listdir(tmp_path / 'profiles')) == ['b.jpg', 'd.jpg']
+
+
+def test_photos_recentes_ignorees(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+    app.config['PHOTO_CLEANUP_MIN_AGE'] = 3600
+
+    rapport = lancer(client, headers, {})['resultat']
+
+    assert rapport['recentes_ignorees'] == 5
+    assert rapport['supprimees'] == 0
+
+
+def test_suivi_de_la_tache_de_nettoyage(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+    tache = lancer(client, headers, {'dry_run': True})
+
+    # Tâche terminée sans public_id: pas d'URL de photo à construire
+    res = client.get(f"/api/upload/jobs/{tache['id']}", headers=headers)
+
+    assert res.status_code == 200
+    suivi = res.get_json()
+    assert suivi['statut'] == taches_photos.TERMINEE
+    assert suivi['resultat']['termine'] and suivi['resultat']['examinees'] == 5
+    assert 'urls' not in suivi
+
+
+def test_suivi_d_une_suppression(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+    tache_id = taches_photos.taches().soumettre(taches_photos.supprimer_photo, ['profiles/a.jpg'],
+                                                proprietaire='admin_net@example.com')
+    taches_photos.taches().attendre(tache_id, timeout=5)
+
+    res = client.get(f"/api/upload/jobs/{tache_id}", headers=headers)
+
+    assert res.status_code == 200
+    assert res.get_json()['resultat'] == {'public_ids': ['profiles/a.jpg']}
+    assert 'urls' not in res.get_json()
+
+
+def test_parametres_du_nettoyage_valides(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+
+    for corps in ({'pages_max': '2'}, {'pages_max': 0}, {'pages_max': True},
+                  {'curseur': 3}, {'dry_run': 'false'}, ['dry_run']):
+        res = client.post('/api/cleanup-orphaned', headers=headers, json=corps)
+        assert res.status_code == 400, corps
+    assert len(os.listdir(tmp_path / 'profiles')) == 5
+
+
+def test_variantes_orphelines_supprimees(app, client, tmp_path, monkeypatch):
+    headers = preparer(app, tmp_path, monkeypatch)
+    os.makedirs(tmp_path / 'profiles' / 'variantes')
+    for nom in ('m1.webp', 'm2.webp', 'm3.webp'):
+        (tmp_path / 'profiles' / 'variantes' / nom).write_bytes(b'x')
+    talibe = Talibe.query.filter_by(matricule="NET1").one()
+    talibe.photo_variantes = {'grande': 'profiles/b.jpg', 'miniature': 'profiles/variantes/m2.webp'}
+    db.session.commit()
+
+    premiere = lancer(client, headers, {'pages_max': 4})['resultat']
+    assert not premiere['termine']
+    suite = lancer(client, headers, {'curseur': premiere['curseur']})['resultat']
+
+    assert suite['termine']
+    assert premiere['supprimees'] + suite['supprimees'] == 5
+    assert sorted(os.listdir(tmp_path / 'profiles' / 'variantes')) == ['m2.webp']
+    assert sorted(os.listdir(tmp_path / 'profiles')) == ['b.jpg', 'd.jpg', 'variantes']
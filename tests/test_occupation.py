@@ -0,0 +1,192 @@
+# backend/tests/test_occupation.py
+from datetime import date
+from sqlalchemy import event
+from backend.models import db, Talibe, Batiment, Chambre, Lit, RoleEnum
+
+
+def heberger(chambre, nombre, prefixe):
+    for i in range(nombre):
+        talibe = Talibe(
+            matricule=f"{prefixe}{i}",
+            nom="Gueye",
+            prenom=f"T{i}",
+            email=f"{prefixe.lower()}{i}@example.com",
+            role=RoleEnum.TALIBE,
+            date_naissance=date(2010, 1, 1),
+            lieu_naissance="Mbour",
+            chambre_id=chambre.id
+        )
+        talibe.password_hash = "x"
+        db.session.add(talibe)
+
+
+def peupler():
+    batiment = Batiment(nom="Bat Occupation")
+    db.session.add(batiment)
+    db.session.flush()
+    pleine = Chambre(numero="1", nb_lits=2, batiment_id=batiment.id)
+    partielle = Chambre(numero="2", nb_lits=4, batiment_id=batiment.id)
+    vide = Chambre(numero="3", nb_lits=3, batiment_id=batiment.id)
+    sans_lit = Chambre(numero="4", nb_lits=0, batiment_id=batiment.id)
+    db.session.add_all([pleine, partielle, vide, sans_lit])
+    db.session.flush()
+    heberger(pleine, 2, "PL")
+    heberger(partielle, 1, "PA")
+    for chambre in (pleine, partielle, vide):
+        for i in range(chambre.nb_lits):
+            db.session.add(Lit(numero=str(i), chambre_id=chambre.id))
+    db.session.commit()
+
+
+def get_compte(client, url, headers):
+    requetes = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _before)
+    try:
+        res = client.get(url, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _before)
+    return res, requetes
+
+
+def test_statistiques_chambres_single_query(app, client, admin_headers):
+    peupler()
+
+    res, requetes = get_compte(client, '/api/chambres/statistiques', admin_headers)
+
+    assert res.status_code == 200
+    assert len(requetes) == 1
+    # Sommes converties en entiers (numeric/Decimal sous PostgreSQL)
+    assert requetes[0].count('CAST(sum(') == 4
+    assert res.get_json() == {
+        'total_chambres': 4,
+        'chambres_pleines': 1,
+        'chambres_vides': 2,
+        'chambres_partiellement_occupees': 1,
+        'total_talibes_heberges': 3,
+        'total_lits': 9,
+        'taux_occupation': 33.33
+    }
+
+
+def test_statistiques_lits_single_query(app, client, admin_headers):
+    peupler()
+    from backend import occupation
+    occupation.attribuer_lits_existants()
+
+    res, requetes = get_compte(client, '/api/lits/statistiques', admin_headers)
+
+    assert res.status_code == 200
+    assert len(requetes) == 1
+    assert res.get_json() == {
+        'total_lits': 9,
+        'total_chambres': 4,
+        'lits_occupes': 3,
+        'lits_disponibles': 6,
+        'taux_occupation_lits': 33.33,
+        'moyenne_lits_par_chambre': 2.25
+    }
+
+
+def test_statistiques_empty(app, client, admin_headers):
+    res = client.get('/api/chambres/statistiques', headers=admin_headers)
+
+    assert res.get_json()['total_chambres'] == 0
+    assert res.get_json()['taux_occupation'] == 0
+
+
+def test_statistiques_lits_apres_reprise(app, client, admin_headers):
+    peupler()
+    from backend import occupation
+    assert occupation.attribuer_lits_existants() == 3
+
+    res = client.get('/api/lits/statistiques', headers=admin_headers)
+
+    assert res.get_json()['lits_occupes'] == 3
+    assert res.get_json()['lits_disponibles'] == 6
+
+
+def test_affectation_attribue_un_lit(app, client, admin_headers):
+    peupler()
+    chambre = Chambre.query.filter_by(numero="2").first()
+    talibe = Talibe.query.filter_by(matricule="PL0").first()
+
+    res = client.post(f'/api/chambres/{chambre.id}/affecter-talibe',
+                      json={'talibe_id': talibe.id}, headers=admin_headers)
+
+    assert res.status_code == 200
+    lit = Lit.query.filter_by(talibe_id=talibe.id).one()
+    assert lit.chambre_id == chambre.id
+    assert res.get_json()['lit']['id'] == lit.id
+
+
+def test_affectation_chambre_pleine(app, client, admin_headers):
+    peupler()
+    from backend import occupation
+    occupation.attribuer_lits_existants()
+    pleine = Chambre.query.filter_by(numero="1").first()
+    talibe = Talibe.query.filter_by(matricule="PA0").first()
+
+    res = client.post(f'/api/chambres/{pleine.id}/affecter-talibe',
+                      json={'talibe_id': talibe.id}, headers=admin_headers)
+
+    assert res.status_code == 400
+    assert res.get_json()['error'] == 'La chambre est pleine'
+
+
+def test_recherche_lits_disponibles_en_sql(app, client, admin_headers):
+    peupler()
+    from backend import occupation
+    occupation.attribuer_lits_existants()
+
+    res, requetes = get_compte(client, '/api/lits/recherche?disponible=true', admin_headers)
+
+    assert res.status_code == 200
+    assert len(requetes) == 1
+    lits = res.get_json()
+    assert len(lits) == 6
+    assert all(lit['disponible'] and lit['batiment']['nom'] == "Bat Occupation" for lit in lits)
+
+    res = client.get('/api/lits/recherche?disponible=false&limit=2', headers=admin_headers)
+    page = res.get_json()
+    assert len(page['items']) == 2
+    assert page['next_cursor'] is not None
+
+
+def test_affecter_lit_sans_chambre(app, client, admin_headers):
+    peupler()
+    lit = Lit(numero="orphelin")
+    db.session.add(lit)
+    db.session.commit()
+    talibe = Talibe.query.filter_by(matricule="PA0").first()
+
+    res = client.post(f'/api/lits/{lit.id}/affecter', json={'talibe_id': talibe.id}, headers=admin_headers)
+
+    assert res.status_code == 400
+    assert Lit.query.filter_by(talibe_id=talibe.id).count() == 0
+
+
+def test_modification_chambre_verifie_la_capacite(app, client, admin_headers):
+    peupler()
+    from backend import occupation
+    occupation.attribuer_lits_existants()
+    pleine = Chambre.query.filter_by(numero="1").first()
+    partielle = Chambre.query.filter_by(numero="2").first()
+    talibe = Talibe.query.filter_by(matricule="PA0").first()
+    ancien_lit = Lit.query.filter_by(talibe_id=talibe.id).one()
+
+    res = client.put(f'/api/talibes/{talibe.id}', json={'chambre_id': pleine.id}, headers=admin_headers)
+    assert res.status_code == 400
+    assert res.get_json()['error'] == 'La chambre est pleine'
+    # Le talibé garde sa chambre et son lit
+    assert db.session.get(Talibe, talibe.id).chambre_id == partielle.id
+    assert db.session.get(Lit, ancien_lit.id).talibe_id == talibe.id
+
+    vide = Chambre.query.filter_by(numero="3").first()
+    res = client.put(f'/api/talibes/{talibe.id}', json={'chambre_id': vide.id}, headers=admin_headers)
+    assert res.status_code == 200
+    assert Lit.query.filter_by(talibe_id=talibe.id).one().chambre_id == vide.id
+    assert db.session.get(Lit, ancien_lit.id).talibe_id is None
@@ -0,0 +1,81 @@
+# backend/tests/test_pagination.py
+import pytest
+from backend.models import db, Daara, Batiment, Chambre
+from backend.pagination import encoder_curseur, decoder_curseur, CurseurInvalide
+
+
+def creer_chambres(nombre):
+    daara = Daara(nom="Daara Page", lieu="Kaolack")
+    db.session.add(daara)
+    db.session.flush()
+    batiment = Batiment(nom="Bat Page", daara_id=daara.id)
+    db.session.add(batiment)
+    db.session.flush()
+    for i in range(nombre):
+        db.session.add(Chambre(numero=f"P{i}", nb_lits=2, batiment_id=batiment.id))
+    db.session.commit()
+
+
+def test_cursor_roundtrip():
+    assert decoder_curseur(encoder_curseur(42)) == 42
+
+
+@pytest.mark.parametrize('curseur', ['???', 'eyJ4IjoxfQ', 'eyJpZCI6ImEifQ'])
+def test_invalid_cursor_is_rejected(curseur):
+    with pytest.raises(CurseurInvalide):
+        decoder_curseur(curseur)
+
+
+def test_list_without_pagination_params_is_unchanged(app, client, admin_headers):
+    creer_chambres(5)
+
+    res = client.get('/api/chambres', headers=admin_headers)
+
+    assert res.status_code == 200
+    assert isinstance(res.get_json(), list)
+    assert len(res.get_json()) == 5
+
+
+def test_keyset_pages_cover_all_rows(app, client, admin_headers):
+    creer_chambres(7)
+
+    numeros = []
+    url = '/api/chambres?limit=3'
+    pages = 0
+    while url:
+        res = client.get(url, headers=admin_headers)
+        assert res.status_code == 200
+        data = res.get_json()
+        assert len(data['items']) <= 3
+        numeros += [chambre['numero'] for chambre in data['items']]
+        pages += 1
+        url = f"/api/chambres?limit=3&after={data['next_cursor']}" if data['next_cursor'] else None
+
+    assert pages == 3
+    assert numeros == [f"P{i}" for i in range(7)]
+
+
+def test_keyset_estimated_total(app, client, admin_headers):
+    creer_chambres(4)
+
+    res = client.get('/api/chambres?limit=2&total=estimate', headers=admin_headers)
+
+    data = res.get_json()
+    assert data['estimated_total'] == 4
+    assert data['next_cursor'] is not None
+
+
+def test_keyset_bad_parameters(app, client, admin_headers):
+    assert client.get('/api/chambres?after=!!', headers=admin_headers).status_code == 400
+    assert client.get('/api/chambres?limit=abc', headers=admin_headers).status_code == 400
+    assert client.get('/api/chambres?limit=0', headers=admin_headers).status_code == 400
+
+
+def test_admin_utilisateurs_keyset(app, client, admin_headers):
+    res = client.get('/api/admin/utilisateurs?limit=10', headers=admin_headers)
+
+    data = res.get_json()
+    assert res.status_code == 200
+    assert [user['type'] for user in data['items']] == ['admin']
+    assert data['items'][0]['niveau_acces'] == 'complet'
+    assert data['next_cursor'] is None
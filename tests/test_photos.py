@@ -0,0 +1,69 @@
+# backend/tests/test_photos.py
+from datetime import date
+import cloudinary
+import cloudinary.utils
+from backend import photos
+from backend.models import Talibe, RoleEnum
+
+
+def creer_talibe(i, photo):
+    return Talibe(
+        matricule=f"PH{i}",
+        nom="Ba",
+        prenom=f"T{i}",
+        email=f"ph{i}@example.com",
+        role=RoleEnum.TALIBE,
+        date_naissance=date(2010, 1, 1),
+        lieu_naissance="Matam",
+        photo_profil=photo
+    )
+
+
+def test_url_memorisee_par_variante(monkeypatch):
+    monkeypatch.setattr(cloudinary.config(), 'cloud_name', 'demo')
+    photos.vider_cache()
+    appels = []
+    original = cloudinary.utils.cloudinary_url
+
+    def compter(*args, **kwargs):
+        appels.append((args, kwargs))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(cloudinary.utils, 'cloudinary_url', compter)
+
+    talibes = [creer_talibe(i, "profiles/abc") for i in range(50)]
+    donnees = [talibe.to_dict() for talibe in talibes]
+
+    assert len(appels) == 4  # original, miniature, moyenne, grande: une seule fois chacune
+    assert donnees[0]['photo_profil'] == 'https://res.cloudinary.com/demo/image/upload/v1/profiles/abc'
+    assert 'w_64' in donnees[0]['photo_miniature']
+    assert donnees[0]['photos']['miniature'] == donnees[0]['photo_miniature']
+
+
+def test_sans_photo():
+    donnees = creer_talibe(0, None).to_dict()
+
+    assert donnees['photo_profil'] is None
+    assert donnees['photo_miniature'] is None
+    assert photos.urls_photo(None) is None
+
+
+def test_changement_de_configuration(monkeypatch):
+    photos.vider_cache()
+    monkeypatch.setattr(cloudinary.config(), 'cloud_name', 'demo')
+    assert '/demo/' in photos.url_photo("profiles/abc")
+    monkeypatch.setattr(cloudinary.config(), 'cloud_name', 'autre')
+    assert '/autre/' in photos.url_photo("profiles/abc")
+
+
+def test_variantes_produites_a_l_envoi(monkeypatch):
+    monkeypatch.setattr(cloudinary.config(), 'cloud_name', 'demo')
+    talibe = creer_talibe(0, "profiles/grande")
+    talibe.photo_variantes = {'miniature': 'profiles/variantes/mini', 'grande': 'profiles/grande'}
+
+    donnees = talibe.to_dict()
+
+    assert donnees['photo_miniature'].endswith('/v1/profiles/variantes/mini')
+    assert donnees['photos']['grande'].endswith('/v1/profiles/grande')
+    # variante absente: transformation à la volée de la photo principale
+    assert 'w_256' in donnees['photos']['moyenne']
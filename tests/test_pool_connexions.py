@@ -0,0 +1,60 @@
+# backend/tests/test_pool_connexions.py
+import pytest
+from sqlalchemy import create_engine, exc, text
+from backend import pool_connexions
+from backend.models import db
+
+
+def test_options_postgresql_depuis_environnement():
+    options = pool_connexions.options_moteur('postgresql+psycopg2://u:p@h/db?sslmode=require', {
+        'DB_POOL_SIZE': '8',
+        'DB_MAX_OVERFLOW': '2',
+        'DB_POOL_PRE_PING': 'false',
+        'DB_STATEMENT_TIMEOUT_MS': '5000',
+    })
+    assert options['poolclass'] is pool_connexions.QueuePoolMesure
+    assert options['pool_size'] == 8
+    assert options['max_overflow'] == 2
+    assert options['pool_pre_ping'] is False
+    assert options['pool_recycle'] == 1800
+    assert options['connect_args']['options'] == '-c statement_timeout=5000'
+
+
+def test_options_sans_statement_timeout_ni_memoire():
+    options = pool_connexions.options_moteur('postgresql://h/db', {'DB_STATEMENT_TIMEOUT_MS': '0'})
+    assert 'options' not in options['connect_args']
+    assert 'connect_args' not in pool_connexions.options_moteur('sqlite:///daaras.db', {})
+    assert pool_connexions.options_moteur('sqlite:///:memory:', {}) == {}
+
+
+def test_mesures_du_pool(tmp_path):
+    options = pool_connexions.options_moteur(f'sqlite:///{tmp_path}/pool.db', {
+        'DB_POOL_SIZE': '1', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_TIMEOUT': '1'
+    })
+    engine = create_engine(f'sqlite:///{tmp_path}/pool.db', **{**options, 'pool_timeout': 0.05})
+    try:
+        with engine.connect() as connexion:
+            connexion.execute(text('SELECT 1'))
+            etat = pool_connexions.etat(engine)
+            assert etat['empruntees'] == 1
+            assert etat['connexions_max'] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        with engine.connect():
+            pass
+
+        etat = pool_connexions.etat(engine)
+        assert etat['empruntees'] == 0
+        assert etat['attente']['demandes'] == 3
+        assert etat['attente']['delais_depasses'] == 1
+        assert etat['attente']['connexions_ouvertes'] == 1
+        assert etat['attente']['attente_max_ms'] >= 40
+    finally:
+        engine.dispose()
+
+
+def test_endpoint_etat_pool(client, admin_headers):
+    res = client.get('/api/admin/db-pool', headers=admin_headers)
+    assert res.status_code == 200
+    assert res.get_json()['pool'] == type(db.engine.pool).__name__
+    assert client.get('/api/admin/db-pool').status_code == 401
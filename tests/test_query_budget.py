@@ -0,0 +1,203 @@
+# backend/tests/test_query_budget.py
+import pytest
+from datetime import date
+from backend import compteur_requetes
+from backend.models import (db, Talibe, Enseignant, Cours, Inscription,
+                            Daara, Batiment, Chambre, Lit, RoleEnum)
+
+
+def compter_requetes():
+    """Compte les requêtes SQL exécutées dans le bloc"""
+    return compteur_requetes.compter_requetes(db.engine)
+
+
+def peupler(nb_talibes, prefixe):
+    """Crée nb_talibes talibés inscrits à deux cours, avec enseignants et lits"""
+    daara = Daara(nom=f"Daara {prefixe}", lieu="Touba")
+    db.session.add(daara)
+    db.session.flush()
+    batiment = Batiment(nom=f"Bat {prefixe}", daara_id=daara.id)
+    db.session.add(batiment)
+    db.session.flush()
+    chambre = Chambre(numero=f"{prefixe}1", nb_lits=nb_talibes, batiment_id=batiment.id)
+    db.session.add(chambre)
+    db.session.flush()
+
+    cours = [
+        Cours(code=f"{prefixe}C{i}", libelle=f"Cours {prefixe} {i}")
+        for i in range(2)
+    ]
+    db.session.add_all(cours)
+
+    enseignant = Enseignant(
+        matricule=f"{prefixe}ENS",
+        nom="Diallo",
+        prenom="Moussa",
+        email=f"{prefixe.lower()}ens@example.com",
+        role=RoleEnum.ENSEIGNANT,
+        date_naissance=date(1975, 1, 1),
+        lieu_naissance="Thiès",
+        daara_id=daara.id
+    )
+    enseignant.password_hash = "x"
+    enseignant.cours = list(cours)
+    db.session.add(enseignant)
+    db.session.flush()
+
+    for i in range(nb_talibes):
+        talibe = Talibe(
+            matricule=f"{prefixe}T{i}",
+            nom="Ndiaye",
+            prenom=f"Talibe{i}",
+            email=f"{prefixe.lower()}t{i}@example.com",
+            role=RoleEnum.TALIBE,
+            date_naissance=date(2010, 1, 1),
+            lieu_naissance="Saint-Louis",
+            daara_id=daara.id,
+            chambre_id=chambre.id
+        )
+        talibe.password_hash = "x"
+        db.session.add(talibe)
+        db.session.flush()
+        for c in cours:
+            db.session.add(Inscription(talibe_id=talibe.id, cours_id=c.id))
+        db.session.add(Lit(numero=f"{prefixe}L{i}", chambre_id=chambre.id))
+    db.session.commit()
+    ids = daara.id, chambre.id, [c.id for c in cours]
+    db.session.expunge_all()
+    return ids
+
+
+# Budget maximal de requêtes par liste (auth et pagination comprises)
+LIST_ENDPOINTS = [
+    ('/api/talibes', 2),
+    ('/api/enseignants', 2),
+    ('/api/cours', 1),
+    ('/api/inscriptions', 2),
+    ('/api/lits', 2),
+    ('/api/chambres', 2),
+    ('/api/daaras', 2),
+    ('/api/admin/utilisateurs', 7),
+]
+
+
+@pytest.mark.parametrize('url,budget', LIST_ENDPOINTS)
+def test_list_endpoint_query_budget_is_constant(app, client, url, budget, admin_headers):
+    """Le nombre de requêtes d'une liste ne dépend pas du nombre de lignes"""
+    # Premier appel: met l'identité de l'admin en cache
+    client.get(url, headers=admin_headers)
+
+    peupler(2, "AA")
+    with compter_requetes() as petit:
+        res = client.get(url, headers=admin_headers)
+    assert res.status_code == 200
+
+    peupler(10, "BB")
+    with compter_requetes() as grand:
+        res = client.get(url, headers=admin_headers)
+    assert res.status_code == 200
+
+    assert len(grand) == len(petit)
+    assert len(grand) <= budget
+
+
+def test_talibes_list_keeps_nested_cours(app, client, admin_headers):
+    peupler(3, "CC")
+
+    res = client.get('/api/talibes', headers=admin_headers)
+    data = res.get_json()
+
+    assert len(data) == 3
+    for talibe in data:
+        assert len(talibe['cours']) == 2
+        for cours in talibe['cours']:
+            assert cours['nombre_talibes'] == 3
+            assert cours['nombre_enseignants'] == 1
+
+
+def test_talibes_by_cours_query_budget(app, client, admin_headers):
+    _, _, cours_ids = peupler(3, "DD")
+
+    with compter_requetes() as petit:
+        client.get(f'/api/talibes/cours/{cours_ids[0]}', headers=admin_headers)
+    _, _, cours_ids = peupler(9, "EE")
+    with compter_requetes() as grand:
+        res = client.get(f'/api/talibes/cours/{cours_ids[0]}', headers=admin_headers)
+
+    assert len(res.get_json()) == 9
+    assert len(grand) == len(petit)
+
+
+def test_cours_counters_do_not_materialize_relations(app, client, admin_headers):
+    """GET /api/cours calcule les compteurs en SQL, sans charger d'inscriptions"""
+    peupler(10, "FF")
+
+    with compter_requetes() as requetes:
+        res = client.get('/api/cours', headers=admin_headers)
+
+    assert len(requetes) == 1
+    assert not [obj for obj in db.session.identity_map.values()
+                if isinstance(obj, (Inscription, Talibe, Enseignant))]
+    for cours in res.get_json():
+        assert cours['nombre_talibes'] == 10
+        assert cours['nombre_enseignants'] == 1
+
+
+def test_cours_counters_without_loader_options(app):
+    """to_dict() reste correct sur un cours chargé sans options"""
+    _, _, cours_ids = peupler(4, "GG")
+
+    cours = db.session.get(Cours, cours_ids[0])
+    data = cours.to_dict()
+
+    assert data['nombre_talibes'] == 4
+    assert data['nombre_enseignants'] == 1
+
+
+# Budget par blueprint pour les endpoints de détail (X-Query-Count, auth en cache)
+DETAIL_ENDPOINTS = [
+    ('/api/profile', 2),
+    ('/api/daara/{daara}', 1),
+    ('/api/daaras/{daara}/talibes', 2),
+    ('/api/daaras/{daara}/enseignants', 2),
+    ('/api/talibes/{talibe}', 2),
+    ('/api/talibes/chambre/{chambre}', 2),
+    ('/api/talibes/cours/{cours}', 3),
+    ('/api/talibes/{talibe}/cours', 2),
+    ('/api/enseignants/{enseignant}', 2),
+    ('/api/enseignants/{enseignant}/cours', 2),
+    ('/api/enseignants/{enseignant}/talibes', 4),
+    ('/api/cours/{cours}', 3),
+    ('/api/cours/{cours}/talibes', 3),
+    ('/api/cours/{cours}/enseignants', 4),
+    ('/api/batiments/daara/{daara}', 1),
+    ('/api/chambres/{chambre}/talibes', 3),
+    ('/api/chambres/{chambre}/lits', 2),
+    ('/api/chambres/statistiques', 1),
+    ('/api/lits/chambre/{chambre}', 2),
+    ('/api/lits/statistiques', 1),
+    ('/api/inscriptions/talibe/{talibe}', 2),
+    ('/api/inscriptions/cours/{cours}', 2),
+    ('/api/admin/rapports/enseignants', 2),
+    ('/api/search?q=ndiaye', 1),
+]
+
+
+@pytest.mark.parametrize('url,budget', DETAIL_ENDPOINTS)
+def test_detail_endpoint_query_budget(app, client, budget_requetes, url, budget, admin_headers):
+    def ids(prefixe, nombre):
+        daara_id, chambre_id, cours_ids = peupler(nombre, prefixe)
+        # Les écritures invalident le cache d'identité: le remettre en place
+        client.get('/api/admin/daaras', headers=admin_headers)
+        return {
+            'daara': daara_id,
+            'chambre': chambre_id,
+            'cours': cours_ids[0],
+            'talibe': db.session.query(Talibe.id).filter_by(chambre_id=chambre_id).first()[0],
+            'enseignant': db.session.query(Enseignant.id).filter_by(daara_id=daara_id).first()[0],
+        }
+
+    petit = budget_requetes('get', url.format(**ids("HH", 2)), budget, headers=admin_headers)
+    grand = budget_requetes('get', url.format(**ids("II", 8)), budget, headers=admin_headers)
+    assert petit.status_code == grand.status_code == 200
+    assert grand.headers['X-Query-Count'] == petit.headers['X-Query-Count']
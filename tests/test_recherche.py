@@ -0,0 +1,105 @@
+# backend/tests/test_recherche.py
+from datetime import date
+from sqlalchemy import update
+from backend import recherche
+from backend.models import db, Talibe, Enseignant, Utilisateur, RoleEnum
+
+
+def talibe(matricule, nom, prenom, **champs):
+    t = Talibe(matricule=matricule, nom=nom, prenom=prenom, email=f"{matricule.lower()}@example.com",
+               role=RoleEnum.TALIBE, date_naissance=date(2010, 1, 1), lieu_naissance="Touba", **champs)
+    t.password_hash = "x"
+    return t
+
+
+def peupler():
+    enseignant = Enseignant(matricule="ENS1", nom="Ndiaye", prenom="Serigne", email="ens1@example.com",
+                            role=RoleEnum.ENSEIGNANT, date_naissance=date(1970, 1, 1),
+                            lieu_naissance="Touba")
+    enseignant.password_hash = "x"
+    db.session.add_all([
+        talibe("TAL1", "Ndiaye", "Ñdèye", pere="Mamadou Ndiaye"),
+        talibe("TAL2", "Diop", "Moussa", mere="Aïssatou Ŋom"),
+        talibe("TAL3", "Fall", "Ibrahima"),
+        enseignant,
+    ])
+    db.session.commit()
+
+
+def chercher(client, headers, q, **params):
+    res = client.get('/api/search', headers=headers, query_string={'q': q, **params})
+    assert res.status_code == 200
+    return res.get_json()
+
+
+def test_normalisation():
+    assert recherche.normaliser("  Ñdèye   ŊOM ") == "ndeye nom"
+    assert recherche.mots("Aïssatou-Ba") == ["aissatou", "ba"]
+
+
+def test_recherche_insensible_aux_accents(app, client, admin_headers):
+    peupler()
+
+    resultats = chercher(client, admin_headers, "ndeye")
+    assert [r['matricule'] for r in resultats['items']] == ["TAL1"]
+    assert set(resultats['items'][0]) == {'id', 'type', 'matricule', 'nom', 'prenom', 'email',
+                                          'photo_miniature'}
+
+    # père / mère et lettres wolof
+    assert [r['matricule'] for r in chercher(client, admin_headers, "mamadou")['items']] == ["TAL1"]
+    assert [r['matricule'] for r in chercher(client, admin_headers, "nom aiss")['items']] == ["TAL2"]
+
+
+def test_recherche_prefixe_type_et_pagination(app, client, admin_headers):
+    peupler()
+
+    tous = chercher(client, admin_headers, "ndia")
+    assert {r['matricule'] for r in tous['items']} == {"TAL1", "ENS1"}
+
+    seulement = chercher(client, admin_headers, "ndia", type='enseignant')
+    assert [r['matricule'] for r in seulement['items']] == ["ENS1"]
+
+    page = chercher(client, admin_headers, "ndia", limit=1)
+    assert len(page['items']) == 1 and page['next_offset'] == 1
+    suite = chercher(client, admin_headers, "ndia", limit=1, offset=1)
+    assert suite['next_offset'] is None
+    assert suite['items'][0]['id'] != page['items'][0]['id']
+
+
+def test_index_suit_les_modifications(app, client, admin_headers):
+    peupler()
+
+    t = Talibe.query.filter_by(matricule="TAL3").one()
+    t.nom = "Sèck"
+    db.session.commit()
+    assert [r['matricule'] for r in chercher(client, admin_headers, "seck")['items']] == ["TAL3"]
+    assert chercher(client, admin_headers, "fall")['items'] == []
+
+    db.session.delete(t)
+    db.session.commit()
+    assert chercher(client, admin_headers, "seck")['items'] == []
+
+
+def test_reindexer(app, client, admin_headers):
+    peupler()
+    db.session.execute(update(Utilisateur.__table__).values(texte_recherche=None))
+    db.session.commit()
+    assert chercher(client, admin_headers, "moussa")['items'] == []
+
+    recherche.reindexer()
+
+    assert [r['matricule'] for r in chercher(client, admin_headers, "moussa")['items']] == ["TAL2"]
+
+
+def test_parametres_invalides(app, client, admin_headers):
+    assert client.get('/api/search', headers=admin_headers).status_code == 400
+    assert client.get('/api/search?q=a&type=x', headers=admin_headers).status_code == 400
+
+
+def test_administrateurs_exclus(app, client, admin_headers):
+    peupler()
+
+    # L'administrateur des en-têtes: nom "Admin", email admin@example.com
+    assert chercher(client, admin_headers, "admin")['items'] == []
+    res = client.get('/api/search', headers=admin_headers, query_string={'q': 'admin', 'type': 'admin'})
+    assert res.status_code == 400
@@ -0,0 +1,88 @@
+# backend/tests/test_refresh.py
+from datetime import date
+from flask_jwt_extended import decode_token
+from backend.compteur_requetes import compter_requetes
+from backend.models import db, Admin, Talibe, Daara, RoleEnum
+
+
+def creer_utilisateurs():
+    daara = Daara(nom="Daara Refresh", lieu="Thiès")
+    db.session.add(daara)
+    db.session.flush()
+    admin = Admin(matricule="ADM_REFRESH", nom="Admin", prenom="Refresh", email="admin_refresh@example.com",
+                  role=RoleEnum.ADMIN, date_naissance=date(1980, 1, 1), lieu_naissance="Dakar")
+    talibe = Talibe(matricule="TAL_REFRESH", nom="Talibe", prenom="Refresh", email="talibe_refresh@example.com",
+                    role=RoleEnum.TALIBE, date_naissance=date(2010, 1, 1), lieu_naissance="Thiès",
+                    daara_id=daara.id)
+    for user in (admin, talibe):
+        user.set_password("123456")
+        db.session.add(user)
+    db.session.commit()
+    return admin, talibe
+
+
+def login(client, email):
+    return client.post("/api/login", json={"email": email, "password": "123456"}).get_json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_claims_du_token_d_acces(app, client):
+    admin, talibe = creer_utilisateurs()
+    tokens = login(client, "talibe_refresh@example.com")
+
+    claims = decode_token(tokens["access_token"])
+    assert claims["sub"] == "talibe_refresh@example.com"
+    assert claims["role"] == "TALIBE"
+    assert claims["user_id"] == talibe.id
+    assert claims["user_type"] == "talibe"
+    assert claims["daara_id"] == talibe.daara_id
+    assert decode_token(tokens["refresh_token"])["type"] == "refresh"
+
+
+def test_autorisation_sans_requete_sql(app, client):
+    creer_utilisateurs()
+    token = login(client, "admin_refresh@example.com")["access_token"]
+    # Cache d'identité vide (autre worker, redémarrage): les claims suffisent
+    app.extensions['identity_cache'].vider()
+
+    with compter_requetes(db.engine) as requetes:
+        res = client.get("/api/admin/batiments", headers=bearer(token))
+    assert res.status_code == 200
+    # La seule requête est la lecture des bâtiments
+    assert len(requetes) == 1
+
+
+def test_rotation_du_refresh_token(app, client):
+    creer_utilisateurs()
+    refresh_token = login(client, "admin_refresh@example.com")["refresh_token"]
+
+    res = client.post("/api/refresh", headers=bearer(refresh_token))
+    assert res.status_code == 200
+    nouveaux = res.get_json()
+    assert decode_token(nouveaux["access_token"])["role"] == "ADMIN"
+    assert client.get("/api/admin/batiments", headers=bearer(nouveaux["access_token"])).status_code == 200
+
+    # Ancien refresh token rejoué: refusé; le nouveau fonctionne
+    res = client.post("/api/refresh", headers=bearer(refresh_token))
+    assert res.status_code == 401
+    assert res.get_json()["error"] == "Token révoqué"
+    assert client.post("/api/refresh", headers=bearer(nouveaux["refresh_token"])).status_code == 200
+
+
+def test_token_d_acces_refuse_pour_le_renouvellement(app, client):
+    creer_utilisateurs()
+    access_token = login(client, "admin_refresh@example.com")["access_token"]
+    assert client.post("/api/refresh", headers=bearer(access_token)).status_code == 401
+
+
+def test_logout_revoque_le_refresh_token(app, client):
+    creer_utilisateurs()
+    tokens = login(client, "admin_refresh@example.com")
+
+    res = client.post("/api/logout", headers=bearer(tokens["access_token"]),
+                      json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 200
+    assert client.post("/api/refresh", headers=bearer(tokens["refresh_token"])).status_code == 401
@@ -0,0 +1,140 @@
+# backend/tests/test_revocation.py
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import revocation
+
+
+class Horloge:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_filtre_bloom_sans_faux_negatif():
+    filtre = revocation.FiltreBloom(1000, 0.01)
+    for i in range(1000):
+        filtre.ajouter(f'jti-{i}')
+    assert all(f'jti-{i}' in filtre for i in range(1000))
+    faux_positifs = sum(f'autre-{i}' in filtre for i in range(10000))
+    assert faux_positifs < 300
+
+
+def test_liste_memoire_expiration_et_reconstruction():
+    horloge = Horloge()
+    stockage = revocation.StockageMemoire(horloge=horloge)
+    liste = revocation.ListeRevocation(stockage, capacite=4, horloge=horloge)
+    liste.revoquer('a', expire_a=1010)
+    assert liste.est_revoque('a')
+    assert not liste.est_revoque('b')
+
+    horloge.t = 1011
+    assert not liste.est_revoque('a')
+    # Capacité dépassée: filtre reconstruit sans les tokens expirés
+    for jti in 'bcde':
+        liste.revoquer(jti, expire_a=2000)
+    assert len(stockage) == 4
+    assert all(liste.est_revoque(jti) for jti in 'bcde')
+
+
+def test_absents_sans_acces_au_stockage(faux_redis):
+    stockage = revocation.StockageRedis(faux_redis, duree_max=3600)
+    liste = revocation.ListeRevocation(stockage, intervalle_synchro=60)
+    liste.revoquer('revoque', expire_a=faux_redis.horloge() + 60)
+    liste.est_revoque('revoque')
+    faux_redis.commandes.clear()
+
+    assert not any(liste.est_revoque(f'valide-{i}') for i in range(1000))
+    # Faux positifs du filtre seulement (~0,1 %)
+    assert faux_redis.commandes.count('EXISTS') < 10
+    assert 'ZRANGEBYSCORE' not in faux_redis.commandes
+    assert liste.est_revoque('revoque')
+
+
+def test_stockage_partage_entre_workers(faux_redis):
+    horloge = Horloge()
+    faux_redis.horloge = horloge
+    worker_a = revocation.ListeRevocation(
+        revocation.StockageRedis(faux_redis, duree_max=3600, horloge=horloge), horloge=horloge)
+    worker_b = revocation.ListeRevocation(
+        revocation.StockageRedis(faux_redis, duree_max=3600, horloge=horloge), horloge=horloge)
+    assert not worker_b.est_revoque('jti-1')
+
+    worker_a.revoquer('jti-1', expire_a=1100)
+    assert worker_a.est_revoque('jti-1')
+    # Vu par l'autre worker à la synchronisation suivante
+    horloge.t += 1
+    assert worker_b.est_revoque('jti-1')
+    # Clé expirée avec le token
+    horloge.t = 1101
+    assert not worker_b.est_revoque('jti-1')
+    # Journal purgé au-delà de la durée de vie maximale des tokens
+    horloge.t = 5000
+    worker_a.revoquer('jti-2', expire_a=5100)
+    assert [jti for jti, _ in worker_a.stockage.depuis(float('-inf'))] == ['jti-2']
+
+
+def test_recouvrement_des_synchronisations_non_recompte(faux_redis):
+    horloge = Horloge()
+    faux_redis.horloge = horloge
+    stockage = revocation.StockageRedis(faux_redis, duree_max=3600, horloge=horloge)
+    worker_a = revocation.ListeRevocation(stockage, capacite=4, horloge=horloge)
+    worker_b = revocation.ListeRevocation(stockage, capacite=4, horloge=horloge)
+    worker_b.est_revoque('jti-0')
+    filtre = worker_b._filtre
+    for jti in ('jti-1', 'jti-2', 'jti-3'):
+        worker_a.revoquer(jti, expire_a=2000)
+
+    # Chaque synchronisation relit la marge de recouvrement
+    for _ in range(10):
+        horloge.t += 1
+        assert worker_b.est_revoque('jti-1')
+    assert worker_b._filtre is filtre
+    assert filtre.nb_elements == 3
+
+
+def test_stockage_incomplet_refuse_a_la_creation():
+    class SansJournal(revocation.StockageRevocations):
+        def ajouter(self, jti, expire_a):
+            pass
+
+        def contient(self, jti):
+            return False
+
+    with pytest.raises(TypeError):
+        SansJournal()
+
+
+def test_stockage_indisponible_refuse_les_jti_du_filtre(app, monkeypatch):
+    liste = app.extensions['revocation']
+    liste.revoquer('jti-1', expire_a=10 ** 10)
+
+    def panne(jti):
+        raise ConnectionError('redis injoignable')
+
+    monkeypatch.setattr(liste.stockage, 'contient', panne)
+    assert revocation.est_revoque({'jti': 'jti-1'})
+    assert not revocation.est_revoque({'jti': 'jti-absent'})
+
+
+def test_logout_revoque_le_token(client, admin):
+    token = create_access_token(identity=admin.email)
+    autre = create_access_token(identity=admin.email)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert client.get('/api/profile', headers=headers).status_code == 200
+    res = client.post('/api/logout', headers=headers)
+    assert res.get_json()['token_status'] == 'valid'
+
+    res = client.get('/api/profile', headers=headers)
+    assert res.status_code == 401
+    assert res.get_json()['error'] == 'Token révoqué'
+    # Les autres sessions du même utilisateur restent valides
+    assert client.get('/api/profile', headers={'Authorization': f'Bearer {autre}'}).status_code == 200
+
+
+def test_init_app_stockage_inconnu(app):
+    app.config['REVOCATION_STORAGE'] = 'memcached://localhost'
+    with pytest.raises(ValueError):
+        revocation.init_app(app)
@@ -0,0 +1,100 @@
+# backend/tests/test_statistiques.py
+from datetime import date
+from sqlalchemy import event
+from backend.models import db, Talibe, Daara, Batiment, Chambre, RoleEnum
+from backend import statistiques
+
+
+def creer_talibe(matricule, daara_id):
+    talibe = Talibe(
+        matricule=matricule,
+        nom="Fall",
+        prenom="Modou",
+        email=f"{matricule.lower()}@example.com",
+        role=RoleEnum.TALIBE,
+        date_naissance=date(2010, 1, 1),
+        lieu_naissance="Kaolack",
+        daara_id=daara_id
+    )
+    talibe.password_hash = "x"
+    db.session.add(talibe)
+    db.session.commit()
+    return talibe
+
+
+def test_dashboard_follows_inserts_and_deletes(app, client, admin_headers):
+    daara = Daara(nom="Daara Stats", lieu="Touba")
+    db.session.add(daara)
+    db.session.commit()
+
+    # Premier appel: construction du snapshot
+    data = client.get('/api/admin/dashboard', headers=admin_headers).get_json()
+    assert data['statistiques']['total_daaras'] == 1
+    assert data['talibes_par_daara'] == [{'daara': 'Daara Stats', 'count': 0}]
+
+    talibe = creer_talibe("STAT1", daara.id)
+    creer_talibe("STAT2", daara.id)
+    autre = Daara(nom="Daara Bis", lieu="Thiès")
+    batiment = Batiment(nom="Bat Stats")
+    db.session.add_all([autre, batiment])
+    db.session.commit()
+    db.session.add(Chambre(numero="1", batiment_id=batiment.id))
+    db.session.commit()
+
+    data = client.get('/api/admin/dashboard', headers=admin_headers).get_json()
+    assert data['statistiques'] == {
+        'total_talibes': 2,
+        'total_enseignants': 0,
+        'total_daaras': 2,
+        'total_batiments': 1,
+        'total_chambres': 1
+    }
+    assert data['talibes_par_daara'] == [
+        {'daara': 'Daara Stats', 'count': 2},
+        {'daara': 'Daara Bis', 'count': 0}
+    ]
+    assert data['chambres_par_batiment'] == [{'batiment': 'Bat Stats', 'count': 1}]
+
+    talibe.daara_id = autre.id
+    db.session.commit()
+    db.session.delete(talibe)
+    db.session.commit()
+
+    data = client.get('/api/admin/dashboard', headers=admin_headers).get_json()
+    assert data['statistiques']['total_talibes'] == 1
+    assert data['talibes_par_daara'] == [
+        {'daara': 'Daara Stats', 'count': 1},
+        {'daara': 'Daara Bis', 'count': 0}
+    ]
+    assert data['snapshot']['age_secondes'] >= 0
+
+
+def test_dashboard_is_a_single_read(app, client, admin_headers):
+    client.get('/api/admin/dashboard', headers=admin_headers)
+
+    requetes = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _before)
+    try:
+        res = client.get('/api/admin/dashboard', headers=admin_headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _before)
+
+    assert res.status_code == 200
+    assert len(requetes) == 1
+
+
+def test_rebuild_repairs_drift(app, client, admin_headers):
+    statistiques.reconstruire()
+    # Écriture hors ORM: les événements ne la voient pas
+    db.session.execute(Daara.__table__.insert().values(nom="Hors ORM", lieu="Dakar"))
+    db.session.commit()
+    assert statistiques.lire()['statistiques']['total_daaras'] == 0
+
+    res = client.post('/api/admin/dashboard/reconstruire', headers=admin_headers)
+
+    assert res.status_code == 200
+    assert res.get_json()['statistiques']['total_daaras'] == 1
@@ -0,0 +1,60 @@
+# backend/tests/test_streaming.py
+import json
+from datetime import date
+from backend.models import db, Talibe, Cours, Inscription, RoleEnum
+from backend.streaming import generer_tableau_json, generer_ndjson
+
+
+def creer_talibes(nombre):
+    cours = Cours(code="FLX101", libelle="Cours Flux")
+    db.session.add(cours)
+    db.session.flush()
+    for i in range(nombre):
+        talibe = Talibe(
+            matricule=f"FLX{i}",
+            nom="Sow",
+            prenom=f"Talibe{i}",
+            email=f"flux{i}@example.com",
+            role=RoleEnum.TALIBE,
+            date_naissance=date(2010, 1, 1),
+            lieu_naissance="Louga"
+        )
+        talibe.password_hash = "x"
+        db.session.add(talibe)
+        db.session.flush()
+        db.session.add(Inscription(talibe_id=talibe.id, cours_id=cours.id))
+    db.session.commit()
+
+
+def test_talibes_ndjson_stream(app, client, admin_headers):
+    creer_talibes(5)
+
+    res = client.get('/api/talibes', headers={**admin_headers, 'Accept': 'application/x-ndjson'})
+
+    assert res.status_code == 200
+    assert res.mimetype == 'application/x-ndjson'
+    lignes = [json.loads(ligne) for ligne in res.get_data(as_text=True).splitlines()]
+    assert [t['matricule'] for t in lignes] == [f"FLX{i}" for i in range(5)]
+    assert all(t['cours'][0]['nombre_talibes'] == 5 for t in lignes)
+
+
+def test_streamed_json_array_matches_plain_list(app, client, admin_headers):
+    creer_talibes(3)
+
+    complet = client.get('/api/inscriptions', headers=admin_headers).get_json()
+    en_flux = client.get('/api/inscriptions?stream=1', headers=admin_headers)
+
+    assert en_flux.is_streamed
+    assert json.loads(en_flux.get_data(as_text=True)) == complet
+
+
+def test_streamed_json_array_empty(app):
+    assert ''.join(generer_tableau_json(Talibe.query, Talibe.to_dict)) == '[]'
+    assert ''.join(generer_ndjson(Talibe.query, Talibe.to_dict)) == ''
+
+
+def test_lits_ndjson_stream(app, client, admin_headers):
+    res = client.get('/api/lits', headers={**admin_headers, 'Accept': 'application/x-ndjson'})
+
+    assert res.status_code == 200
+    assert res.get_data(as_text=True) == ''
@@ -0,0 +1,191 @@
+# backend/tests/test_upload_async.py
+import io
+import pytest
+from datetime import date
+from flask_jwt_extended import create_access_token
+from backend import stockage, taches_photos, images
+from backend.models import db, Talibe, RoleEnum
+
+
+def configurer_stockage_local(app, tmp_path, monkeypatch, traitement=False):
+    # Sans traitement d'image, le contenu est stocké tel quel
+    monkeypatch.setattr(images, 'IMAGES_DISPONIBLE', traitement and images.IMAGES_DISPONIBLE)
+    app.config['PHOTO_STORAGE'] = 'local'
+    app.config['PHOTO_STORAGE_DIR'] = str(tmp_path)
+    stockage.init_app(app)
+
+
+def creer_talibe():
+    talibe = Talibe(
+        matricule="UPL1",
+        nom="Cisse",
+        prenom="Photo",
+        email="upl1@example.com",
+        role=RoleEnum.TALIBE,
+        date_naissance=date(2010, 1, 1),
+        lieu_naissance="Saint-Louis"
+    )
+    talibe.password_hash = "x"
+    db.session.add(talibe)
+    db.session.commit()
+    return talibe.id, {'Authorization': f'Bearer {create_access_token(identity=talibe.email)}'}
+
+
+def envoyer(client, talibe_id, headers, contenu):
+    return client.post(f'/api/upload/photo/{talibe_id}', headers=headers,
+                       data={'photo': (io.BytesIO(contenu), 'portrait.jpg')},
+                       content_type='multipart/form-data')
+
+
+def test_upload_en_arriere_plan(app, client, tmp_path, monkeypatch):
+    configurer_stockage_local(app, tmp_path, monkeypatch)
+    talibe_id, headers = creer_talibe()
+
+    res = envoyer(client, talibe_id, headers, b'image-1')
+
+    assert res.status_code == 202
+    job_id = res.get_json()['job_id']
+    assert res.headers['Location'] == f'/api/upload/jobs/{job_id}'
+    etat = taches_photos.taches().attendre(job_id, timeout=5)
+    assert etat['statut'] == taches_photos.TERMINEE
+
+    db.session.expire_all()
+    public_id = db.session.get(Talibe, talibe_id).photo_profil
+    assert public_id.startswith('profiles/') and public_id.endswith('.jpg')
+    assert (tmp_path / public_id).read_bytes() == b'image-1'
+
+    suivi = client.get(f'/api/upload/jobs/{job_id}', headers=headers).get_json()
+    assert suivi['urls']['grande'] == f'/api/photos/{public_id}'
+    assert client.get(f'/api/photos/{public_id}').data == b'image-1'
+
+
+def test_remplacement_supprime_l_ancienne_photo(app, client, tmp_path, monkeypatch):
+    configurer_stockage_local(app, tmp_path, monkeypatch)
+    talibe_id, headers = creer_talibe()
+
+    premier = envoyer(client, talibe_id, headers, b'image-1').get_json()['job_id']
+    taches_photos.taches().attendre(premier, timeout=5)
+    db.session.expire_all()
+    ancienne = db.session.get(Talibe, talibe_id).photo_profil
+
+    second = envoyer(client, talibe_id, headers, b'image-2').get_json()['job_id']
+    taches_photos.taches().attendre(second, timeout=5)
+
+    db.session.expire_all()
+    nouvelle = db.session.get(Talibe, talibe_id).photo_profil
+    assert nouvelle != ancienne
+    assert not (tmp_path / ancienne).exists()
+    assert (tmp_path / nouvelle).read_bytes() == b'image-2'
+
+
+def test_upload_produit_les_variantes(app, client, tmp_path, monkeypatch):
+    Image = pytest.importorskip('PIL.Image')
+    configurer_stockage_local(app, tmp_path, monkeypatch, traitement=True)
+    talibe_id, headers = creer_talibe()
+    jpeg = io.BytesIO()
+    Image.new('RGB', (1600, 1200), 'blue').save(jpeg, 'JPEG')
+
+    job_id = envoyer(client, talibe_id, headers, jpeg.getvalue()).get_json()['job_id']
+    assert taches_photos.taches().attendre(job_id, timeout=5)['statut'] == taches_photos.TERMINEE
+
+    db.session.expire_all()
+    talibe = db.session.get(Talibe, talibe_id)
+    assert set(talibe.photo_variantes) == {'miniature', 'moyenne', 'grande'}
+    assert talibe.photo_profil == talibe.photo_variantes['grande']
+    assert talibe.photo_variantes['miniature'].startswith('profiles/variantes/')
+    miniature = Image.open(tmp_path / talibe.photo_variantes['miniature'])
+    assert miniature.format == 'WEBP' and max(miniature.size) == 64
+    assert talibe.to_dict()['photo_miniature'] == f"/api/photos/{talibe.photo_variantes['miniature']}"
+
+
+def test_upload_generique_puis_creation_du_talibe(app, client, tmp_path, monkeypatch, admin_headers):
+    Image = pytest.importorskip('PIL.Image')
+    configurer_stockage_local(app, tmp_path, monkeypatch, traitement=True)
+    app.config.update(PHOTO_CLEANUP_MIN_AGE=0, PHOTO_CLEANUP_INTERVAL=0)
+    jpeg = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x010F] = 'Appareil'
+    Image.new('RGB', (1600, 1200), 'blue').save(jpeg, 'JPEG', exif=exif)
+
+    res = client.post('/api/upload/photo', headers=admin_headers,
+                      data={'photo': (io.BytesIO(jpeg.getvalue()), 'portrait.jpg')},
+                      content_type='multipart/form-data')
+
+    # Traitement en arrière-plan, comme /upload/photo/<id>
+    assert res.status_code == 202
+    tache = taches_photos.taches().attendre(res.get_json()['job_id'], timeout=5)
+    resultat = tache['resultat']
+    grande = Image.open(tmp_path / resultat['public_id'])
+    assert grande.format == 'WEBP' and max(grande.size) == 1024
+    assert not grande.getexif()
+    suivi = client.get(f"/api/upload/jobs/{tache['id']}", headers=admin_headers).get_json()
+    assert suivi['urls']['miniature'] == f"/api/photos/{resultat['variantes']['miniature']}"
+
+    res = client.post('/api/talibes/create', headers=admin_headers, json={
+        'matricule': "UPL3", 'nom': "Cisse", 'prenom': "Photo", 'email': "upl3@example.com",
+        'password': "123456", 'date_naissance': "2010-01-01", 'lieu_naissance': "Saint-Louis",
+        'photo_profil': resultat['public_id'], 'photo_variantes': resultat['variantes']
+    })
+    assert res.status_code == 201
+    assert Talibe.query.filter_by(matricule="UPL3").one().photo_variantes == resultat['variantes']
+
+    # Variantes référencées: conservées par le nettoyage
+    from backend import nettoyage_photos
+    with app.app_context():
+        rapport = nettoyage_photos.nettoyer()
+    assert rapport['supprimees'] == 0
+    assert all((tmp_path / public_id).exists() for public_id in resultat['variantes'].values())
+
+
+def test_photo_variantes_validees(app, client, tmp_path, monkeypatch, admin_headers):
+    configurer_stockage_local(app, tmp_path, monkeypatch)
+    talibe_id, _ = creer_talibe()
+    talibe = db.session.get(Talibe, talibe_id)
+    talibe.photo_profil = 'profiles/a.webp'
+    talibe.photo_variantes = {'grande': 'profiles/a.webp', 'miniature': 'profiles/variantes/m.webp'}
+    db.session.commit()
+    url = f'/api/admin/utilisateurs/{talibe_id}'
+
+    res = client.put(url, headers=admin_headers, json={'photo_variantes': {'grande': 'profiles/autre.webp'}})
+    assert res.status_code == 400
+    assert client.put(url, headers=admin_headers, json={'photo_profil': 'profiles/a.webp'}).status_code == 200
+    assert db.session.get(Talibe, talibe_id).photo_variantes['miniature'] == 'profiles/variantes/m.webp'
+
+    # Nouvelle photo sans variantes: celles de l'ancienne ne sont pas gardées
+    assert client.put(url, headers=admin_headers, json={'photo_profil': 'profiles/b.jpg'}).status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Talibe, talibe_id).photo_variantes is None
+
+
+def test_suivi_reserve_au_demandeur_et_aux_admins(app, client, tmp_path, monkeypatch, admin_headers):
+    configurer_stockage_local(app, tmp_path, monkeypatch)
+    talibe_id, headers = creer_talibe()
+    job_id = envoyer(client, talibe_id, headers, b'image-1').get_json()['job_id']
+    taches_photos.taches().attendre(job_id, timeout=5)
+    autre = Talibe(matricule="UPL2", nom="Cisse", prenom="Autre", email="upl2@example.com",
+                   role=RoleEnum.TALIBE, date_naissance=date(2010, 1, 1), lieu_naissance="Saint-Louis")
+    autre.password_hash = "x"
+    db.session.add(autre)
+    db.session.commit()
+
+    res = client.get(f'/api/upload/jobs/{job_id}',
+                     headers={'Authorization': f'Bearer {create_access_token(identity=autre.email)}'})
+    assert res.status_code == 404
+    suivi = client.get(f'/api/upload/jobs/{job_id}', headers=headers).get_json()
+    assert suivi['statut'] == taches_photos.TERMINEE and 'proprietaire' not in suivi
+    assert client.get(f'/api/upload/jobs/{job_id}', headers=admin_headers).status_code == 200
+
+
+def test_stockage_incomplet_refuse_a_la_creation():
+    class SansListe(stockage.Stockage):
+        def envoyer(self, contenu, dossier, nom_fichier):
+            return 'x'
+
+        def supprimer(self, public_id):
+            pass
+
+        def url(self, public_id, options):
+            return 'x'
+
+    with pytest.raises(TypeError):
+        SansListe()